@@ -21,12 +21,29 @@ Usage:
     python3 d72n_aeon_control.py /dev/i2c-1 halt
     python3 d72n_aeon_control.py /dev/i2c-1 resume
     python3 d72n_aeon_control.py /dev/i2c-1 reset
+    python3 d72n_aeon_control.py /dev/i2c-1 calibrate --probe-cmd 0x01 --save-holds holds.json
 """
 
 import argparse
+import json
 import sys
 import time
+from collections import namedtuple
 from d72n_serdb import D72N_SERDB, D72N_ADDR
+from d72n_mailbox import D72N_Mailbox
+
+
+# Hold time after each reset step before the next write (seconds).
+# Conservative defaults; `calibrate` measures the minimum that works.
+DEFAULT_HOLDS = {
+    'halt': 0.0,
+    'disable': 0.01,
+    'enable': 0.01,
+}
+
+# Candidate holds tried by calibrate, longest first. No zero hold: a
+# disable/enable pair written back to back is not a reset worth trusting.
+CALIBRATE_HOLDS = [0.05, 0.02, 0.01, 0.005, 0.002, 0.001]
 
 
 class D72N_AEON:
@@ -99,36 +116,32 @@ class D72N_AEON:
         """Fully disable AEON (hold in reset)"""
         self.write_ctrl(0x00)
 
-    def reset(self, delay=0.1):
+    def reset(self, delay=None):
         """Full reset cycle
 
-        Sequence:
+        Sequence (see AEONSequencer):
         1. Halt (clear RUN)
         2. Disable (hold in reset)
         3. Enable (release reset)
         4. Resume (set RUN)
-        """
-        print("[*] Halting AEON...")
-        self.halt()
-        time.sleep(delay)
-
-        print("[*] Disabling AEON...")
-        self.disable()
-        time.sleep(delay)
 
-        print("[*] Enabling AEON...")
-        self.enable()
-        time.sleep(delay)
-
-        print("[*] Resuming AEON...")
-        success = self.resume()
-
-        if success:
-            print("[+] AEON reset complete - running")
+        Args:
+            delay: Hold time after disable and enable
+                   (default: DEFAULT_HOLDS)
+        """
+        holds = None
+        if delay is not None:
+            holds = {'halt': 0.0, 'disable': delay, 'enable': delay}
+        result = AEONSequencer(self, holds).reset()
+
+        if result.success:
+            print(f"[+] AEON reset complete - running "
+                  f"({result.latency * 1000:.1f} ms)")
         else:
-            print("[-] AEON reset failed - not running")
+            print(f"[-] AEON reset failed - not running "
+                  f"(control 0x{result.ctrl:02X})")
 
-        return success
+        return result.success
 
     def status(self):
         """Get detailed status
@@ -168,6 +181,151 @@ class D72N_AEON:
             print("Status: DISABLED")
 
 
+ResetResult = namedtuple('ResetResult',
+                         'success ctrl latency write_time holds')
+ResetResult.__doc__ = """AEON reset outcome
+
+    success: Final control register has RUN, ENABLE and RESET_N set
+    ctrl: Final control register value (single verify read)
+    latency: First write to verified running, in seconds
+    write_time: Time spent in the batched writes
+    holds: Hold times used
+"""
+
+
+class AEONSequencer:
+    """Minimal-latency AEON control sequences
+
+    The reset is written as a fixed value sequence without read-modify-
+    write: halt (ENABLE|RESET_N), disable (0), enable (ENABLE|RESET_N),
+    resume (RUN|ENABLE|RESET_N). Consecutive steps without a hold go out
+    in one batched write; a hold splits the batch and sleeps. The final
+    state is verified with one read. Other control bits are cleared, as
+    with D72N_AEON.disable()/enable().
+
+    Args:
+        aeon: D72N_AEON instance
+        holds: {step: seconds} hold after 'halt', 'disable', 'enable'
+               (default: DEFAULT_HOLDS)
+    """
+
+    def __init__(self, aeon, holds=None):
+        self.aeon = aeon
+        self.serdb = aeon.serdb
+        self.holds = dict(DEFAULT_HOLDS)
+        if holds:
+            self.holds.update(holds)
+        self.history = []
+
+    def steps(self):
+        """Reset steps as (name, value, hold)"""
+        a = self.aeon
+        enabled = a.BIT_ENABLE | a.BIT_RESET_N
+        return [
+            ('halt', enabled, self.holds['halt']),
+            ('disable', 0x00, self.holds['disable']),
+            ('enable', enabled, self.holds['enable']),
+            ('resume', enabled | a.BIT_RUN, 0.0),
+        ]
+
+    def run_sequence(self, steps):
+        """Write (name, value, hold) steps, batching steps without holds
+
+        Returns:
+            Time spent writing (seconds)
+        """
+        addr = self.aeon.AEON_CTRL
+        write_time = 0.0
+        batch = []
+        for _, value, hold in steps:
+            batch.append((addr, value))
+            if hold > 0:
+                t0 = time.perf_counter()
+                self.serdb.write_xdata_batch(batch)
+                write_time += time.perf_counter() - t0
+                batch = []
+                time.sleep(hold)
+        if batch:
+            t0 = time.perf_counter()
+            self.serdb.write_xdata_batch(batch)
+            write_time += time.perf_counter() - t0
+        return write_time
+
+    def reset(self):
+        """Reset AEON and verify it is running
+
+        Returns:
+            ResetResult
+        """
+        a = self.aeon
+        running = a.BIT_RUN | a.BIT_ENABLE | a.BIT_RESET_N
+
+        t0 = time.perf_counter()
+        write_time = self.run_sequence(self.steps())
+        ctrl = a.read_ctrl()
+        latency = time.perf_counter() - t0
+
+        result = ResetResult((ctrl & running) == running, ctrl, latency,
+                             write_time, dict(self.holds))
+        self.history.append(result)
+        return result
+
+    def calibrate(self, check, trials=3, safety=2.0):
+        """Measure the shortest disable/enable holds that still reset
+
+        Tries CALIBRATE_HOLDS from longest to shortest; a hold passes
+        when `trials` resets all verify and `check()` (e.g. a mailbox
+        round trip) returns True after each. The chosen hold is the
+        shortest passing value times `safety`. If even the longest
+        candidate fails nothing is chosen and the previous holds are
+        kept.
+
+        A liveness check is required: the reset's own verify only reads
+        back the control register just written, which always passes.
+
+        Args:
+            check: Liveness check called after each reset (required)
+            trials: Resets per candidate
+            safety: Multiplier applied to the shortest passing hold
+
+        Returns:
+            (holds, [(hold, passed, mean latency)]); holds is None when
+            no candidate passed
+        """
+        if check is None:
+            raise ValueError("calibration needs a liveness check")
+        previous = dict(self.holds)
+        results = []
+        best = None
+        for hold in CALIBRATE_HOLDS:
+            self.holds.update(disable=hold, enable=hold)
+            latencies = []
+            passed = True
+            for _ in range(trials):
+                r = self.reset()
+                latencies.append(r.latency)
+                if not r.success or (check and not check()):
+                    passed = False
+                    break
+            results.append((hold, passed, sum(latencies) / len(latencies)))
+            if not passed:
+                break
+            best = hold
+
+        if best is None:
+            self.holds = previous
+            return None, results
+        chosen = best * safety
+        self.holds.update(disable=chosen, enable=chosen)
+        return dict(self.holds), results
+
+
+def load_holds(path):
+    """Load hold times saved by `calibrate --save-holds`"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='D72N AEON Processor Control',
@@ -177,7 +335,8 @@ Commands:
     status  - Show AEON status
     halt    - Halt AEON processor
     resume  - Resume AEON processor
-    reset   - Full reset cycle
+    reset   - Full reset cycle (batched, reports reset-to-running latency)
+    calibrate - Measure minimum reset hold times
     enable  - Enable without running
     disable - Fully disable
 
@@ -185,6 +344,8 @@ Examples:
     python3 d72n_aeon_control.py /dev/i2c-1 status
     python3 d72n_aeon_control.py /dev/i2c-1 halt
     python3 d72n_aeon_control.py /dev/i2c-1 resume
+    python3 d72n_aeon_control.py /dev/i2c-1 reset --holds holds.json
+    python3 d72n_aeon_control.py /dev/i2c-1 calibrate --probe-cmd 0x01 --save-holds holds.json
 
 Use Cases:
     - Halt to freeze display for screenshot
@@ -196,13 +357,27 @@ Use Cases:
 
     parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
     parser.add_argument('command', nargs='?', default='status',
-                        choices=['status', 'halt', 'resume', 'reset', 'enable', 'disable'],
+                        choices=['status', 'halt', 'resume', 'reset',
+                                 'calibrate', 'enable', 'disable'],
                         help='Command to execute (default: status)')
-    parser.add_argument('--delay', type=float, default=0.1,
-                        help='Reset sequence delay (default: 0.1s)')
+    parser.add_argument('--delay', type=float,
+                        help='Reset hold after disable/enable in seconds '
+                             f"(default: {DEFAULT_HOLDS['disable']})")
+    parser.add_argument('--holds', help='Load reset hold times (JSON)')
+    parser.add_argument('--save-holds', help='Save calibrated hold times (JSON)')
+    parser.add_argument('--trials', type=int, default=3,
+                        help='Resets per calibration step (default: 3)')
+    parser.add_argument('--probe-cmd', type=lambda x: int(x, 0),
+                        help='Mailbox command used to check AEON liveness '
+                             'after each calibration reset (required for '
+                             'calibrate)')
 
     args = parser.parse_args()
 
+    if args.command == 'calibrate' and args.probe_cmd is None:
+        parser.error("calibrate needs --probe-cmd: the control register "
+                     "read-back alone always passes")
+
     # Parse bus argument
     if args.bus.isdigit():
         bus = int(args.bus)
@@ -241,7 +416,42 @@ Use Cases:
                     print("[-] AEON resume failed")
 
             elif args.command == 'reset':
-                aeon.reset(delay=args.delay)
+                holds = load_holds(args.holds) if args.holds else {}
+                if args.delay is not None:
+                    holds.update(disable=args.delay, enable=args.delay)
+                result = AEONSequencer(aeon, holds).reset()
+                print("[*] Holds: " + ', '.join(
+                    f"{k} {v * 1000:.1f} ms" for k, v in result.holds.items()))
+                print(f"[*] Control: 0x{result.ctrl:02X}, writes "
+                      f"{result.write_time * 1000:.1f} ms")
+                if result.success:
+                    print(f"[+] AEON reset complete - running after "
+                          f"{result.latency * 1000:.1f} ms")
+                else:
+                    print("[-] AEON reset failed - not running")
+                    return 1
+
+            elif args.command == 'calibrate':
+                mb = D72N_Mailbox(serdb)
+                check = lambda: mb.send_command(args.probe_cmd) is not None
+                print(f"[*] Calibrating reset holds (liveness: mailbox "
+                      f"command 0x{args.probe_cmd:02X})")
+                seq = AEONSequencer(aeon)
+                holds, results = seq.calibrate(check, trials=args.trials)
+                for hold, passed, latency in results:
+                    print(f"    hold {hold * 1000:5.1f} ms: "
+                          f"{'ok  ' if passed else 'FAIL'} "
+                          f"latency {latency * 1000:.1f} ms")
+                if holds is None:
+                    print(f"[-] Calibration failed - no hold up to "
+                          f"{CALIBRATE_HOLDS[0] * 1000:.1f} ms passed")
+                    return 1
+                print(f"[+] Chosen holds: disable/enable "
+                      f"{holds['disable'] * 1000:.1f} ms")
+                if args.save_holds:
+                    with open(args.save_holds, 'w') as f:
+                        json.dump(holds, f, indent=2)
+                    print(f"[+] Saved to {args.save_holds}")
 
             elif args.command == 'enable':
                 aeon.enable()
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+D72N BDMA Transfers
+===================
+
+Bulk DRAM transfers through the block DMA engine (RIU bank 0x12).
+
+The direct path costs two SERDB accesses per DRAM byte (XDMIU high
+byte + access). With BDMA the host only touches a small XDATA staging
+window (one access per byte) and the on-chip DMA moves each chunk
+between the window and DRAM:
+
+  read:   program DRAM -> XDATA, wait, read_xdata_range(window)
+  write:  write_xdata_range(window), program XDATA -> DRAM, wait
+
+Register layout
+---------------
+Only the top bank 0x12 registers are documented
+(docs/D72N_REGISTER_MAP.md), and only by name:
+
+  0x1219  status        busy bit 0x01 (assumed)
+  0x121A  control A     write 0x01 to start (assumed)
+  0x121B  control B     mode (0)
+  0x129F  config        not used
+  0x1244  transfer      not used
+
+Which registers take the DRAM address, the XDATA window address, the
+byte count and the source/destination engine selects is not known, so
+there is no default for them: a JSON layout (--layout) must name
+every role in REQUIRED_REGS, and there is no default staging window or
+scratch area either (--staging, --scratch).
+
+BDMA is opt-in. Without --self-test every command uses the direct
+XDMIU path and the engine is never touched. With it, the tool first
+freezes the device (D72N_Snapshot: watchdog off, AEON halted, 8051
+stopped), moves known patterns both ways through the DRAM scratch
+area, compares them over the direct path, and only then uses BDMA;
+the transfer runs in the same freeze. On mismatch or timeout it falls
+back to the direct path. The staging window's XDATA contents and the
+scratch DRAM are saved and restored around each call.
+
+Usage:
+    python3 d72n_bdma.py /dev/i2c-1 read 0x150000 4096 -o out.bin
+    python3 d72n_bdma.py /dev/i2c-1 test --layout bdma.json --staging ADDR --scratch ADDR
+    python3 d72n_bdma.py /dev/i2c-1 bench 0x150000 4096 --self-test --layout bdma.json --staging ADDR --scratch ADDR
+"""
+
+import argparse
+import json
+import sys
+import time
+from d72n_serdb import open_serdb
+from d72n_snapshot import D72N_Snapshot
+
+
+BDMA_BANK = 0x12
+
+# Documented bank 0x12 registers (roles beyond the names are assumed)
+DEFAULT_LAYOUT = {
+    'regs': {
+        'status': 0x1219,
+        'ctrl_a': 0x121A,
+        'ctrl_b': 0x121B,
+    },
+    'start': 0x01,
+    'mode': 0x00,
+    'busy_mask': 0x01,
+    'sel_miu': 0x00,
+    'sel_xdata': 0x01,
+}
+
+# Undocumented roles: the layout file must supply these
+REQUIRED_REGS = ('addr_lo', 'addr_mid', 'addr_hi', 'base', 'size',
+                 'src', 'dst')
+
+STAGING_SIZE = 0x400
+TEST_SIZE = 64
+
+
+def load_layout(path):
+    """Load a JSON layout, merged over DEFAULT_LAYOUT
+
+    Register addresses and constants may be numbers or "0x..." strings.
+    Every register in REQUIRED_REGS must be given.
+    """
+    with open(path, 'r') as f:
+        override = json.load(f)
+
+    def num(v):
+        return int(v, 0) if isinstance(v, str) else v
+
+    layout = {k: v for k, v in DEFAULT_LAYOUT.items() if k != 'regs'}
+    layout['regs'] = dict(DEFAULT_LAYOUT['regs'])
+    for name, addr in override.get('regs', {}).items():
+        layout['regs'][name] = num(addr)
+    for key, value in override.items():
+        if key != 'regs':
+            layout[key] = num(value)
+
+    missing = [name for name in REQUIRED_REGS if name not in layout['regs']]
+    if missing:
+        raise ValueError(f"{path}: layout must define {', '.join(missing)}")
+    return layout
+
+
+class D72N_BDMA:
+    """BDMA-assisted DRAM transfers with direct-path fallback
+
+    BDMA is used only after self_test() has passed; until then every
+    transfer takes the direct path. The engine, the staging window and
+    the scratch area are shared with the firmware: call self_test() and
+    the transfers with the device frozen (D72N_Snapshot).
+
+    Args:
+        serdb: D72N_SERDB instance
+        layout: Register layout (load_layout(); no default)
+        staging: XDATA staging window address
+        staging_size: Window size (bytes per DMA chunk)
+        timeout: Seconds to wait for one chunk
+    """
+
+    def __init__(self, serdb, layout, staging, staging_size=STAGING_SIZE,
+                 timeout=0.05):
+        self.serdb = serdb
+        self.layout = layout
+        self.staging = staging
+        self.staging_size = staging_size
+        self.timeout = timeout
+
+        self.available = None  # Unknown until self_test()
+        self.reason = None
+        self.chunks = 0
+        self.polls = 0
+
+    # ==========================================================================
+    # Engine
+    # ==========================================================================
+
+    def _program(self, dram_addr, to_xdata, length):
+        """Program and start one chunk"""
+        r = self.layout['regs']
+        miu, xdata = self.layout['sel_miu'], self.layout['sel_xdata']
+        writes = [
+            (r['addr_lo'], dram_addr & 0xFF),
+            (r['addr_mid'], (dram_addr >> 8) & 0xFF),
+            (r['addr_hi'], (dram_addr >> 16) & 0xFF),
+            (r['base'], self.staging & 0xFF),
+            (r['base'] + 1, (self.staging >> 8) & 0xFF),
+            (r['size'], length & 0xFF),
+            (r['size'] + 1, (length >> 8) & 0xFF),
+            (r['src'], miu if to_xdata else xdata),
+            (r['dst'], xdata if to_xdata else miu),
+            (r['ctrl_b'], self.layout['mode']),
+            (r['ctrl_a'], self.layout['start']),   # Start last
+        ]
+        self.serdb.write_riu_batch(writes)
+
+    def _wait(self):
+        """Wait for the busy bit to clear"""
+        r = self.layout['regs']['status']
+        deadline = time.time() + self.timeout
+        while True:
+            status = self.serdb.read_riu(r >> 8, r & 0xFF) & 0xFF
+            self.polls += 1
+            if not status & self.layout['busy_mask']:
+                return
+            if time.time() > deadline:
+                raise TimeoutError(f"BDMA busy (status 0x{status:02X})")
+
+    def _chunk_to_xdata(self, dram_addr, length):
+        self._program(dram_addr, True, length)
+        self._wait()
+        self.chunks += 1
+        return self.serdb.read_xdata_range(self.staging, length)
+
+    def _chunk_to_dram(self, dram_addr, data):
+        self.serdb.write_xdata_range(self.staging, data)
+        self._program(dram_addr, False, len(data))
+        self._wait()
+        self.chunks += 1
+
+    def _save_staging(self):
+        return self.serdb.read_xdata_range(self.staging, self.staging_size)
+
+    def _restore_staging(self, saved):
+        self.serdb.write_xdata_range(self.staging, saved)
+
+    def self_test(self, scratch, size=TEST_SIZE):
+        """Check the engine with known patterns in both directions
+
+        Sets self.available / self.reason. DRAM scratch and the staging
+        window are restored afterwards. Run with the device frozen.
+
+        Returns:
+            True if BDMA transfers verified
+        """
+        size = min(size, self.staging_size)
+        seed = int(time.time()) & 0xFF
+        pattern_in = bytes((seed + i * 7) & 0xFF for i in range(size))
+        pattern_out = bytes((~b) & 0xFF for b in pattern_in)
+
+        saved_dram = self.serdb.read_dram_range(scratch, size)
+        saved_xdata = self._save_staging()
+        try:
+            # DRAM -> XDATA
+            self.serdb.write_dram_range(scratch, pattern_in)
+            self.serdb.write_xdata_range(self.staging, bytes(size))
+            got = self._chunk_to_xdata(scratch, size)
+            if got != pattern_in:
+                return self._fail("DRAM->XDATA mismatch")
+
+            # XDATA -> DRAM
+            self._chunk_to_dram(scratch, pattern_out)
+            got = self.serdb.read_dram_range(scratch, size)
+            if got != pattern_out:
+                return self._fail("XDATA->DRAM mismatch")
+
+            self.available = True
+            self.reason = None
+            return True
+
+        except TimeoutError as e:
+            return self._fail(str(e))
+        finally:
+            self.serdb.write_dram_range(scratch, saved_dram)
+            self._restore_staging(saved_xdata)
+
+    def _fail(self, reason):
+        self.available = False
+        self.reason = reason
+        return False
+
+    def _ready(self):
+        return bool(self.available)
+
+    # ==========================================================================
+    # Transfers
+    # ==========================================================================
+
+    def read_dram_range(self, start, length, progress=False):
+        """Read DRAM via BDMA (direct path if unavailable)"""
+        if not self._ready():
+            return self.serdb.read_dram_range(start, length, progress=progress)
+
+        data = bytearray()
+        saved = self._save_staging()
+        try:
+            for offset in range(0, length, self.staging_size):
+                n = min(self.staging_size, length - offset)
+                try:
+                    data += self._chunk_to_xdata(start + offset, n)
+                except TimeoutError as e:
+                    # Engine stopped behaving: finish over the direct path
+                    self._fail(str(e))
+                    data += self.serdb.read_dram_range(start + offset,
+                                                       length - offset)
+                    break
+                if progress:
+                    print(f"\rReading: {(offset * 100) // length}%",
+                          end='', flush=True)
+        finally:
+            self._restore_staging(saved)
+        if progress:
+            print("\rReading: 100%")
+        return bytes(data)
+
+    def write_dram_range(self, start, data, progress=False):
+        """Write DRAM via BDMA (direct path if unavailable)"""
+        if not self._ready():
+            self.serdb.write_dram_range(start, data)
+            return
+
+        saved = self._save_staging()
+        try:
+            for offset in range(0, len(data), self.staging_size):
+                chunk = data[offset:offset + self.staging_size]
+                try:
+                    self._chunk_to_dram(start + offset, chunk)
+                except TimeoutError as e:
+                    self._fail(str(e))
+                    self.serdb.write_dram_range(start + offset, data[offset:])
+                    break
+                if progress:
+                    print(f"\rWriting: {(offset * 100) // len(data)}%",
+                          end='', flush=True)
+        finally:
+            self._restore_staging(saved)
+        if progress:
+            print("\rWriting: 100%")
+
+    def benchmark(self, addr, length):
+        """Time direct vs BDMA reads and writes (non-destructive)
+
+        Writes put back the bytes that were read, so DRAM is unchanged.
+
+        Returns:
+            {'direct_read', 'direct_write', 'bdma_read', 'bdma_write'}
+            in seconds (BDMA entries None unless self_test() passed)
+        """
+        results = {}
+        t0 = time.time()
+        original = self.serdb.read_dram_range(addr, length)
+        results['direct_read'] = time.time() - t0
+
+        t0 = time.time()
+        self.serdb.write_dram_range(addr, original)
+        results['direct_write'] = time.time() - t0
+
+        results['bdma_read'] = results['bdma_write'] = None
+        if self._ready():
+            t0 = time.time()
+            data = self.read_dram_range(addr, length)
+            results['bdma_read'] = time.time() - t0
+            results['bdma_match'] = data == original
+
+            t0 = time.time()
+            self.write_dram_range(addr, original)
+            results['bdma_write'] = time.time() - t0
+
+        return results
+
+
+def print_benchmark(results, length):
+    print()
+    print(f"{'Path':<14} {'Time':>9} {'KB/s':>9}")
+    print("-" * 34)
+    for key, label in (('direct_read', 'Direct read'),
+                       ('bdma_read', 'BDMA read'),
+                       ('direct_write', 'Direct write'),
+                       ('bdma_write', 'BDMA write')):
+        t = results.get(key)
+        if t is None:
+            print(f"{label:<14} {'-':>9} {'-':>9}")
+        else:
+            rate = length / t / 1024 if t else 0
+            print(f"{label:<14} {t:8.2f}s {rate:9.1f}")
+
+    if results.get('bdma_read'):
+        print()
+        print(f"[*] Read speedup:  {results['direct_read'] / results['bdma_read']:.2f}x")
+        print(f"[*] Write speedup: {results['direct_write'] / results['bdma_write']:.2f}x")
+        if not results.get('bdma_match', True):
+            print("[-] BDMA read data differs from direct read")
+
+
+def run_command(args, serdb, bdma):
+    """Run read/write/bench for main()"""
+    if args.command == 'read':
+        addr, length = int(args.args[0], 0), int(args.args[1], 0)
+        t0 = time.time()
+        data = bdma.read_dram_range(addr, length, progress=True)
+        elapsed = time.time() - t0
+        print(f"[+] Read {length} bytes in {elapsed:.2f}s")
+        if args.output:
+            with open(args.output, 'wb') as f:
+                f.write(data)
+            print(f"[+] Saved to {args.output}")
+        else:
+            print(serdb.hexdump(data[:256], addr))
+
+    elif args.command == 'write':
+        addr = int(args.args[0], 0)
+        with open(args.args[1], 'rb') as f:
+            data = f.read()
+        t0 = time.time()
+        bdma.write_dram_range(addr, data, progress=True)
+        print(f"[+] Wrote {len(data)} bytes in {time.time() - t0:.2f}s")
+
+    elif args.command == 'bench':
+        addr, length = int(args.args[0], 0), int(args.args[1], 0)
+        print(f"[*] Benchmarking {length} bytes at 0x{addr:06X}...")
+        results = bdma.benchmark(addr, length)
+        print_benchmark(results, length)
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N BDMA Transfers',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Commands:
+    test                    Self-test the BDMA engine (implies --self-test)
+    read ADDR LEN           Read DRAM (-o to save)
+    write ADDR FILE         Write file to DRAM
+    bench ADDR LEN          Direct vs BDMA timing (non-destructive)
+
+Examples:
+    # Read 4KB of the display buffer over the direct path
+    python3 d72n_bdma.py /dev/i2c-1 read 0x150000 4096 -o out.bin
+
+    # Check whether the engine behaves as a layout expects
+    python3 d72n_bdma.py /dev/i2c-1 test --layout bdma.json \\
+        --staging ADDR --scratch ADDR
+
+    # Benchmark, using BDMA only if the self-test passes
+    python3 d72n_bdma.py /dev/i2c-1 bench 0x150000 4096 --self-test \\
+        --layout bdma.json --staging ADDR --scratch ADDR
+
+Layout JSON (every role below is required; status, ctrl_a and ctrl_b
+default to the documented 0x1219, 0x121A, 0x121B):
+    {"regs": {"addr_lo": ..., "addr_mid": ..., "addr_hi": ...,
+              "base": ..., "size": ..., "src": ..., "dst": ...}}
+
+BDMA is opt-in: without --self-test nothing is written to bank 0x12
+and transfers use the direct XDMIU path. With it, the self-test and
+the transfer run with the device frozen (watchdog off, AEON halted,
+8051 stopped) and fall back to the direct path if the test fails.
+Pick a staging window and scratch area you have verified are unused.
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
+    parser.add_argument('command', choices=['test', 'read', 'write', 'bench'])
+    parser.add_argument('args', nargs='*', help='Command arguments')
+    parser.add_argument('--self-test', action='store_true',
+                        help='Probe BDMA (frozen) and use it if it verifies')
+    parser.add_argument('--layout', help='Register layout (JSON, required '
+                                         'for --self-test)')
+    parser.add_argument('--staging', type=lambda x: int(x, 0),
+                        help='XDATA staging window (required for --self-test)')
+    parser.add_argument('--staging-size', type=lambda x: int(x, 0),
+                        default=STAGING_SIZE,
+                        help=f'Staging window size (default: 0x{STAGING_SIZE:X})')
+    parser.add_argument('--scratch', type=lambda x: int(x, 0),
+                        help='DRAM scratch area for the self-test '
+                             '(required for --self-test)')
+    parser.add_argument('--timeout', '-t', type=float, default=0.05,
+                        help='Per-chunk timeout in seconds (default: 0.05)')
+    parser.add_argument('-o', '--output', help='Output file for read')
+
+    args = parser.parse_args()
+
+    expected = {'test': 0, 'read': 2, 'write': 2, 'bench': 2}[args.command]
+    if len(args.args) != expected:
+        parser.error(f"{args.command} takes {expected} argument(s)")
+    use_bdma = args.self_test or args.command == 'test'
+    if use_bdma and None in (args.layout, args.staging, args.scratch):
+        parser.error("the BDMA self-test needs --layout, --staging and --scratch")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        layout = load_layout(args.layout) if use_bdma else None
+
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            bdma = D72N_BDMA(serdb, layout, args.staging, args.staging_size,
+                             args.timeout)
+
+            if not use_bdma:
+                print("[*] Direct XDMIU path (--self-test to try BDMA)")
+                return run_command(args, serdb, bdma)
+
+            with D72N_Snapshot(serdb):
+                print(f"[*] BDMA self-test, device frozen (staging "
+                      f"0x{args.staging:04X}, {args.staging_size} bytes, "
+                      f"scratch 0x{args.scratch:06X})...")
+                if bdma.self_test(args.scratch):
+                    print("[+] BDMA transfers verified")
+                else:
+                    print(f"[-] BDMA unavailable ({bdma.reason}); "
+                          f"using direct XDMIU path")
+                if args.command == 'test':
+                    return 0 if bdma.available else 1
+                return run_command(args, serdb, bdma)
+
+    except ValueError as e:
+        print(f"[-] {e}")
+        return 1
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -127,13 +127,19 @@ def create_exploit_pattern():
     return bytes(data)
 
 
-def run_exploit(serdb, method='overwrite'):
+def run_exploit(serdb, method='overwrite', engine=None):
     """Run the exploit via SERDB.
 
     Args:
         serdb: D72N_SERDB instance
         method: 'overwrite' or 'redirect'
+        engine: FillEngine (default: new host-only one, pipelined host
+                writes)
     """
+    if engine is None:
+        from d72n_fill import FillEngine
+        engine = FillEngine(serdb)
+
     print("=" * 60)
     print("D72N EXPLOIT: BMP shows BLUE, Display shows RED")
     print("=" * 60)
@@ -147,19 +153,10 @@ def run_exploit(serdb, method='overwrite'):
         print("[*] Writing RED pattern to display buffer 0x150000...")
 
         # Write RED to display buffer
-        for y in range(DISPLAY_HEIGHT):
-            for x in range(DISPLAY_WIDTH):
-                offset = (y * DISPLAY_WIDTH + x) * 2
-                addr = DISPLAY_BUFFER + offset
-                # RGB565 RED = 0xF800
-                serdb.write_dram(addr, 0x00)
-                serdb.write_dram(addr + 1, 0xF8)
-
-            if y % 20 == 0:
-                pct = (y * 100) // DISPLAY_HEIGHT
-                print(f"\r    Progress: {pct}%", end='', flush=True)
-
-        print("\r    Progress: 100%")
+        # RGB565 RED = 0xF800 = bytes [0x00, 0xF8] little-endian
+        path = engine.fill(DISPLAY_BUFFER, DISPLAY_WIDTH * DISPLAY_HEIGHT * 2,
+                           b'\x00\xF8', progress=True)
+        print(f"    Filled via {path}")
         print()
         print("[+] Display should now show RED")
         print("[+] The BLUE BMP file content is ignored!")
@@ -188,26 +185,20 @@ def run_exploit(serdb, method='overwrite'):
         # Now write RED to display buffer
         print("[*] Writing RED to display buffer...")
         # (same as overwrite method)
-        for y in range(min(50, DISPLAY_HEIGHT)):  # Quick demo
-            for x in range(DISPLAY_WIDTH):
-                offset = (y * DISPLAY_WIDTH + x) * 2
-                addr = DISPLAY_BUFFER + offset
-                serdb.write_dram(addr, 0x00)
-                serdb.write_dram(addr + 1, 0xF8)
+        engine.fill(DISPLAY_BUFFER, min(50, DISPLAY_HEIGHT) * DISPLAY_WIDTH * 2,
+                    b'\x00\xF8')  # Quick demo
 
         print("[+] Display should show RED (decode went elsewhere)")
 
 
 def quick_demo(serdb):
     """Quick demo - write visible pattern to prove control."""
+    from d72n_fill import FillEngine
+
     print("[*] Quick demo: Writing RED square to top-left...")
 
-    for y in range(50):
-        for x in range(50):
-            offset = (y * DISPLAY_WIDTH + x) * 2
-            addr = DISPLAY_BUFFER + offset
-            serdb.write_dram(addr, 0x00)
-            serdb.write_dram(addr + 1, 0xF8)
+    FillEngine(serdb).fill_rect(DISPLAY_BUFFER, DISPLAY_WIDTH, DISPLAY_HEIGHT,
+                                0, 0, 50, 50, RGB565_RED)
 
     print("[+] Red square should appear at top-left")
     print("[+] This overwrites whatever BMP was showing!")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+D72N Display Emulator
+=====================
+
+Renders the simulated output buffer (0x150000) so display code can be
+developed without the LCD.
+
+The simulation backend keeps real DRAM (XDMIU high byte + access, as
+on hardware). With a display option it runs a DisplayEmulator that
+re-renders the 480x234 RGB565 buffer to a PNG at a fixed refresh rate
+whenever DRAM was written since the last frame. The PNG is replaced
+atomically, so any image viewer that reloads on change works; this
+tool also has a small Tk viewer.
+
+Add fast=1 to drop the 1ms SERDB settle delays and run drawing and
+streaming code at CPU speed.
+
+Usage:
+    # Terminal 1: draw into the simulated panel
+    python3 d72n_display_test.py "sim://?display=live.png" --stripe
+    python3 d72n_frame_stream.py "sim://?display=live.png&fps=10&fast=1" --demo 100
+
+    # Terminal 2: watch it
+    python3 d72n_display_emu.py live.png --zoom 2
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from d72n_screenshot import rgb565_to_rgb888, write_png
+from d72n_framebuffer import DISPLAY_WIDTH, DISPLAY_HEIGHT, DISPLAY_BUFFER
+
+# Optional viewer
+_tkinter = None
+try:
+    import tkinter
+    _tkinter = tkinter
+except ImportError:
+    pass
+
+
+DEFAULT_FPS = 5
+
+
+class DisplayEmulator:
+    """Periodic PNG rendering of a SimulationBackend output buffer
+
+    Args:
+        backend: SimulationBackend (dram, dram_writes)
+        path: PNG file to keep up to date
+        fps: Refresh rate
+        base: DRAM address of the buffer
+        width, height: Size in pixels
+    """
+
+    def __init__(self, backend, path, fps=DEFAULT_FPS, base=DISPLAY_BUFFER,
+                 width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+        self.backend = backend
+        self.path = path
+        self.interval = 1.0 / fps
+        self.base = base
+        self.width = width
+        self.height = height
+        self.length = width * height * 2
+
+        self.frames = 0
+        self.render_time = 0.0
+        self._seen = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def render(self):
+        """Write the current buffer contents to the PNG"""
+        t0 = time.time()
+        self._seen = self.backend.dram_writes
+        frame = bytes(self.backend.dram[self.base:self.base + self.length])
+        tmp = self.path + '.tmp'
+        write_png(tmp, rgb565_to_rgb888(frame, self.width, self.height),
+                  self.width, self.height)
+        os.replace(tmp, self.path)
+        self.frames += 1
+        self.render_time += time.time() - t0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.backend.dram_writes != self._seen:
+                self.render()
+
+    def start(self):
+        self.render()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop refreshing; renders the final state once more"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.backend.dram_writes != self._seen:
+            self.render()
+
+
+def view(path, fps=DEFAULT_FPS, zoom=1):
+    """Show a PNG in a Tk window, reloading it when it changes"""
+    tk = _tkinter
+    root = tk.Tk()
+    root.title(f"D72N - {path}")
+    label = tk.Label(root, bg='black')
+    label.pack()
+    state = {'stamp': None}
+
+    def poll():
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp != state['stamp']:
+                image = tk.PhotoImage(file=path)
+                if zoom > 1:
+                    image = image.zoom(zoom)
+                label.configure(image=image)
+                label.image = image
+                state['stamp'] = stamp
+        except (OSError, tk.TclError):
+            pass  # Not written yet, or caught mid-replace
+        root.after(int(1000 / fps), poll)
+
+    poll()
+    root.mainloop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Display Emulator',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Simulation options (bus spec query string):
+    display=FILE            Render the output buffer to FILE (PNG)
+    fps=N                   Refresh rate (default: 5)
+    fast=1                  No SERDB settle delays (CPU speed)
+
+Examples:
+    # Draw into the simulated panel
+    python3 d72n_display_test.py "sim://?display=live.png" --marker "HELLO"
+
+    # Benchmark frame streaming without hardware
+    python3 d72n_frame_stream.py "sim://?display=live.png&fast=1" --demo 100 --fps 30
+
+    # Watch the panel (reloads on change)
+    python3 d72n_display_emu.py live.png --zoom 2
+        """
+    )
+
+    parser.add_argument('png', help='PNG written by sim://?display=...')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS,
+                        help=f'Viewer refresh rate (default: {DEFAULT_FPS})')
+    parser.add_argument('--zoom', type=int, default=1,
+                        help='Integer zoom factor (default: 1)')
+
+    args = parser.parse_args()
+
+    if _tkinter is None:
+        print("[-] Viewer needs tkinter; open the PNG in any viewer that "
+              "reloads on change instead")
+        return 1
+
+    try:
+        view(args.png, args.fps, args.zoom)
+    except _tkinter.TclError as e:
+        print(f"[-] Cannot open display: {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
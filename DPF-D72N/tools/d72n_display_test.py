@@ -14,6 +14,14 @@ Traced from firmware:
 The 0x150000 buffer is the FINAL output stage that feeds the panel.
 Writing here bypasses all decode/scaling and shows immediately.
 
+Drawing goes through a Framebuffer shadow (d72n_framebuffer.py); only
+changed bytes are written, as contiguous DRAM range writes. Solid runs
+go through FillEngine (d72n_fill.py), host writes until a verified
+AEON-side fill helper exists. With --double-buffer, drawing goes to the
+secondary buffer and the GWin base is flipped afterwards (d72n_gwin.py);
+--quick and --marker first copy the shown buffer there, so they overlay
+the current picture as without double buffering.
+
 Attack demonstration:
   1. Connect via SERDB (I2C 0x59)
   2. Write pattern to 0x150000
@@ -24,6 +32,7 @@ Usage:
     python d72n_display_test.py /dev/i2c-1 --red-screen
     python d72n_display_test.py /dev/i2c-1 --stripe
     python d72n_display_test.py /dev/i2c-1 --marker "PWNED"
+    python d72n_display_test.py /dev/i2c-1 --image photo.jpg --dither
 
     # Windows (FTDI)
     python d72n_display_test.py ftdi://ftdi:232h/1 --red-screen
@@ -39,6 +48,11 @@ import time
 # Import from our SERDB library
 try:
     from d72n_serdb import D72N_SERDB, D72N_ADDR
+    from d72n_framebuffer import Framebuffer, load_image, rgb888_to_565
+    from d72n_fill import FillEngine
+    from d72n_screenshot import ScreenCapture
+    from d72n_font import draw_text
+    from d72n_gwin import DoubleBuffer, D72N_GWin, load_layout, describe_flip
 except ImportError:
     # If run standalone, provide minimal implementation
     print("Note: Run from DPF-D72N/tools/ directory for full functionality")
@@ -67,117 +81,43 @@ def rgb_to_565(r, g, b):
     return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
 
 
-def write_pixel(serdb, x, y, color):
-    """Write a single RGB565 pixel to display buffer"""
-    if x < 0 or x >= DISPLAY_WIDTH or y < 0 or y >= DISPLAY_HEIGHT:
-        return
-
-    offset = (y * DISPLAY_WIDTH + x) * 2  # 2 bytes per pixel
-    addr = DISPLAY_BUFFER + offset
-
-    # Write low byte first, then high byte (little-endian)
-    serdb.write_dram(addr, color & 0xFF)
-    serdb.write_dram(addr + 1, (color >> 8) & 0xFF)
+def write_pixel(fb, x, y, color):
+    """Write a single RGB565 pixel to the framebuffer shadow"""
+    fb.set_pixel(x, y, color)
 
 
-def fill_rect(serdb, x, y, width, height, color, progress=False):
+def fill_rect(fb, x, y, width, height, color):
     """Fill a rectangle with solid color"""
-    total = width * height
-    count = 0
+    fb.fill_rect(x, y, width, height, color)
 
-    for py in range(y, y + height):
-        for px in range(x, x + width):
-            write_pixel(serdb, px, py, color)
-            count += 1
-            if progress and count % 1000 == 0:
-                pct = (count * 100) // total
-                print(f"\rWriting: {pct}%", end='', flush=True)
 
-    if progress:
-        print("\rWriting: 100%")
+def draw_text_5x7(fb, x, y, text, color, bg_color=None):
+    """Draw text using the 5x7 font (full printable ASCII)
 
+    Each character is 6 pixels wide (5 + 1 space). Text is rasterized
+    per scanline from the precompiled atlas (see d72n_font.py).
+    """
+    draw_text(fb, x, y, text, color, bg_color)
 
-def draw_text_5x7(serdb, x, y, text, color, bg_color=None):
-    """Draw text using simple 5x7 font
 
-    Only supports uppercase A-Z and some symbols.
-    Each character is 6 pixels wide (5 + 1 space).
-    """
-    # Simple 5x7 font data (uppercase only)
-    font = {
-        'A': [0x7C, 0x12, 0x11, 0x12, 0x7C],
-        'B': [0x7F, 0x49, 0x49, 0x49, 0x36],
-        'C': [0x3E, 0x41, 0x41, 0x41, 0x22],
-        'D': [0x7F, 0x41, 0x41, 0x22, 0x1C],
-        'E': [0x7F, 0x49, 0x49, 0x49, 0x41],
-        'F': [0x7F, 0x09, 0x09, 0x09, 0x01],
-        'H': [0x7F, 0x08, 0x08, 0x08, 0x7F],
-        'I': [0x00, 0x41, 0x7F, 0x41, 0x00],
-        'K': [0x7F, 0x08, 0x14, 0x22, 0x41],
-        'L': [0x7F, 0x40, 0x40, 0x40, 0x40],
-        'N': [0x7F, 0x02, 0x0C, 0x10, 0x7F],
-        'O': [0x3E, 0x41, 0x41, 0x41, 0x3E],
-        'P': [0x7F, 0x09, 0x09, 0x09, 0x06],
-        'R': [0x7F, 0x09, 0x19, 0x29, 0x46],
-        'S': [0x46, 0x49, 0x49, 0x49, 0x31],
-        'T': [0x01, 0x01, 0x7F, 0x01, 0x01],
-        'U': [0x3F, 0x40, 0x40, 0x40, 0x3F],
-        'W': [0x3F, 0x40, 0x38, 0x40, 0x3F],
-        'X': [0x63, 0x14, 0x08, 0x14, 0x63],
-        'Y': [0x07, 0x08, 0x70, 0x08, 0x07],
-        '!': [0x00, 0x00, 0x5F, 0x00, 0x00],
-        ' ': [0x00, 0x00, 0x00, 0x00, 0x00],
-        '0': [0x3E, 0x51, 0x49, 0x45, 0x3E],
-        '1': [0x00, 0x42, 0x7F, 0x40, 0x00],
-        '2': [0x42, 0x61, 0x51, 0x49, 0x46],
-        '7': [0x01, 0x71, 0x09, 0x05, 0x03],
-        'D': [0x7F, 0x41, 0x41, 0x22, 0x1C],
-    }
-
-    cx = x
-    for char in text.upper():
-        if char in font:
-            cols = font[char]
-            for col_idx, col in enumerate(cols):
-                for row in range(7):
-                    if col & (1 << row):
-                        write_pixel(serdb, cx + col_idx, y + row, color)
-                    elif bg_color is not None:
-                        write_pixel(serdb, cx + col_idx, y + row, bg_color)
-            cx += 6  # 5 pixels + 1 space
-        else:
-            cx += 6  # Unknown char = space
-
-
-def red_screen(serdb):
+def red_screen(fb):
     """Fill entire screen with red - most visible test"""
     print("[*] Filling screen with RED...")
     print(f"    Buffer: 0x{DISPLAY_BUFFER:06X}")
     print(f"    Size: {DISPLAY_WIDTH}x{DISPLAY_HEIGHT}")
 
-    # Write RED (0xF800) to every pixel
-    # For speed, write in chunks
-    bytes_per_row = DISPLAY_WIDTH * 2
-    total_bytes = bytes_per_row * DISPLAY_HEIGHT
-
+    total_bytes = DISPLAY_WIDTH * 2 * DISPLAY_HEIGHT
     print(f"    Total: {total_bytes} bytes ({total_bytes//1024}KB)")
     print()
 
-    # Red in RGB565 = 0xF800 = bytes [0x00, 0xF8]
-    for row in range(DISPLAY_HEIGHT):
-        for col in range(DISPLAY_WIDTH):
-            offset = (row * DISPLAY_WIDTH + col) * 2
-            addr = DISPLAY_BUFFER + offset
-            serdb.write_dram(addr, 0x00)      # Low byte
-            serdb.write_dram(addr + 1, 0xF8)  # High byte (red)
-
-        pct = ((row + 1) * 100) // DISPLAY_HEIGHT
-        print(f"\rProgress: {pct}% (row {row+1}/{DISPLAY_HEIGHT})", end='', flush=True)
+    # Red in RGB565 = 0xF800 = bytes [0x00, 0xF8], one contiguous write
+    fb.fill(RGB565_RED)
+    fb.flush(progress=True)
 
-    print("\n[+] Screen should now be RED")
+    print("[+] Screen should now be RED")
 
 
-def color_stripes(serdb):
+def color_stripes(fb):
     """Draw color stripes - tests full color range"""
     print("[*] Drawing color stripes...")
 
@@ -198,12 +138,13 @@ def color_stripes(serdb):
         y = i * stripe_height
         height = stripe_height if i < len(colors) - 1 else DISPLAY_HEIGHT - y
         print(f"    {name}: y={y}, height={height}")
-        fill_rect(serdb, 0, y, DISPLAY_WIDTH, height, color)
+        fill_rect(fb, 0, y, DISPLAY_WIDTH, height, color)
 
+    fb.flush(progress=True)
     print("[+] Stripes should be visible")
 
 
-def draw_marker(serdb, text="D72N"):
+def draw_marker(fb, text="D72N"):
     """Draw text marker in center of screen"""
     print(f"[*] Drawing marker: {text}")
 
@@ -215,21 +156,40 @@ def draw_marker(serdb, text="D72N"):
 
     # Draw background box
     pad = 10
-    fill_rect(serdb, x - pad, y - pad, text_width + 2*pad, text_height + 2*pad, RGB565_BLACK)
+    fill_rect(fb, x - pad, y - pad, text_width + 2*pad, text_height + 2*pad, RGB565_BLACK)
 
     # Draw text
-    draw_text_5x7(serdb, x, y, text, RGB565_RED)
+    draw_text_5x7(fb, x, y, text, RGB565_RED)
+    written = fb.flush()
+
+    print(f"[+] Marker drawn at ({x}, {y}), {written} bytes written")
+
+
+def upload_image(fb, path, dither=False):
+    """Scale an image to the panel, convert to RGB565 and write it"""
+    print(f"[*] Uploading image: {path}")
 
-    print(f"[+] Marker drawn at ({x}, {y})")
+    t0 = time.time()
+    rgb = load_image(path, fb.width, fb.height)
+    t1 = time.time()
+    data = rgb888_to_565(rgb, fb.width, fb.height, dither)
+    t2 = time.time()
+    print(f"    Load/scale: {(t1 - t0) * 1000:.1f} ms")
+    print(f"    RGB565{' (dithered)' if dither else ''}: {(t2 - t1) * 1000:.1f} ms")
 
+    fb.blit(0, 0, fb.width, fb.height, data)
+    written = fb.flush(progress=True)
+    elapsed = time.time() - t2
+    rate = written / elapsed / 1024 if elapsed else 0
+    print(f"[+] Wrote {written} bytes in {elapsed:.2f}s ({rate:.1f} KB/s)")
 
-def quick_test(serdb):
+
+def quick_test(fb):
     """Quick test - write small pattern to top-left corner"""
     print("[*] Quick test - writing 10x10 red square to top-left...")
 
-    for y in range(10):
-        for x in range(10):
-            write_pixel(serdb, x, y, RGB565_RED)
+    fill_rect(fb, 0, 0, 10, 10, RGB565_RED)
+    fb.flush()
 
     print("[+] Red square should appear at top-left corner")
 
@@ -238,14 +198,23 @@ def verify_buffer(serdb, count=32):
     """Read back display buffer to verify writes"""
     print(f"[*] Reading {count} bytes from display buffer...")
 
-    data = []
-    for i in range(count):
-        data.append(serdb.read_dram(DISPLAY_BUFFER + i))
+    data = serdb.read_dram_range(DISPLAY_BUFFER, count)
 
     print(f"    Address: 0x{DISPLAY_BUFFER:06X}")
     print("    Data: " + ' '.join(f'{b:02X}' for b in data))
 
-    return bytes(data)
+    return data
+
+
+def screenshot(serdb, path, halt=False):
+    """Capture the display buffer to PNG"""
+    print(f"[*] Capturing display buffer to {path}...")
+
+    cap = ScreenCapture(serdb, halt=halt)
+    cap.capture(progress=True)
+    cap.save(path)
+
+    print(f"[+] Saved {cap.width}x{cap.height} PNG")
 
 
 def main():
@@ -266,6 +235,15 @@ Examples:
     # Draw text marker
     python d72n_display_test.py /dev/i2c-1 --marker "PWNED"
 
+    # Upload an image (PNG/JPEG need Pillow; NumPy speeds up conversion)
+    python d72n_display_test.py /dev/i2c-1 --image photo.jpg --dither
+
+    # Draw off-screen (0x0C0000), then flip the GWin base (see d72n_gwin.py)
+    python d72n_display_test.py /dev/i2c-1 --image photo.jpg --double-buffer gwin.json
+
+    # Screenshot of the display buffer (AEON halted while reading)
+    python d72n_display_test.py /dev/i2c-1 --screenshot shot.png --halt
+
     # Quick 10x10 test square
     python d72n_display_test.py /dev/i2c-1 --quick
 
@@ -290,10 +268,21 @@ This is the FINAL output buffer that feeds the LCD panel.
                       help='Draw color stripes')
     mode.add_argument('--marker', '-m', metavar='TEXT',
                       help='Draw text marker on screen')
+    mode.add_argument('--image', '-i', metavar='FILE',
+                      help='Upload image (scaled to 480x234)')
     mode.add_argument('--quick', '-q', action='store_true',
                       help='Quick 10x10 test square')
     mode.add_argument('--verify', '-v', action='store_true',
                       help='Read and display buffer contents')
+    mode.add_argument('--screenshot', metavar='FILE',
+                      help='Save display buffer as PNG')
+    parser.add_argument('--dither', action='store_true',
+                        help='Ordered dithering for --image')
+    parser.add_argument('--halt', action='store_true',
+                        help='Halt AEON during --screenshot')
+    parser.add_argument('--double-buffer', metavar='LAYOUT',
+                        help='Draw into the secondary buffer, then flip GWin '
+                             '(LAYOUT: GWin base register JSON, see d72n_gwin.py)')
 
     args = parser.parse_args()
 
@@ -314,22 +303,46 @@ This is the FINAL output buffer that feeds the LCD panel.
             print("[+] SERDB connected")
             print()
 
+            db = None
+            if args.double_buffer:
+                gwin = D72N_GWin(serdb, load_layout(args.double_buffer))
+                db = DoubleBuffer(serdb, gwin, engine=FillEngine(serdb))
+                fb = db.back
+                if args.quick or args.marker:
+                    # Partial tests overlay what is shown, not a black frame
+                    print(f"[*] Seeding from 0x{db.front.base:06X}...")
+                    db.seed(progress=True)
+                print(f"[*] Double buffering: drawing at 0x{fb.base:06X}")
+            else:
+                fb = Framebuffer(serdb, engine=FillEngine(serdb))
             if args.red_screen:
-                red_screen(serdb)
+                red_screen(fb)
             elif args.stripe:
-                color_stripes(serdb)
+                color_stripes(fb)
             elif args.marker:
-                draw_marker(serdb, args.marker)
+                draw_marker(fb, args.marker)
+            elif args.image:
+                upload_image(fb, args.image, args.dither)
             elif args.quick:
-                quick_test(serdb)
+                quick_test(fb)
             elif args.verify:
                 verify_buffer(serdb)
+            elif args.screenshot:
+                screenshot(serdb, args.screenshot, args.halt)
+
+            if db is not None and not (args.verify or args.screenshot):
+                _, latency = db.present()
+                print(f"[+] Flipped to 0x{db.front.base:06X}: "
+                      f"{describe_flip(db.gwin, latency)}")
 
         return 0
 
     except ImportError as e:
         print(f"[-] Missing dependency: {e}")
         return 1
+    except (ValueError, FileNotFoundError) as e:
+        print(f"[-] {e}")
+        return 1
     except OSError as e:
         print(f"[-] I2C error: {e}")
         return 1
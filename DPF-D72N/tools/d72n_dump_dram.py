@@ -26,7 +26,7 @@ Usage:
 import argparse
 import sys
 import time
-from d72n_serdb import D72N_SERDB
+from d72n_serdb import open_serdb, write_hexdump
 
 # DRAM buffer regions (traced from D72N docs)
 DRAM_BUFFERS = {
@@ -44,6 +44,9 @@ MAIN_BUFFER_REGIONS = {
     'extended':   (0x100700, 0x200, 'Extended data'),
 }
 
+# Bytes per progress update / pipelined read call
+READ_CHUNK = 0x400
+
 
 def dump_dram_region(serdb, start, length, output_file=None, show_hex=True,
                      progress=True):
@@ -62,17 +65,19 @@ def dump_dram_region(serdb, start, length, output_file=None, show_hex=True,
     """
     print(f"[*] Reading DRAM 0x{start:06X} - 0x{start+length-1:06X} ({length} bytes)")
 
-    data = bytearray(length)
+    data = bytearray()
     start_time = time.time()
 
-    for i in range(length):
-        data[i] = serdb.read_dram(start + i)
-        if progress and (i + 1) % 256 == 0:
-            pct = ((i + 1) * 100) // length
+    for offset in range(0, length, READ_CHUNK):
+        data += serdb.read_dram_range(start + offset,
+                                      min(READ_CHUNK, length - offset))
+        if progress:
+            done = len(data)
+            pct = (done * 100) // length
             elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed if elapsed > 0 else 0
-            remaining = (length - i - 1) / rate if rate > 0 else 0
-            print(f"\r[*] Progress: {pct}% ({i+1}/{length}) - "
+            rate = done / elapsed if elapsed > 0 else 0
+            remaining = (length - done) / rate if rate > 0 else 0
+            print(f"\r[*] Progress: {pct}% ({done}/{length}) - "
                   f"{rate:.1f} B/s, ETA: {remaining:.0f}s", end='', flush=True)
 
     elapsed = time.time() - start_time
@@ -83,13 +88,15 @@ def dump_dram_region(serdb, start, length, output_file=None, show_hex=True,
             f.write(data)
         print(f"[+] Saved to {output_file}")
 
-    if show_hex and length <= 0x400:  # Only show hex for small dumps
-        print("\n" + serdb.hexdump(data, start))
+    if show_hex:
+        print()
+        write_hexdump(sys.stdout, data, start)
 
     return bytes(data)
 
 
-def dump_buffer(serdb, buffer_name, output_file=None, limit=None):
+def dump_buffer(serdb, buffer_name, output_file=None, limit=None,
+                show_hex=True):
     """Dump a named buffer
 
     Args:
@@ -97,6 +104,7 @@ def dump_buffer(serdb, buffer_name, output_file=None, limit=None):
         buffer_name: Name from DRAM_BUFFERS
         output_file: Optional file to save to
         limit: Limit bytes to read
+        show_hex: Display hexdump
     """
     if buffer_name not in DRAM_BUFFERS:
         print(f"[-] Unknown buffer: {buffer_name}")
@@ -112,7 +120,7 @@ def dump_buffer(serdb, buffer_name, output_file=None, limit=None):
     print(f"{'='*60}")
 
     return dump_dram_region(serdb, start, length, output_file,
-                           show_hex=(length <= 0x400))
+                           show_hex=show_hex)
 
 
 def search_pattern(serdb, pattern_hex, start=0x0C0000, end=0x180000,
@@ -130,27 +138,45 @@ def search_pattern(serdb, pattern_hex, start=0x0C0000, end=0x180000,
     print(f"[*] Searching for pattern {pattern_hex} in DRAM "
           f"0x{start:06X}-0x{end:06X}")
 
+    spans = [(start, end)]
+    if hasattr(serdb, 'regions'):
+        # Offline snapshot: only search what was captured
+        spans = []
+        for region_start, region_len in sorted(serdb.regions('dram')):
+            lo = max(region_start, start)
+            hi = min(region_start + region_len, end)
+            if lo >= hi:
+                continue
+            if spans and lo <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], hi))
+            else:
+                spans.append((lo, hi))
+
     matches = []
-    addr = start
-
-    while addr < end:
-        chunk_len = min(chunk_size, end - addr)
-        data = serdb.read_dram_range(addr, chunk_len)
-
-        # Search for pattern in chunk
-        pos = 0
-        while True:
-            idx = data.find(pattern, pos)
-            if idx == -1:
-                break
-            match_addr = addr + idx
-            matches.append(match_addr)
-            print(f"[+] Found at 0x{match_addr:06X}")
-            pos = idx + 1
-
-        addr += chunk_len
-        pct = ((addr - start) * 100) // (end - start)
-        print(f"\r[*] Searching: {pct}%", end='', flush=True)
+    total = sum(hi - lo for lo, hi in spans)
+    searched = 0
+
+    for span_start, span_end in spans:
+        addr = span_start
+        while addr < span_end:
+            chunk_len = min(chunk_size, span_end - addr)
+            data = bytes(serdb.read_dram_range(addr, chunk_len))
+
+            # Search for pattern in chunk
+            pos = 0
+            while True:
+                idx = data.find(pattern, pos)
+                if idx == -1:
+                    break
+                match_addr = addr + idx
+                matches.append(match_addr)
+                print(f"[+] Found at 0x{match_addr:06X}")
+                pos = idx + 1
+
+            addr += chunk_len
+            searched += chunk_len
+            pct = (searched * 100) // total if total else 100
+            print(f"\r[*] Searching: {pct}%", end='', flush=True)
 
     print(f"\n[+] Found {len(matches)} matches")
     return matches
@@ -167,16 +193,14 @@ def compare_buffers(serdb, addr1, addr2, length):
     """
     print(f"[*] Comparing 0x{addr1:06X} and 0x{addr2:06X} ({length} bytes)")
 
-    differences = []
-    for i in range(length):
-        val1 = serdb.read_dram(addr1 + i)
-        val2 = serdb.read_dram(addr2 + i)
-        if val1 != val2:
-            differences.append((i, val1, val2))
+    data1 = serdb.read_dram_range(addr1, length)
+    data2 = serdb.read_dram_range(addr2, length)
 
-        if (i + 1) % 256 == 0:
-            pct = ((i + 1) * 100) // length
-            print(f"\r[*] Comparing: {pct}%", end='', flush=True)
+    differences = []
+    if data1 != data2:
+        differences = [(i, v1, v2)
+                       for i, (v1, v2) in enumerate(zip(data1, data2))
+                       if v1 != v2]
 
     print(f"\n[+] Found {len(differences)} differences")
 
@@ -209,6 +233,9 @@ Examples:
 
     # Compare two regions
     python3 d72n_dump_dram.py /dev/i2c-1 --compare 0x100000 0x0C0000 0x100
+
+    # Search a saved snapshot (see d72n_snapshot.py) instead of the device
+    python3 d72n_dump_dram.py snap://./snap/ --search DEADBEEF
         """
     )
 
@@ -248,7 +275,7 @@ Examples:
         bus = args.bus
 
     try:
-        with D72N_SERDB(bus) as serdb:
+        with open_serdb(bus) as serdb:
             if not serdb.probe():
                 print("[-] SERDB not responding at 0x59")
                 return 1
@@ -265,7 +292,8 @@ Examples:
                 compare_buffers(serdb, addr1, addr2, length)
 
             elif args.buffer:
-                dump_buffer(serdb, args.buffer, args.output, args.limit)
+                dump_buffer(serdb, args.buffer, args.output, args.limit,
+                            show_hex=not args.no_hex)
 
             elif args.range:
                 start = int(args.range[0], 0)
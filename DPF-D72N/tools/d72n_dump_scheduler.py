@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+D72N Priority Dump Scheduler
+============================
+
+Dump XDATA and DRAM regions in priority order via SERDB.
+
+A SERDB session can end at any moment (watchdog reset, adapter unplugged,
+Ctrl+C). Instead of walking XDATA_REGIONS / DRAM_BUFFERS in dict order, the
+scheduler dumps the most important bytes first and checkpoints after every
+region, so a partial session always holds the highest-value data.
+
+Scheduling rules:
+  - Tasks run by (priority, deadline) - lower priority value first
+  - A task whose deadline has passed is still dumped but marked late
+  - Bulk tasks (priority >= BULK_PRIORITY) are split into chunks and
+    interleaved round-robin in whatever time is left in the budget
+  - After every region/chunk the data file and manifest.json are updated
+
+Default plan (traced addresses):
+  P0  Mailbox status/response, command/params/sync, watchdog, AEON ctrl
+  P1  Main buffer header (0x100030) and parameter block (0x100400)
+  P2  XDATA mailbox/state/gwin regions, remaining main buffer sub-regions
+  P3  XDATA system/riu/extended regions
+  P5  DRAM secondary/main/output buffers (bulk)
+
+Usage:
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --budget 600
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --resume
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --keep-alive
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --task fb_head:0x150000:0x400:0:30
+    python3 d72n_dump_scheduler.py --list
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from d72n_serdb import D72N_SERDB, D72N_ADDR
+from d72n_dump_xdata import XDATA_REGIONS
+from d72n_dump_dram import DRAM_BUFFERS, MAIN_BUFFER_REGIONS
+from d72n_watchdog import D72N_Watchdog, WatchdogKeepAlive, print_keepalive_stats
+
+
+# Tasks at or above this priority are bulk: chunked and interleaved
+BULK_PRIORITY = 5
+
+# Default bulk chunk size (bytes per checkpoint)
+DEFAULT_CHUNK = 0x1000
+
+# Priority of --task entries that do not give one
+DEFAULT_TASK_PRIORITY = 2
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+class DumpTask:
+    """A named memory region to dump
+
+    Args:
+        name: Unique region name (used for the output file)
+        space: 'xdata' or 'dram'
+        start: Start address
+        length: Bytes to read
+        priority: Lower value = dumped earlier
+        deadline: Seconds from session start, or None
+        desc: Human readable description
+    """
+
+    def __init__(self, name, space, start, length, priority, deadline=None,
+                 desc=''):
+        if space not in ('xdata', 'dram'):
+            raise ValueError(f"Unknown address space: {space}")
+        self.name = name
+        self.space = space
+        self.start = start
+        self.length = length
+        self.priority = priority
+        self.deadline = deadline
+        self.desc = desc
+
+    @property
+    def is_bulk(self):
+        return self.priority >= BULK_PRIORITY
+
+    @property
+    def filename(self):
+        if self.space == 'xdata':
+            return f"xdata_{self.name}_{self.start:04X}.bin"
+        return f"dram_{self.name}_{self.start:06X}.bin"
+
+    def sort_key(self):
+        deadline = self.deadline if self.deadline is not None else float('inf')
+        return (self.priority, deadline)
+
+
+def default_tasks():
+    """Build the default dump plan from the traced region tables
+
+    Returns:
+        List of DumpTask
+    """
+    tasks = [
+        # P0 - a few bytes that describe the live IPC/control state
+        DumpTask('mb_status', 'xdata', D72N_ADDR.MAILBOX_STATUS, 5, 0,
+                 desc='Mailbox status + response[0..3]'),
+        DumpTask('mb_command', 'xdata', D72N_ADDR.MAILBOX_CMD, 0x1A, 0,
+                 desc='Mailbox command, params, sync'),
+        DumpTask('watchdog', 'xdata', D72N_ADDR.WDT_STATE, 7, 0,
+                 desc='Watchdog state + counter'),
+        DumpTask('aeon_ctrl', 'xdata', D72N_ADDR.AEON_CTRL, 1, 0,
+                 desc='AEON control register'),
+    ]
+
+    # P1 - decode header/params
+    for name in ('header', 'params'):
+        start, length, desc = MAIN_BUFFER_REGIONS[name]
+        tasks.append(DumpTask(f"main_{name}", 'dram', start, length, 1,
+                              desc=desc))
+
+    # P2 - state-heavy XDATA and the rest of the main buffer sub-regions
+    for name in ('mailbox', 'state', 'gwin'):
+        start, length, desc = XDATA_REGIONS[name]
+        tasks.append(DumpTask(name, 'xdata', start, length, 2, desc=desc))
+    for name, (start, length, desc) in MAIN_BUFFER_REGIONS.items():
+        if name not in ('header', 'params'):
+            tasks.append(DumpTask(f"main_{name}", 'dram', start, length, 2,
+                                  desc=desc))
+
+    # P3 - remaining XDATA regions
+    for name, (start, length, desc) in XDATA_REGIONS.items():
+        if name not in ('mailbox', 'state', 'gwin'):
+            tasks.append(DumpTask(name, 'xdata', start, length, 3, desc=desc))
+
+    # P5 - bulk DRAM buffers
+    for name, (start, length, desc) in DRAM_BUFFERS.items():
+        tasks.append(DumpTask(name, 'dram', start, length, BULK_PRIORITY,
+                              desc=desc))
+
+    return tasks
+
+
+def parse_task(spec):
+    """Parse a --task spec: NAME:ADDR:LEN[:PRIO[:DEADLINE]]
+
+    ADDR is a DRAM address above 0xFFFF and an XDATA address otherwise;
+    prefix it with 'xdata@' or 'dram@' to choose explicitly. DEADLINE is
+    in seconds from session start.
+
+    Returns:
+        DumpTask
+    """
+    parts = spec.split(':')
+    if not 3 <= len(parts) <= 5 or not parts[0]:
+        raise ValueError(f"Bad task '{spec}' (NAME:ADDR:LEN[:PRIO[:DEADLINE]])")
+
+    name, addr = parts[0], parts[1]
+    space = None
+    if '@' in addr:
+        space, addr = addr.split('@', 1)
+    start = int(addr, 0)
+    if space is None:
+        space = 'dram' if start > 0xFFFF else 'xdata'
+    length = int(parts[2], 0)
+    priority = int(parts[3]) if len(parts) > 3 and parts[3] else DEFAULT_TASK_PRIORITY
+    deadline = float(parts[4]) if len(parts) > 4 and parts[4] else None
+    return DumpTask(name, space, start, length, priority, deadline,
+                    desc='Custom task')
+
+
+def merge_tasks(tasks, custom):
+    """Add custom tasks; one with a default task's name replaces it"""
+    defaults = {t.name: t for t in tasks}
+    for task in custom:
+        if task.name in defaults:
+            task.desc = defaults[task.name].desc
+    names = {t.name for t in custom}
+    return [t for t in tasks if t.name not in names] + list(custom)
+
+
+# =============================================================================
+# Manifest
+# =============================================================================
+
+def load_manifest(output_dir):
+    """Load manifest.json from a session directory
+
+    Returns:
+        Manifest dictionary, or None if missing
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(output_dir, manifest):
+    """Atomically write manifest.json to a session directory"""
+    manifest['updated'] = time.time()
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def new_manifest(**meta):
+    """Create an empty manifest"""
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'created': time.time(),
+        'updated': time.time(),
+        'regions': [],
+    }
+    manifest.update(meta)
+    return manifest
+
+
+def manifest_entry(manifest, name):
+    """Find a region entry by name"""
+    for entry in manifest['regions']:
+        if entry['name'] == name:
+            return entry
+    return None
+
+
+# =============================================================================
+# Scheduler
+# =============================================================================
+
+class DumpScheduler:
+    """Priority-ordered, checkpointing region dumper
+
+    Args:
+        serdb: D72N_SERDB instance
+        output_dir: Session directory (created if missing)
+        tasks: List of DumpTask (default: default_tasks())
+        budget: Session time budget in seconds (None = unlimited)
+        chunk_size: Bulk chunk size in bytes
+    """
+
+    def __init__(self, serdb, output_dir, tasks=None, budget=None,
+                 chunk_size=DEFAULT_CHUNK):
+        self.serdb = serdb
+        self.output_dir = output_dir
+        self.tasks = sorted(tasks if tasks is not None else default_tasks(),
+                            key=DumpTask.sort_key)
+        self.budget = budget
+        self.chunk_size = chunk_size
+        self.manifest = None
+        self._t0 = None
+
+    def elapsed(self):
+        return time.time() - self._t0
+
+    def time_left(self):
+        if self.budget is None:
+            return float('inf')
+        return self.budget - self.elapsed()
+
+    def _read(self, task, offset, length):
+        addr = task.start + offset
+        if task.space == 'xdata':
+            return self.serdb.read_xdata_range(addr, length)
+        return self.serdb.read_dram_range(addr, length)
+
+    def _entry(self, task):
+        entry = manifest_entry(self.manifest, task.name)
+        if entry is None:
+            entry = {
+                'name': task.name,
+                'space': task.space,
+                'start': task.start,
+                'length': task.length,
+                'file': task.filename,
+                'priority': task.priority,
+                'deadline': task.deadline,
+                'desc': task.desc,
+                'done': 0,
+                'elapsed': 0.0,
+                'late': False,
+            }
+            self.manifest['regions'].append(entry)
+        return entry
+
+    def _dump_span(self, task, entry, length):
+        """Read the next `length` bytes of a task and checkpoint them"""
+        offset = entry['done']
+        start_time = time.time()
+        data = self._read(task, offset, length)
+        duration = time.time() - start_time
+
+        path = os.path.join(self.output_dir, task.filename)
+        mode = 'r+b' if os.path.exists(path) else 'wb'
+        with open(path, mode) as f:
+            f.seek(offset)
+            f.write(data)
+
+        entry['done'] = offset + length
+        entry['elapsed'] += duration
+        write_manifest(self.output_dir, self.manifest)
+        return duration
+
+    def _run_task(self, task):
+        entry = self._entry(task)
+        remaining = task.length - entry['done']
+        if remaining <= 0:
+            return
+
+        if task.deadline is not None and self.elapsed() > task.deadline:
+            entry['late'] = True
+
+        print(f"[*] P{task.priority} {task.name:<17} {task.space:<5} "
+              f"0x{task.start:06X} +0x{task.length:X}  {task.desc}")
+        duration = self._dump_span(task, entry, remaining)
+
+        if task.deadline is not None and self.elapsed() > task.deadline:
+            entry['late'] = True
+            write_manifest(self.output_dir, self.manifest)
+
+        rate = remaining / duration if duration > 0 else 0
+        late = "  (LATE)" if entry['late'] else ""
+        print(f"[+] {task.name}: {remaining} bytes in {duration:.1f}s "
+              f"({rate:.1f} B/s){late}")
+
+    def _run_bulk(self, bulk):
+        """Round-robin bulk chunks until done or out of budget"""
+        pending = [t for t in bulk
+                   if self._entry(t)['done'] < t.length]
+        rate = None
+
+        while pending:
+            for task in list(pending):
+                entry = self._entry(task)
+                length = min(self.chunk_size, task.length - entry['done'])
+
+                # Skip the chunk if it cannot finish inside the budget
+                if rate and length / rate > self.time_left():
+                    print("\n[*] Budget exhausted - stopping bulk dump")
+                    return False
+                if self.time_left() <= 0:
+                    print("\n[*] Budget exhausted - stopping bulk dump")
+                    return False
+
+                duration = self._dump_span(task, entry, length)
+                if duration > 0:
+                    rate = length / duration
+
+                pct = (entry['done'] * 100) // task.length
+                print(f"\r[*] Bulk {task.name:<10} {pct:3d}% "
+                      f"({entry['done']}/{task.length})", end='', flush=True)
+
+                if entry['done'] >= task.length:
+                    pending.remove(task)
+                    print(f"\n[+] Bulk {task.name} complete")
+
+        return True
+
+    def run(self, resume=False):
+        """Run the dump session
+
+        Args:
+            resume: Continue an existing session in output_dir
+
+        Returns:
+            Manifest dictionary
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.manifest = load_manifest(self.output_dir) if resume else None
+        if self.manifest is None:
+            self.manifest = new_manifest(kind='scheduled')
+        self._t0 = time.time()
+
+        critical = [t for t in self.tasks if not t.is_bulk]
+        bulk = [t for t in self.tasks if t.is_bulk]
+
+        for task in critical:
+            if self.time_left() <= 0:
+                print("[*] Budget exhausted")
+                break
+            self._run_task(task)
+        else:
+            if bulk:
+                print(f"[*] Interleaving {len(bulk)} bulk regions "
+                      f"({self.chunk_size}-byte chunks)")
+                self._run_bulk(bulk)
+
+        write_manifest(self.output_dir, self.manifest)
+        return self.manifest
+
+
+def print_plan(tasks):
+    """Print a dump plan in execution order"""
+    print(f"{'Pri':<4} {'Name':<17} {'Space':<6} {'Start':<10} {'Length':<9} "
+          f"{'Deadline':<9} Description")
+    print("-" * 81)
+    for task in sorted(tasks, key=DumpTask.sort_key):
+        deadline = f"{task.deadline:.0f}s" if task.deadline is not None else '-'
+        bulk = ' (bulk)' if task.is_bulk else ''
+        print(f"P{task.priority:<3} {task.name:<17} {task.space:<6} "
+              f"0x{task.start:06X}  0x{task.length:<6X} {deadline:<9} "
+              f"{task.desc}{bulk}")
+
+
+def print_summary(manifest):
+    """Print session progress from a manifest"""
+    total = sum(e['length'] for e in manifest['regions'])
+    done = sum(e['done'] for e in manifest['regions'])
+    complete = sum(1 for e in manifest['regions'] if e['done'] >= e['length'])
+    late = sum(1 for e in manifest['regions'] if e['late'])
+    print()
+    print(f"[+] Regions complete: {complete}/{len(manifest['regions'])} "
+          f"({late} late)")
+    print(f"[+] Bytes dumped:     {done}/{total}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Priority Dump Scheduler',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Dump everything, most important regions first
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/
+
+    # Give up on bulk DRAM after 10 minutes
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --budget 600
+
+    # Continue an interrupted session
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --resume
+
+    # Leave the watchdog enabled, feed it in the background
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ --keep-alive
+
+    # Extra region: first 1KB of the output buffer, P0, due within 30s
+    python3 d72n_dump_scheduler.py /dev/i2c-1 -o ./session/ \\
+        --task fb_head:0x150000:0x400:0:30
+
+    # Give a default region a deadline (same name replaces it)
+    python3 d72n_dump_scheduler.py --list --task watchdog:0x44CE:7:0:5
+
+    # Show the default plan
+    python3 d72n_dump_scheduler.py --list
+
+Task spec: NAME:ADDR:LEN[:PRIO[:DEADLINE]]
+    ADDR above 0xFFFF is DRAM, otherwise XDATA (or prefix xdata@/dram@)
+    PRIO defaults to 2; DEADLINE is seconds from session start
+        """
+    )
+
+    parser.add_argument('bus', nargs='?', help='I2C bus (e.g., /dev/i2c-1)')
+    parser.add_argument('-o', '--output-dir', help='Session output directory')
+    parser.add_argument('--budget', type=float,
+                        help='Session time budget in seconds')
+    parser.add_argument('--chunk-size', type=lambda x: int(x, 0),
+                        default=DEFAULT_CHUNK,
+                        help=f'Bulk chunk size (default: 0x{DEFAULT_CHUNK:X})')
+    parser.add_argument('--no-bulk', action='store_true',
+                        help='Skip bulk DRAM buffers')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume session in output directory')
+    parser.add_argument('--list', action='store_true',
+                        help='Show dump plan and exit')
+    parser.add_argument('--keep-alive', action='store_true',
+                        help='Feed the watchdog in the background while dumping')
+    parser.add_argument('--task', action='append', default=[],
+                        metavar='NAME:ADDR:LEN[:PRIO[:DEADLINE]]',
+                        help='Add a region (repeatable; same name replaces a default)')
+
+    args = parser.parse_args()
+
+    try:
+        custom = [parse_task(spec) for spec in args.task]
+    except ValueError as e:
+        parser.error(str(e))
+
+    tasks = merge_tasks(default_tasks(), custom)
+    if args.no_bulk:
+        tasks = [t for t in tasks if not t.is_bulk]
+
+    if args.list:
+        print_plan(tasks)
+        return 0
+
+    if not args.bus or not args.output_dir:
+        parser.error("bus and --output-dir are required")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with D72N_SERDB(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            print("[+] SERDB connection established")
+
+            scheduler = DumpScheduler(serdb, args.output_dir, tasks,
+                                      budget=args.budget,
+                                      chunk_size=args.chunk_size)
+
+            keepalive = None
+            if args.keep_alive:
+                keepalive = WatchdogKeepAlive(D72N_Watchdog(serdb)).start()
+
+            try:
+                manifest = scheduler.run(resume=args.resume)
+            except KeyboardInterrupt:
+                print("\n[*] Interrupted - checkpoint saved")
+                manifest = scheduler.manifest
+            finally:
+                if keepalive:
+                    keepalive.stop()
+
+            if manifest:
+                print_summary(manifest)
+            if keepalive:
+                if keepalive.error:
+                    print(f"[-] Keep-alive stopped: {keepalive.error}")
+                print_keepalive_stats(keepalive.stats())
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,16 +14,22 @@ XDATA Memory Map (traced from D72N 8051 blocks):
   0x6000-0x6FFF  GWin/Display control
   0x7000-0xFFFF  Buffers/Stack
 
+Full snapshots (--full) read in groups of --depth accesses per lock
+hold (one combined I2C transfer each on queued backends, see
+d72n_serdb.py), and --stop-mcu freezes the 8051 for a consistent image.
+
 Usage:
     python3 d72n_dump_xdata.py /dev/i2c-1 --range 0x4000 0x1000 -o mailbox.bin
     python3 d72n_dump_xdata.py /dev/i2c-1 --full -o xdata_full.bin
+    python3 d72n_dump_xdata.py /dev/i2c-1 --full --stop-mcu -o xdata_full.bin
     python3 d72n_dump_xdata.py /dev/i2c-1 --regions
 """
 
 import argparse
 import sys
 import time
-from d72n_serdb import D72N_SERDB
+from d72n_serdb import open_serdb, write_hexdump, DEFAULT_PIPELINE_DEPTH
+from d72n_varmap import ReadPlan
 
 # Key XDATA regions (traced from D72N docs)
 XDATA_REGIONS = {
@@ -35,6 +41,9 @@ XDATA_REGIONS = {
     'extended': (0x5000, 0x1000, 'Extended state'),
 }
 
+# Bytes per progress update / pipelined read call
+READ_CHUNK = 0x100
+
 
 def dump_region(serdb, start, length, output_file=None, show_hex=True):
     """Dump a region of XDATA
@@ -48,18 +57,19 @@ def dump_region(serdb, start, length, output_file=None, show_hex=True):
     """
     print(f"[*] Reading XDATA 0x{start:04X} - 0x{start+length-1:04X} ({length} bytes)")
 
-    data = bytearray(length)
+    data = bytearray()
     start_time = time.time()
 
-    for i in range(length):
-        data[i] = serdb.read_xdata(start + i)
-        if (i + 1) % 256 == 0:
-            pct = ((i + 1) * 100) // length
-            elapsed = time.time() - start_time
-            rate = (i + 1) / elapsed if elapsed > 0 else 0
-            remaining = (length - i - 1) / rate if rate > 0 else 0
-            print(f"\r[*] Progress: {pct}% ({i+1}/{length}) - "
-                  f"{rate:.1f} B/s, ETA: {remaining:.0f}s", end='', flush=True)
+    for offset in range(0, length, READ_CHUNK):
+        data += serdb.read_xdata_range(start + offset,
+                                       min(READ_CHUNK, length - offset))
+        done = len(data)
+        pct = (done * 100) // length
+        elapsed = time.time() - start_time
+        rate = done / elapsed if elapsed > 0 else 0
+        remaining = (length - done) / rate if rate > 0 else 0
+        print(f"\r[*] Progress: {pct}% ({done}/{length}) - "
+              f"{rate:.1f} B/s, ETA: {remaining:.0f}s", end='', flush=True)
 
     elapsed = time.time() - start_time
     print(f"\n[+] Read {length} bytes in {elapsed:.1f}s ({length/elapsed:.1f} B/s)")
@@ -70,11 +80,109 @@ def dump_region(serdb, start, length, output_file=None, show_hex=True):
         print(f"[+] Saved to {output_file}")
 
     if show_hex:
-        print("\n" + serdb.hexdump(data, start))
+        print()
+        write_hexdump(sys.stdout, data, start)
 
     return bytes(data)
 
 
+def snapshot_xdata(serdb, start=0x0000, length=0x10000, depth=None,
+                   stop_mcu=False, chunk=0x400, progress=True):
+    """Pipelined XDATA snapshot
+
+    Reads `depth` address-set/read accesses per group (one combined
+    transfer on queued backends). With stop_mcu the 8051 is frozen for
+    the capture, so the image is consistent; otherwise values may drift
+    across the consistency window (time between first and last byte
+    read).
+
+    Args:
+        serdb: D72N_SERDB instance
+        start: Start address
+        length: Bytes to read (default: full 64KB)
+        depth: Pipeline depth (default: serdb.pipeline_depth)
+        stop_mcu: Stop the MCU during the capture
+        chunk: Bytes per progress update
+        progress: Show progress
+
+    Returns:
+        Dictionary with data, wall_time, window, frozen, rate
+    """
+    data = bytearray()
+    start_time = time.time()
+    frozen_at = None
+    first_read = None
+
+    if stop_mcu:
+        serdb.stop_mcu()
+        frozen_at = time.time()
+
+    try:
+        for offset in range(0, length, chunk):
+            n = min(chunk, length - offset)
+            if first_read is None:
+                first_read = time.time()
+            data += serdb.read_xdata_range(start + offset, n, depth)
+            if progress:
+                pct = (len(data) * 100) // length
+                print(f"\r[*] Snapshot: {pct}% ({len(data)}/{length})",
+                      end='', flush=True)
+        last_read = time.time()
+    finally:
+        if stop_mcu:
+            serdb.resume_mcu()
+
+    end_time = time.time()
+    if progress:
+        print()
+
+    wall_time = end_time - start_time
+    return {
+        'data': bytes(data),
+        'wall_time': wall_time,
+        'window': last_read - first_read if first_read else 0.0,
+        'frozen': end_time - frozen_at if frozen_at else 0.0,
+        'rate': length / wall_time if wall_time > 0 else 0.0,
+    }
+
+
+def dump_snapshot(serdb, output_file=None, depth=None, stop_mcu=False,
+                  show_hex=True):
+    """Take a full XDATA snapshot and report timing
+
+    Args:
+        serdb: D72N_SERDB instance
+        output_file: Optional file to save to
+        depth: Pipeline depth (default: serdb.pipeline_depth)
+        stop_mcu: Stop the MCU for a consistent image
+        show_hex: Display hexdump
+    """
+    depth = depth or serdb.pipeline_depth
+    print(f"[*] XDATA snapshot 0x0000 - 0xFFFF (depth {depth}"
+          f"{', MCU stopped' if stop_mcu else ''})")
+
+    snap = snapshot_xdata(serdb, depth=depth, stop_mcu=stop_mcu)
+
+    print(f"[+] Wall time:          {snap['wall_time']:.2f}s "
+          f"({snap['rate']:.1f} B/s)")
+    if stop_mcu:
+        print(f"[+] Consistency window: 0 (MCU frozen {snap['frozen']:.2f}s)")
+    else:
+        print(f"[+] Consistency window: {snap['window']:.2f}s "
+              f"(values may drift; use --stop-mcu)")
+
+    if output_file:
+        with open(output_file, 'wb') as f:
+            f.write(snap['data'])
+        print(f"[+] Saved to {output_file}")
+
+    if show_hex:
+        print()
+        write_hexdump(sys.stdout, snap['data'], 0x0000)
+
+    return snap
+
+
 def dump_all_regions(serdb, output_dir=None):
     """Dump all known XDATA regions
 
@@ -99,6 +207,17 @@ def dump_all_regions(serdb, output_dir=None):
         dump_region(serdb, start, length, output_file, show_hex=True)
 
 
+# Key variables (traced from D72N documentation, see d72n_varmap.py)
+KEY_VARIABLES = [
+    'mailbox_cmd', 'mailbox_params', 'mailbox_sync',
+    'mailbox_status', 'mailbox_response',
+    'aeon_ctrl',
+    'wdt_state', 'wdt_counter',
+    'state_primary', 'state_secondary', 'state_decode', 'state_storage',
+    'gwin_primary', 'gwin_secondary', 'gwin_enable_ctrl',
+]
+
+
 def dump_key_variables(serdb):
     """Dump key state variables
 
@@ -108,44 +227,22 @@ def dump_key_variables(serdb):
     print("D72N Key State Variables")
     print("=" * 60)
 
-    variables = [
-        # Mailbox (traced from block 02)
-        (0x4401, 'Mailbox Command'),
-        (0x4402, 'Mailbox Param[0]'),
-        (0x4417, 'Mailbox Sync'),
-        (0x40FB, 'Mailbox Status'),
-        (0x40FC, 'Mailbox Response[0]'),
-        (0x40FD, 'Mailbox Response[1]'),
-        (0x40FE, 'Mailbox Response[2]'),
-        (0x40FF, 'Mailbox Response[3]'),
-
-        # AEON Control (traced from block 01)
-        (0x0FE6, 'AEON Control'),
-
-        # Watchdog (traced from blocks 15, 16)
-        (0x44CE, 'Watchdog State'),
-        (0x44D3, 'Watchdog Counter Lo'),
-        (0x44D4, 'Watchdog Counter Hi'),
-
-        # Primary State (high ref count)
-        (0x4800, 'Primary State[0]'),
-        (0x4801, 'Primary State[1]'),
-        (0x4185, 'Secondary State'),
-        (0x4A9D, 'Decode State'),
-        (0x4100, 'Storage State'),
-
-        # GWin (traced from multiple blocks)
-        (0x6EA8, 'GWin Primary'),
-        (0x6FA8, 'GWin Secondary'),
-        (0x6EE0, 'GWin Enable'),
-    ]
+    plan = ReadPlan(KEY_VARIABLES)
+    snap = plan.read(serdb)
 
     print(f"{'Address':<10} {'Name':<25} {'Value':<10} {'Binary':<10}")
     print("-" * 60)
 
-    for addr, name in variables:
-        val = serdb.read_xdata(addr)
-        print(f"0x{addr:04X}     {name:<25} 0x{val:02X}       {val:08b}")
+    for var in plan.variables:
+        val = snap[var.name]
+        if var.endian is None:
+            print(f"0x{var.addr:04X}     {var.name:<25} "
+                  f"{' '.join(f'{b:02X}' for b in val)}")
+        else:
+            bits = var.width * 8
+            print(f"0x{var.addr:04X}     {var.name:<25} "
+                  f"0x{val:0{var.width * 2}X}{'':<{8 - var.width * 2}} "
+                  f"{val:0{bits}b}")
 
 
 def main():
@@ -160,9 +257,12 @@ Examples:
     # Dump all known regions
     python3 d72n_dump_xdata.py /dev/i2c-1 --regions --output-dir ./xdata_dumps/
 
-    # Dump full 64KB XDATA (slow!)
+    # Dump full 64KB XDATA (pipelined)
     python3 d72n_dump_xdata.py /dev/i2c-1 --full -o xdata_full.bin
 
+    # Consistent full snapshot with the MCU stopped
+    python3 d72n_dump_xdata.py /dev/i2c-1 --full --stop-mcu -o xdata_full.bin
+
     # Show key variables only
     python3 d72n_dump_xdata.py /dev/i2c-1 --variables
         """
@@ -172,7 +272,12 @@ Examples:
     parser.add_argument('--range', nargs=2, metavar=('START', 'LENGTH'),
                         help='Dump specific range')
     parser.add_argument('--full', action='store_true',
-                        help='Dump full 64KB XDATA')
+                        help='Dump full 64KB XDATA (pipelined snapshot)')
+    parser.add_argument('--depth', type=int,
+                        help='Pipeline depth for --full (default: the bus '
+                             f'spec ?depth=N, else {DEFAULT_PIPELINE_DEPTH})')
+    parser.add_argument('--stop-mcu', action='store_true',
+                        help='Stop MCU during --full for a consistent image')
     parser.add_argument('--regions', action='store_true',
                         help='Dump all known regions')
     parser.add_argument('--variables', action='store_true',
@@ -191,7 +296,7 @@ Examples:
         bus = args.bus
 
     try:
-        with D72N_SERDB(bus) as serdb:
+        with open_serdb(bus) as serdb:
             if not serdb.probe():
                 print("[-] SERDB not responding at 0x59")
                 return 1
@@ -205,8 +310,9 @@ Examples:
                 dump_all_regions(serdb, args.output_dir)
 
             elif args.full:
-                dump_region(serdb, 0x0000, 0x10000, args.output,
-                           show_hex=not args.no_hex)
+                dump_snapshot(serdb, args.output, depth=args.depth,
+                              stop_mcu=args.stop_mcu,
+                              show_hex=not args.no_hex)
 
             elif args.range:
                 start = int(args.range[0], 0)
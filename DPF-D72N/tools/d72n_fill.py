@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+D72N Fill Engine
+================
+
+Large uniform fills and copies in DRAM over pipelined host writes, with
+an optional hook for an AEON-side helper.
+
+Host cost of a full-screen fill is ~450K SERDB transactions (XDMIU
+high byte + data per byte). With a helper, it would be one
+control-block write plus a few polls.
+
+The engine is HOST-ONLY until a verified helper exists. No helper
+ships, and no free DRAM area for one has been identified, so there
+are no default helper or control block addresses: the helper path is
+used only when --ctrl (FillEngine ctrl_addr) is given explicitly.
+
+Helper protocol
+---------------
+The helper is a user-supplied AEON blob (none is shipped: no AEON
+memset/memcpy has been traced or verified on this firmware). It is
+uploaded through the shellcode path (d72n_shellcode_inject.py), to an
+address the user has verified is unused, and
+must hook itself into AEON's main loop. It talks to the host through a
+control block in DRAM (big-endian, like mailbox addresses):
+
+  +0x00  magic    'FILL' - written by the helper when it is running
+  +0x04  op       1 = fill (pattern repeated), 2 = copy
+  +0x05  plen     Pattern length (1, 2 or 4)
+  +0x08  dst      Destination address
+  +0x0C  src      Source address (copy) or pattern (fill, left-aligned)
+  +0x10  length   Byte count
+  +0x14  state    Host writes GO (0x01); helper writes DONE (0x02)
+                  or ERROR (0xEE)
+
+The block is written as one DRAM range with state last, so the helper
+never sees GO before the parameters. An optional mailbox command can
+be sent as a doorbell after the write (--trigger-cmd).
+
+If the helper does not answer (no magic, timeout, error), the engine
+falls back to host writes (pipelined write_dram_range).
+
+install refuses helper or control block addresses inside the known
+firmware buffers (0x0C0000 secondary, 0x100000-0x150000 AEON decode,
+0x150000 output) or over DRAM that is not uniformly 00/FF, unless
+--force is given.
+
+Usage:
+    python3 d72n_fill.py /dev/i2c-1 fill 0x150000 224640 --pattern 00F8
+    python3 d72n_fill.py /dev/i2c-1 copy 0x0C0000 0x150000 224640
+    python3 d72n_fill.py /dev/i2c-1 install helper.bin --helper-addr ADDR --ctrl ADDR
+    python3 d72n_fill.py /dev/i2c-1 status --ctrl ADDR
+"""
+
+import argparse
+import struct
+import sys
+import time
+from d72n_serdb import open_serdb, D72N_ADDR
+from d72n_shellcode_inject import D72N_Injector
+from d72n_mailbox import D72N_Mailbox
+from d72n_spans import SpanPlanner
+
+
+# DRAM the firmware is known to use: (start, end, name). The decode
+# buffer is assumed to run up to the output buffer.
+FRAME_BYTES = 480 * 234 * 2
+BUSY_REGIONS = [
+    (D72N_ADDR.DRAM_SECONDARY, D72N_ADDR.DRAM_SECONDARY + FRAME_BYTES,
+     'secondary buffer'),
+    (D72N_ADDR.DRAM_MAIN_BUFFER, D72N_ADDR.DRAM_OUTPUT, 'AEON decode buffer'),
+    (D72N_ADDR.DRAM_OUTPUT, D72N_ADDR.DRAM_OUTPUT + FRAME_BYTES,
+     'output buffer'),
+]
+
+HELPER_MAGIC = b'FILL'
+OP_FILL = 0x01
+OP_COPY = 0x02
+STATE_GO = 0x01
+STATE_DONE = 0x02
+STATE_ERROR = 0xEE
+
+CTRL_STATE = 0x14        # Offset of the state byte
+
+# Below this size host writes beat a helper round trip
+DEFAULT_MIN_HELPER_BYTES = 256
+
+# Host fallback write chunk (progress granularity)
+HOST_CHUNK = 4096
+
+
+class FillEngine:
+    """DRAM fill/copy with optional AEON helper offload
+
+    Args:
+        serdb: D72N_SERDB instance
+        ctrl_addr: Helper control block address (None = host only)
+        trigger_cmd: Mailbox command sent after GO (None = control word only)
+        timeout: Seconds to wait for DONE
+        min_helper_bytes: Smaller operations always use the host path
+    """
+
+    def __init__(self, serdb, ctrl_addr=None, trigger_cmd=None,
+                 timeout=1.0, min_helper_bytes=DEFAULT_MIN_HELPER_BYTES):
+        self.serdb = serdb
+        self.ctrl_addr = ctrl_addr
+        self.trigger_cmd = trigger_cmd
+        self.timeout = timeout
+        self.min_helper_bytes = min_helper_bytes
+        self.mb = D72N_Mailbox(serdb) if trigger_cmd is not None else None
+
+        self._available = None  # Unknown until probed
+        self.helper_ops = 0
+        self.host_ops = 0
+        self.host_bytes = 0
+
+    # ==========================================================================
+    # Helper
+    # ==========================================================================
+
+    def check_free(self, addr, length):
+        """Raise ValueError unless [addr, addr + length) looks unused
+
+        The range must not overlap BUSY_REGIONS and must read back as a
+        single repeated 0x00 or 0xFF byte.
+        """
+        end = addr + length
+        for start, stop, name in BUSY_REGIONS:
+            if addr < stop and start < end:
+                raise ValueError(f"0x{addr:06X}-0x{end:06X} overlaps the "
+                                 f"{name} (0x{start:06X}-0x{stop:06X})")
+        data = self.serdb.read_dram_range(addr, length)
+        if data.strip(data[:1]) or data[:1] not in (b'\x00', b'\xff'):
+            raise ValueError(f"0x{addr:06X}-0x{end:06X} is in use "
+                             f"(not blank); pass --force to overwrite")
+
+    def install(self, blob, addr, force=False):
+        """Upload a helper blob through the shellcode path
+
+        Unless `force`, both the blob and the control block ranges must
+        pass check_free(). Writes the blob (with verification) and
+        clears the control block. The helper announces itself by
+        writing the magic.
+
+        Returns:
+            True if the blob verified
+        """
+        if self.ctrl_addr is None:
+            raise ValueError("install needs a control block address")
+        ctrl_end = self.ctrl_addr + CTRL_STATE + 1
+        if addr < ctrl_end and self.ctrl_addr < addr + len(blob):
+            raise ValueError("helper and control block overlap")
+        if not force:
+            self.check_free(addr, len(blob))
+            self.check_free(self.ctrl_addr, CTRL_STATE + 1)
+
+        injector = D72N_Injector(self.serdb)
+        ok = injector.write_shellcode_direct(addr, blob)
+        self.serdb.write_dram_range(self.ctrl_addr, bytes(CTRL_STATE + 1))
+        self._available = None
+        return ok
+
+    def available(self):
+        """True if a helper has announced itself (cached)
+
+        Always False without a control block address (host only).
+        """
+        if self.ctrl_addr is None:
+            return False
+        if self._available is None:
+            magic = self.serdb.read_dram_range(self.ctrl_addr, 4)
+            self._available = magic == HELPER_MAGIC
+        return self._available
+
+    def _helper(self, op, dst, src, length, plen=0):
+        """Run one helper operation, returns True on DONE"""
+        block = bytearray(CTRL_STATE + 1)
+        block[0:4] = HELPER_MAGIC
+        block[4] = op
+        block[5] = plen
+        struct.pack_into('>III', block, 8, dst, src, length)
+        block[CTRL_STATE] = STATE_GO
+        # Skip the magic: the helper owns it
+        self.serdb.write_dram_range(self.ctrl_addr + 4, block[4:])
+        if self.mb is not None:
+            self.mb.write_command(self.trigger_cmd)
+
+        deadline = time.time() + self.timeout
+        while time.time() < deadline:
+            state = self.serdb.read_dram(self.ctrl_addr + CTRL_STATE)
+            if state == STATE_DONE:
+                self.helper_ops += 1
+                return True
+            if state == STATE_ERROR:
+                break
+            time.sleep(0.001)
+
+        # Do not retry a helper that failed or stopped answering
+        self._available = False
+        return False
+
+    def _use_helper(self, length):
+        return length >= self.min_helper_bytes and self.available()
+
+    # ==========================================================================
+    # Operations
+    # ==========================================================================
+
+    def _host_write(self, addr, data, progress=False):
+        for pos in range(0, len(data), HOST_CHUNK):
+            self.serdb.write_dram_range(addr + pos, data[pos:pos + HOST_CHUNK])
+            if progress:
+                print(f"\rWriting: {(pos * 100) // len(data)}%",
+                      end='', flush=True)
+        if progress:
+            print("\rWriting: 100%")
+        self.host_ops += 1
+        self.host_bytes += len(data)
+
+    def fill(self, addr, length, pattern, progress=False):
+        """Fill length bytes at addr with a repeated 1/2/4-byte pattern
+
+        Returns:
+            'helper' or 'host'
+        """
+        pattern = bytes(pattern)
+        if len(pattern) not in (1, 2, 4):
+            raise ValueError("pattern must be 1, 2 or 4 bytes")
+
+        if self._use_helper(length):
+            src = int.from_bytes(pattern.ljust(4, b'\x00'), 'big')
+            if self._helper(OP_FILL, addr, src, length, len(pattern)):
+                return 'helper'
+
+        data = (pattern * (length // len(pattern) + 1))[:length]
+        self._host_write(addr, data, progress)
+        return 'host'
+
+    def copy(self, dst, src, length, progress=False):
+        """Copy length bytes from src to dst
+
+        Returns:
+            'helper' or 'host'
+        """
+        if self._use_helper(length):
+            if self._helper(OP_COPY, dst, src, length):
+                return 'helper'
+
+        data = self.serdb.read_dram_range(src, length, progress=progress)
+        self._host_write(dst, data, progress)
+        return 'host'
+
+    def fill_spans(self, base, spans, pattern):
+        """Fill planned spans (see d72n_spans.py)"""
+        path = None
+        for offset, length in spans:
+            path = self.fill(base + offset, length, pattern)
+        return path
+
+    def fill_rect(self, base, width, height, x, y, w, h, color, bpp=2):
+        """Fill a clipped rectangle in a width x height linear buffer
+
+        Full-width rectangles are one contiguous fill; others are one
+        fill per row.
+        """
+        spans = SpanPlanner(width, height, bpp).rect(x, y, w, h)
+        return self.fill_spans(base, spans, color.to_bytes(bpp, 'little'))
+
+    def stats(self):
+        return {
+            'helper': bool(self._available),
+            'helper_ops': self.helper_ops,
+            'host_ops': self.host_ops,
+            'host_bytes': self.host_bytes,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Fill Engine',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Commands:
+    status                  Show whether a helper is answering (--ctrl)
+    install FILE            Upload helper blob (--helper-addr, --ctrl)
+    fill ADDR LEN           Fill with --pattern (hex, 1/2/4 bytes)
+    copy SRC DST LEN        Copy DRAM range
+
+Examples:
+    # Full-screen RED (RGB565 0xF800 = bytes 00 F8)
+    python3 d72n_fill.py /dev/i2c-1 fill 0x150000 224640 --pattern 00F8
+
+    # Copy secondary buffer to the output buffer
+    python3 d72n_fill.py /dev/i2c-1 copy 0x0C0000 0x150000 224640
+
+    # Install a helper at addresses you have verified are unused,
+    # then use it with a mailbox doorbell
+    python3 d72n_fill.py /dev/i2c-1 install helper.bin --helper-addr ADDR --ctrl CTRL
+    python3 d72n_fill.py /dev/i2c-1 fill 0x150000 224640 --pattern 1F00 --ctrl CTRL --trigger-cmd 0x7F
+
+Host only until a verified helper exists: no helper blob ships with
+these tools and there are no default helper or control block
+addresses. Without --ctrl every operation uses pipelined host writes.
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
+    parser.add_argument('command', choices=['status', 'install', 'fill', 'copy'])
+    parser.add_argument('args', nargs='*', help='Command arguments')
+    parser.add_argument('--pattern', default='00',
+                        help='Fill pattern, hex bytes (default: 00)')
+    parser.add_argument('--ctrl', type=lambda x: int(x, 0),
+                        help='Helper control block address (default: none, '
+                             'host only)')
+    parser.add_argument('--helper-addr', type=lambda x: int(x, 0),
+                        help='Helper load address (required for install)')
+    parser.add_argument('--force', action='store_true',
+                        help='Install without checking the DRAM is unused')
+    parser.add_argument('--host', action='store_true',
+                        help='Never use the helper')
+    parser.add_argument('--trigger-cmd', type=lambda x: int(x, 0),
+                        help='Mailbox command to send as doorbell')
+    parser.add_argument('--timeout', '-t', type=float, default=1.0,
+                        help='Helper timeout in seconds (default: 1.0)')
+
+    args = parser.parse_args()
+
+    expected = {'status': 0, 'install': 1, 'fill': 2, 'copy': 3}[args.command]
+    if len(args.args) != expected:
+        parser.error(f"{args.command} takes {expected} argument(s)")
+    if args.command == 'install' and (args.helper_addr is None or args.ctrl is None):
+        parser.error("install needs --helper-addr and --ctrl")
+    if args.command == 'status' and args.ctrl is None:
+        parser.error("status needs --ctrl")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            engine = FillEngine(serdb, ctrl_addr=args.ctrl,
+                                trigger_cmd=args.trigger_cmd,
+                                timeout=args.timeout)
+            if args.host:
+                engine._available = False
+
+            if args.command == 'status':
+                state = 'answering' if engine.available() else 'not installed'
+                print(f"[*] Helper at control block 0x{args.ctrl:06X}: {state}")
+                return 0
+
+            if args.command == 'install':
+                with open(args.args[0], 'rb') as f:
+                    blob = f.read()
+                if not engine.install(blob, args.helper_addr, args.force):
+                    return 1
+                print(f"[+] Helper written to 0x{args.helper_addr:06X}; "
+                      f"waiting for it to announce at 0x{args.ctrl:06X}")
+                return 0
+
+            values = [int(a, 0) for a in args.args]
+            t0 = time.time()
+            if args.command == 'fill':
+                path = engine.fill(values[0], values[1],
+                                   bytes.fromhex(args.pattern), progress=True)
+                length = values[1]
+            else:
+                path = engine.copy(values[1], values[0], values[2], progress=True)
+                length = values[2]
+            elapsed = time.time() - t0
+
+            print(f"[+] {args.command} of {length} bytes via {path} "
+                  f"in {elapsed:.2f}s")
+
+    except ValueError as e:
+        print(f"[-] {e}")
+        return 1
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
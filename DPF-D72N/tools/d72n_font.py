@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+D72N Font
+=========
+
+Precompiled bitmap font and text rasterizer for the display buffer.
+
+The 5x7 atlas covers printable ASCII (0x20-0x7E), packed as 5 column
+bytes per glyph (bit 0 = top row), and is scaled by whole pixels for
+larger sizes (5x7, 10x14, 15x21, ...). Glyph rows are expanded once
+per (scale, colors) into ready-made RGB565 byte runs, so a string is
+rasterized by joining bytes per scanline rather than plotting pixels.
+
+Text goes into a Framebuffer shadow one scanline at a time; flush()
+then writes each text row as one contiguous span.
+
+Usage:
+    from d72n_font import draw_text
+    draw_text(fb, 10, 10, "Status: OK", 0xFFFF, 0x0000, scale=2)
+    fb.flush()
+
+    python3 d72n_font.py --preview "Hello"
+    python3 d72n_font.py /dev/i2c-1 --text "Hello" --x 10 --y 10 --scale 2
+"""
+
+import argparse
+import sys
+import time
+
+
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 7
+FIRST_CHAR = 0x20
+LAST_CHAR = 0x7E
+
+# Named sizes (integer scale of the 5x7 atlas)
+FONT_SIZES = {'small': 1, 'medium': 2, 'large': 3, 'huge': 4}
+
+# 5x7 ASCII atlas, 0x20-0x7E, 5 column bytes per glyph (bit 0 = top)
+FONT_5X7 = bytes.fromhex(
+    '0000000000' '00005f0000' '0007000700' '147f147f14'   # space ! " #
+    '242a7f2a12' '2313086462' '3649552250' '0005030000'   # $ % & '
+    '001c224100' '0041221c00' '14083e0814' '08083e0808'   # ( ) * +
+    '0050300000' '0808080808' '0060600000' '2010080402'   # , - . /
+    '3e5149453e' '00427f4000' '4261514946' '2141454b31'   # 0 1 2 3
+    '1814127f10' '2745454539' '3c4a494930' '0171090503'   # 4 5 6 7
+    '3649494936' '064949291e' '0036360000' '0056360000'   # 8 9 : ;
+    '0814224100' '1414141414' '0041221408' '0201510906'   # < = > ?
+    '324979413e' '7c1211127c' '7f49494936' '3e41414122'   # @ A B C
+    '7f4141221c' '7f49494941' '7f09090901' '3e4149497a'   # D E F G
+    '7f0808087f' '00417f4100' '2040413f01' '7f08142241'   # H I J K
+    '7f40404040' '7f020c027f' '7f020c107f' '3e4141413e'   # L M N O
+    '7f09090906' '3e4151215e' '7f09192946' '4649494931'   # P Q R S
+    '01017f0101' '3f4040403f' '1f2040201f' '3f4038403f'   # T U V W
+    '6314081463' '0708700807' '6151494543' '007f414100'   # X Y Z [
+    '0204081020' '0041417f00' '0402010204' '4040404040'   # \ ] ^ _
+    '0001020400' '2054545478' '7f48444438' '3844444420'   # ` a b c
+    '384444487f' '3854545418' '087e090102' '0c5252523e'   # d e f g
+    '7f08040478' '00447d4000' '2040443d00' '7f10284400'   # h i j k
+    '00417f4000' '7c04180478' '7c08040478' '3844444438'   # l m n o
+    '7c14141408' '081414187c' '7c08040408' '4854545420'   # p q r s
+    '043f444020' '3c4040207c' '1c2040201c' '3c4030403c'   # t u v w
+    '4428102844' '0c5050503c' '4464544c44' '0008364100'   # x y z {
+    '00007f0000' '0041360800' '1008081008'                # | } ~
+)
+
+
+def glyph_columns(char):
+    """Column bytes of a glyph (unknown characters render as '?')"""
+    code = ord(char)
+    if not FIRST_CHAR <= code <= LAST_CHAR:
+        code = ord('?')
+    i = (code - FIRST_CHAR) * GLYPH_WIDTH
+    return FONT_5X7[i:i + GLYPH_WIDTH]
+
+
+def _glyph_rows(char):
+    """Row masks of a glyph (bit 4 = leftmost column)"""
+    cols = glyph_columns(char)
+    return [sum(1 << (GLYPH_WIDTH - 1 - c) for c in range(GLYPH_WIDTH)
+                if cols[c] & (1 << row))
+            for row in range(GLYPH_HEIGHT)]
+
+
+# Row masks for every glyph, built once at import
+_ROWS = {chr(c): _glyph_rows(chr(c)) for c in range(FIRST_CHAR, LAST_CHAR + 1)}
+
+
+class Font:
+    """5x7 atlas at an integer scale
+
+    Args:
+        scale: Pixel scale (1 = 5x7)
+        spacing: Blank columns between glyphs (unscaled)
+    """
+
+    def __init__(self, scale=1, spacing=1):
+        self.scale = scale
+        self.spacing = spacing
+        self.char_width = (GLYPH_WIDTH + spacing) * scale
+        self.height = GLYPH_HEIGHT * scale
+        self._runs = {}  # (fg, bg) -> {char: [row bytes]}
+
+    def text_width(self, text):
+        """Width in pixels (no trailing spacing)"""
+        if not text:
+            return 0
+        return len(text) * self.char_width - self.spacing * self.scale
+
+    def _glyph_runs(self, fg, bg):
+        """RGB565 byte run per glyph row (with spacing) for two colors"""
+        key = (fg, bg)
+        runs = self._runs.get(key)
+        if runs is None:
+            px = {1: fg.to_bytes(2, 'little') * self.scale,
+                  0: bg.to_bytes(2, 'little') * self.scale}
+            gap = px[0] * self.spacing
+            runs = {}
+            for char, rows in _ROWS.items():
+                runs[char] = [b''.join(px[(mask >> (GLYPH_WIDTH - 1 - c)) & 1]
+                                       for c in range(GLYPH_WIDTH)) + gap
+                              for mask in rows]
+            self._runs[key] = runs
+        return runs
+
+    def render(self, text, fg, bg):
+        """Rasterize text with a solid background
+
+        Returns:
+            (width, height, RGB565 bytes), rows contiguous
+        """
+        runs = self._glyph_runs(fg, bg)
+        width = self.text_width(text)
+        row_bytes = width * 2
+        out = bytearray()
+        for row in range(GLYPH_HEIGHT):
+            line = b''.join(runs.get(c, runs['?'])[row] for c in text)
+            line = line[:row_bytes]
+            out += line * self.scale
+        return width, self.height, bytes(out)
+
+    def masks(self, text):
+        """Per-scanline lists of (x0, x1) foreground runs"""
+        lines = []
+        for row in range(GLYPH_HEIGHT):
+            spans = []
+            for i, char in enumerate(text):
+                mask = _ROWS.get(char, _ROWS['?'])[row]
+                base = i * (GLYPH_WIDTH + self.spacing)
+                c = 0
+                while c < GLYPH_WIDTH:
+                    if mask & (1 << (GLYPH_WIDTH - 1 - c)):
+                        start = c
+                        while c < GLYPH_WIDTH and mask & (1 << (GLYPH_WIDTH - 1 - c)):
+                            c += 1
+                        x0 = (base + start) * self.scale
+                        x1 = (base + c) * self.scale
+                        if spans and spans[-1][1] == x0:
+                            spans[-1] = (spans[-1][0], x1)
+                        else:
+                            spans.append((x0, x1))
+                    else:
+                        c += 1
+            lines.extend([spans] * self.scale)
+        return lines
+
+
+_FONTS = {}
+
+
+def get_font(scale=1):
+    """Shared Font instance per scale (keeps the run caches warm)"""
+    font = _FONTS.get(scale)
+    if font is None:
+        font = _FONTS[scale] = Font(scale)
+    return font
+
+
+def draw_text(fb, x, y, text, color, bg_color=None, scale=1):
+    """Draw text into a Framebuffer shadow
+
+    With bg_color the text box is blitted as one block (one span per
+    scanline); without, foreground runs are filled per scanline and the
+    existing pixels show through.
+
+    Returns:
+        Text width in pixels
+    """
+    font = get_font(scale)
+    if bg_color is not None:
+        w, h, data = font.render(text, color, bg_color)
+        fb.blit(x, y, w, h, data)
+        return w
+
+    spans = []
+    for row, runs in enumerate(font.masks(text)):
+        for x0, x1 in runs:
+            spans += fb.planner.hline(x + x0, y + row, x1 - x0)
+    fb.fill_spans(spans, color)
+    return font.text_width(text)
+
+
+def preview(text, scale=1):
+    """ASCII-art rendering of text"""
+    font = get_font(scale)
+    width = font.text_width(text)
+    lines = []
+    for spans in font.masks(text):
+        line = [' '] * width
+        for x0, x1 in spans:
+            line[x0:x1] = '#' * (x1 - x0)
+        lines.append(''.join(line))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Font',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Sizes: small (5x7), medium (10x14), large (15x21), huge (20x28)
+
+Examples:
+    # Preview in the terminal
+    python3 d72n_font.py --preview "Hello, D72N!" --size medium
+
+    # Draw a label on the panel (white on black)
+    python3 d72n_font.py /dev/i2c-1 --text "Status: OK" --x 10 --y 10 --size medium
+
+    # Transparent background, RGB565 colour
+    python3 d72n_font.py /dev/i2c-1 --text "REC" --x 420 --y 4 --color 0xF800 --no-bg
+        """
+    )
+
+    parser.add_argument('bus', nargs='?', help='I2C bus (e.g., /dev/i2c-1)')
+    parser.add_argument('--preview', metavar='TEXT', help='Print text as ASCII art')
+    parser.add_argument('--text', '-t', help='Text to draw')
+    parser.add_argument('--x', type=int, default=0, help='X position')
+    parser.add_argument('--y', type=int, default=0, help='Y position')
+    parser.add_argument('--size', choices=FONT_SIZES, default='small',
+                        help='Font size (default: small)')
+    parser.add_argument('--color', type=lambda x: int(x, 0), default=0xFFFF,
+                        help='RGB565 text colour (default: 0xFFFF)')
+    parser.add_argument('--bg', type=lambda x: int(x, 0), default=0x0000,
+                        help='RGB565 background (default: 0x0000)')
+    parser.add_argument('--no-bg', action='store_true',
+                        help='Transparent background')
+
+    args = parser.parse_args()
+    scale = FONT_SIZES[args.size]
+
+    if args.preview:
+        print(preview(args.preview, scale))
+        return 0
+
+    if not args.bus or args.text is None:
+        parser.error("drawing needs a bus and --text")
+
+    from d72n_serdb import open_serdb
+    from d72n_framebuffer import Framebuffer
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            fb = Framebuffer(serdb)
+            if args.no_bg:
+                # Transparent text needs the pixels underneath
+                font = get_font(scale)
+                print("[*] Loading text area...")
+                fb.load_rect(args.x, args.y, font.text_width(args.text),
+                             font.height)
+            draw_text(fb, args.x, args.y, args.text, args.color,
+                      None if args.no_bg else args.bg, scale)
+
+            spans = fb.dirty_spans()
+            t0 = time.time()
+            written = fb.flush()
+            print(f"[+] Drew {len(args.text)} chars in {len(spans)} writes, "
+                  f"{written} bytes, {time.time() - t0:.2f}s")
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
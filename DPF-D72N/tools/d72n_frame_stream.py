@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+D72N Frame Streamer
+===================
+
+Delta-encoded frame streaming to the display buffer (0x150000).
+
+A full 480x234 RGB565 frame is 224KB, far more than the SERDB link
+moves per frame, so only changed tiles are sent:
+
+  - Frames are split into 16x16 tiles; each tile's CRC32 is compared
+    with the hash of what the panel currently shows
+  - Changed tiles are grouped into horizontal runs (one DRAM range write
+    per row, or a single write for full-width runs)
+  - Runs are sent in order of visual importance: changed rows in the
+    tile, weighted towards the screen centre and boosted by how many
+    frames the tile has been waiting
+  - A per-frame byte budget follows the measured link throughput, so
+    the frame rate adapts: unsent tiles carry over, and source frames
+    that fall behind the clock are dropped
+
+Achieved FPS (frames fully presented) and bytes per frame are reported.
+
+Usage:
+    python3 d72n_frame_stream.py /dev/i2c-1 frames/ --fps 5
+    python3 d72n_frame_stream.py /dev/i2c-1 a.png b.png c.png --loop 10
+    python3 d72n_frame_stream.py sim:// --demo 50 --fps 10
+"""
+
+import argparse
+import os
+import sys
+import time
+import zlib
+from d72n_serdb import open_serdb
+from d72n_framebuffer import (DISPLAY_WIDTH, DISPLAY_HEIGHT, DISPLAY_BUFFER,
+                              load_image, rgb888_to_565)
+
+
+DEFAULT_TILE = 16
+DEFAULT_FPS = 5.0
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+
+class FrameStreamer:
+    """Tile-diff streamer for a DRAM RGB565 buffer
+
+    Args:
+        serdb: D72N_SERDB instance
+        base: DRAM address of the buffer
+        width, height: Size in pixels
+        tile: Tile size in pixels
+    """
+
+    def __init__(self, serdb, base=DISPLAY_BUFFER, width=DISPLAY_WIDTH,
+                 height=DISPLAY_HEIGHT, tile=DEFAULT_TILE):
+        self.serdb = serdb
+        self.base = base
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.stride = width * 2
+
+        self.cols = (width + tile - 1) // tile
+        self.rows = (height + tile - 1) // tile
+
+        # What the panel shows; None hashes = unknown (first frame is full)
+        self.sent = bytearray(self.stride * height)
+        self._hashes = None
+        self._age = [0] * (self.cols * self.rows)
+
+        # Centre weighting, 1.0 at the edges to 2.0 in the middle
+        self._weight = []
+        for ty in range(self.rows):
+            for tx in range(self.cols):
+                dx = abs((tx + 0.5) / self.cols - 0.5) * 2
+                dy = abs((ty + 0.5) / self.rows - 0.5) * 2
+                self._weight.append(2.0 - max(dx, dy))
+
+        self.rate = None  # Link throughput estimate (bytes/s)
+
+    def _tile_rows(self, tx, ty):
+        """Yield (offset, length) of each buffer row in a tile"""
+        x0 = tx * self.tile
+        n = (min(x0 + self.tile, self.width) - x0) * 2
+        for y in range(ty * self.tile, min((ty + 1) * self.tile, self.height)):
+            yield y * self.stride + x0 * 2, n
+
+    def tile_hashes(self, frame):
+        """CRC32 of every tile, row-major"""
+        hashes = []
+        for ty in range(self.rows):
+            for tx in range(self.cols):
+                h = 0
+                for offset, n in self._tile_rows(tx, ty):
+                    h = zlib.crc32(frame[offset:offset + n], h)
+                hashes.append(h)
+        return hashes
+
+    def _changed_rows(self, frame, tx, ty):
+        return sum(1 for offset, n in self._tile_rows(tx, ty)
+                   if frame[offset:offset + n] != self.sent[offset:offset + n])
+
+    def plan(self, frame, hashes):
+        """Changed runs in importance order
+
+        Returns:
+            List of (importance, ty, tx0, tx1)
+        """
+        runs = []
+        for ty in range(self.rows):
+            run = None
+            for tx in range(self.cols + 1):
+                i = ty * self.cols + tx
+                changed = tx < self.cols and (
+                    self._hashes is None or hashes[i] != self._hashes[i])
+                if changed:
+                    score = (self._changed_rows(frame, tx, ty) *
+                             self._weight[i] * (1 + self._age[i]))
+                    if run is None:
+                        run = [0.0, ty, tx, tx + 1]
+                    run[0] += score
+                    run[3] = tx + 1
+                elif run is not None:
+                    runs.append(tuple(run))
+                    run = None
+        runs.sort(key=lambda r: -r[0])
+        return runs
+
+    def _write_run(self, frame, ty, tx0, tx1):
+        """Write one run of tiles, returns bytes written"""
+        y0 = ty * self.tile
+        y1 = min(y0 + self.tile, self.height)
+        x0 = tx0 * self.tile * 2
+        x1 = min(tx1 * self.tile, self.width) * 2
+
+        if x0 == 0 and x1 == self.stride:
+            # Full-width run: rows are contiguous in DRAM
+            spans = [(y0 * self.stride, (y1 - y0) * self.stride)]
+        else:
+            spans = [(y * self.stride + x0, x1 - x0) for y in range(y0, y1)]
+
+        written = 0
+        for offset, n in spans:
+            self.serdb.write_dram_range(self.base + offset,
+                                        frame[offset:offset + n])
+            self.sent[offset:offset + n] = frame[offset:offset + n]
+            written += n
+        return written
+
+    def send_frame(self, frame, budget=None):
+        """Send changed tiles of a frame, most important first
+
+        Args:
+            frame: Packed little-endian RGB565 (width*height*2 bytes)
+            budget: Byte budget (None = send everything); at least one
+                    run is always sent
+
+        Returns:
+            Dictionary with bytes, runs, pending, complete, elapsed
+        """
+        hashes = self.tile_hashes(frame)
+        runs = self.plan(frame, hashes)
+
+        t0 = time.time()
+        written = 0
+        sent_runs = 0
+        if self._hashes is None:
+            self._hashes = [None] * len(hashes)
+
+        for _, ty, tx0, tx1 in runs:
+            run_bytes = (min(tx1 * self.tile, self.width) - tx0 * self.tile) * 2 * \
+                (min((ty + 1) * self.tile, self.height) - ty * self.tile)
+            if budget is not None and sent_runs and written + run_bytes > budget:
+                continue
+            written += self._write_run(frame, ty, tx0, tx1)
+            sent_runs += 1
+            for tx in range(tx0, tx1):
+                i = ty * self.cols + tx
+                self._hashes[i] = hashes[i]
+                self._age[i] = 0
+
+        pending = 0
+        for i, h in enumerate(hashes):
+            if h != self._hashes[i]:
+                self._age[i] += 1
+                pending += 1
+
+        elapsed = time.time() - t0
+        if written and elapsed > 0:
+            rate = written / elapsed
+            self.rate = rate if self.rate is None else \
+                0.7 * self.rate + 0.3 * rate
+
+        return {'bytes': written, 'runs': sent_runs, 'pending': pending,
+                'complete': pending == 0, 'elapsed': elapsed}
+
+    def stream(self, frames, fps=DEFAULT_FPS, loop=1, callback=None):
+        """Stream frames against a wall clock
+
+        Each step shows the newest source frame that is due (older ones
+        are dropped) within a byte budget of one frame period at the
+        measured link rate.
+
+        Args:
+            frames: List of packed RGB565 frames
+            fps: Source frame rate
+            loop: Number of passes over frames
+            callback: Called with (index, stats) after each step
+
+        Returns:
+            Summary dictionary
+        """
+        total = len(frames) * loop
+        period = 1.0 / fps
+        shown = set()
+        steps = complete = nbytes = 0
+        last = None
+        complete_last = False
+
+        t0 = time.time()
+        while True:
+            due = min(int((time.time() - t0) / period), total - 1)
+            if due == last and complete_last:
+                if due == total - 1:
+                    break
+                time.sleep(max(0.0, t0 + (due + 1) * period - time.time()))
+                continue
+
+            budget = self.rate * period if self.rate else None
+            stats = self.send_frame(frames[due % len(frames)], budget)
+            steps += 1
+            nbytes += stats['bytes']
+            complete_last = stats['complete']
+            if stats['complete']:
+                complete += 1
+                shown.add(due)
+            last = due
+            if callback:
+                callback(due, stats)
+            if due == total - 1 and stats['complete']:
+                break
+
+        elapsed = time.time() - t0
+        return {
+            'frames': total,
+            'shown': len(shown),
+            'dropped': total - len(shown),
+            'steps': steps,
+            'bytes': nbytes,
+            'bytes_per_frame': nbytes / steps if steps else 0,
+            'elapsed': elapsed,
+            'fps': len(shown) / elapsed if elapsed else 0,
+            'rate': self.rate or 0,
+        }
+
+
+def load_frames(paths, dither=False, width=DISPLAY_WIDTH,
+                height=DISPLAY_HEIGHT):
+    """Load image files (or directories of them) as RGB565 frames"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, f) for f in os.listdir(path)
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            files.append(path)
+    return [rgb888_to_565(load_image(f, width, height), width, height, dither)
+            for f in files]
+
+
+def demo_frames(count, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+    """Moving 40x40 box over a static gradient background"""
+    stride = width * 2
+    background = bytearray(stride * height)
+    for y in range(height):
+        color = ((y * 31 // height) << 11) | 0x0010
+        background[y * stride:(y + 1) * stride] = \
+            bytes((color & 0xFF, color >> 8)) * width
+
+    frames = []
+    box = bytes((0xE0, 0xFF)) * 40  # Yellow
+    for i in range(count):
+        frame = bytearray(background)
+        bx = (i * 12) % (width - 40)
+        by = (height - 40) // 2
+        for y in range(by, by + 40):
+            frame[y * stride + bx * 2:y * stride + bx * 2 + 80] = box
+        frames.append(bytes(frame))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Frame Streamer',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Stream a directory of images at 5 fps (sorted by name)
+    python3 d72n_frame_stream.py /dev/i2c-1 frames/ --fps 5
+
+    # Loop three images ten times, dithered
+    python3 d72n_frame_stream.py /dev/i2c-1 a.png b.png c.png --loop 10 --dither
+
+    # Built-in moving-box animation
+    python3 d72n_frame_stream.py sim:// --demo 50 --fps 10 --verbose
+
+The frame rate adapts to the link: unsent tiles carry over to the next
+frame (oldest and most central first) and late source frames drop.
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (/dev/i2c-1, ftdi://..., sim://)')
+    parser.add_argument('images', nargs='*', help='Image files or directories')
+    parser.add_argument('--demo', type=int, metavar='N',
+                        help='Stream N generated demo frames')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS,
+                        help=f'Source frame rate (default: {DEFAULT_FPS})')
+    parser.add_argument('--loop', type=int, default=1,
+                        help='Passes over the frames (default: 1)')
+    parser.add_argument('--tile', type=int, default=DEFAULT_TILE,
+                        help=f'Tile size in pixels (default: {DEFAULT_TILE})')
+    parser.add_argument('--dither', action='store_true',
+                        help='Ordered dithering when converting images')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Print every step')
+
+    args = parser.parse_args()
+
+    try:
+        if args.demo:
+            frames = demo_frames(args.demo)
+        elif args.images:
+            frames = load_frames(args.images, args.dither)
+        else:
+            parser.error("nothing to stream (give images or --demo)")
+    except ImportError as e:
+        print(f"[-] Missing dependency: {e}")
+        return 1
+    except (ValueError, OSError) as e:
+        print(f"[-] {e}")
+        return 1
+
+    if not frames:
+        print("[-] No frames found")
+        return 1
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    def report(index, stats):
+        state = 'done' if stats['complete'] else f"{stats['pending']} pending"
+        print(f"    frame {index:4d}: {stats['bytes']:7d} bytes, "
+              f"{stats['runs']:3d} runs, {stats['elapsed'] * 1000:7.1f} ms, {state}")
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            streamer = FrameStreamer(serdb, tile=args.tile)
+            print(f"[*] Streaming {len(frames)} frames x{args.loop} "
+                  f"at {args.fps:g} fps ({streamer.cols}x{streamer.rows} tiles)")
+            summary = streamer.stream(frames, args.fps, args.loop,
+                                      report if args.verbose else None)
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    print()
+    print(f"[+] {summary['shown']}/{summary['frames']} frames shown "
+          f"({summary['dropped']} dropped) in {summary['elapsed']:.1f}s")
+    print(f"[*] Achieved {summary['fps']:.2f} fps, "
+          f"{summary['bytes_per_frame'] / 1024:.1f} KB per step, "
+          f"link {summary['rate'] / 1024:.1f} KB/s")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+D72N Framebuffer
+================
+
+Shadowed display buffer with dirty-span flushing.
+
+Drawing happens in a local copy of the 480x234 RGB565 buffer at
+0x150000. Primitives are planned as scanline byte spans (clipped once,
+see d72n_spans.py) and applied to the shadow span by span. flush()
+pushes only what changed, as contiguous write_dram_range() calls:
+
+  - Each row tracks a dirty byte range [x0, x1)
+  - Rows whose device contents are known (written in full or loaded)
+    are diffed against the last flushed copy, so redrawing identical
+    pixels costs nothing
+  - Spans closer than max_gap bytes are merged (one longer write is
+    cheaper than two SERDB address setups), full-width rows merge into
+    one run
+
+A full-screen fill is one 224KB write; a text marker is a few KB.
+With a FillEngine (d72n_fill.py), uniform row runs in a span are
+handed to it instead, so solid fills can run on an AEON-side helper
+once one is verified (host writes until then).
+
+Image upload: load_image() scales PNG/JPEG/BMP to the panel (Pillow;
+uncompressed 24/32-bit BMP works without it) and rgb888_to_565() packs
+little-endian RGB565, vectorised with NumPy when installed, with
+optional 4x4 ordered (Bayer) dithering.
+
+Usage:
+    from d72n_framebuffer import Framebuffer
+    fb = Framebuffer(serdb)
+    fb.fill_rect(0, 0, 100, 50, 0xF800)
+    fb.flush()
+
+    python3 d72n_framebuffer.py sim:// --fill 0xF800
+    python3 d72n_framebuffer.py /dev/i2c-1 --rect 10 10 100 50 0x07E0
+"""
+
+import argparse
+import struct
+import sys
+import time
+from d72n_serdb import open_serdb
+from d72n_spans import SpanPlanner
+
+# Optional vectorised conversion
+_numpy = None
+try:
+    import numpy
+    _numpy = numpy
+except ImportError:
+    pass
+
+# Optional image loading (PNG/JPEG/scaling)
+_PIL_Image = None
+try:
+    from PIL import Image
+    _PIL_Image = Image
+except ImportError:
+    pass
+
+
+# Display parameters (traced from firmware, see d72n_display_test.py)
+DISPLAY_WIDTH = 480
+DISPLAY_HEIGHT = 234
+DISPLAY_BUFFER = 0x150000
+
+# Bytes of unchanged data worth rewriting to join two spans
+DEFAULT_MAX_GAP = 16
+
+# Write chunk size for progress reporting
+FLUSH_CHUNK = 4096
+
+# 4x4 ordered dither matrix (values 0-15)
+BAYER_4X4 = (
+    (0, 8, 2, 10),
+    (12, 4, 14, 6),
+    (3, 11, 1, 9),
+    (15, 7, 13, 5),
+)
+
+
+class Framebuffer:
+    """Local RGB565 shadow of a DRAM display buffer
+
+    Args:
+        serdb: D72N_SERDB instance
+        base: DRAM address of the buffer
+        width, height: Size in pixels
+        max_gap: Merge spans separated by at most this many bytes
+        engine: Optional FillEngine for uniform runs
+    """
+
+    def __init__(self, serdb, base=DISPLAY_BUFFER, width=DISPLAY_WIDTH,
+                 height=DISPLAY_HEIGHT, max_gap=DEFAULT_MAX_GAP, engine=None):
+        self.serdb = serdb
+        self.engine = engine
+        self.base = base
+        self.width = width
+        self.height = height
+        self.stride = width * 2
+        self.max_gap = max_gap
+        self.planner = SpanPlanner(width, height)
+
+        self.shadow = bytearray(self.stride * height)
+        self._device = bytearray(self.stride * height)
+        self._known = bytearray(height)    # 1 = _device row matches DRAM
+        self._dirty = {}                   # row -> [x0, x1) byte range
+
+        self.bytes_written = 0
+        self.flushes = 0
+
+    # ==========================================================================
+    # Dirty tracking
+    # ==========================================================================
+
+    def _mark(self, y, x0, x1):
+        """Mark pixels [x0, x1) of row y dirty"""
+        b0, b1 = x0 * 2, x1 * 2
+        span = self._dirty.get(y)
+        if span is None:
+            self._dirty[y] = [b0, b1]
+        else:
+            span[0] = min(span[0], b0)
+            span[1] = max(span[1], b1)
+
+    def _mark_spans(self, spans):
+        """Mark planned spans dirty, row by row"""
+        for y, b0, b1 in self.planner.rows(spans):
+            self._mark(y, b0 // 2, b1 // 2)
+
+    def invalidate(self):
+        """Forget device contents (next flush rewrites dirty rows as-is)"""
+        self._known = bytearray(self.height)
+
+    def mark_all(self):
+        """Mark the whole buffer dirty"""
+        for y in range(self.height):
+            self._dirty[y] = [0, self.stride]
+
+    # ==========================================================================
+    # Drawing
+    # ==========================================================================
+
+    def set_pixel(self, x, y, color):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.stride + x * 2
+            self.shadow[i] = color & 0xFF
+            self.shadow[i + 1] = (color >> 8) & 0xFF
+            self._mark(y, x, x + 1)
+
+    def get_pixel(self, x, y):
+        i = y * self.stride + x * 2
+        return self.shadow[i] | (self.shadow[i + 1] << 8)
+
+    def fill_spans(self, spans, color):
+        """Fill planned spans with a solid colour"""
+        pixel = bytes((color & 0xFF, (color >> 8) & 0xFF))
+        for offset, length in spans:
+            self.shadow[offset:offset + length] = pixel * (length // 2)
+        self._mark_spans(spans)
+
+    def fill_rect(self, x, y, w, h, color):
+        self.fill_spans(self.planner.rect(x, y, w, h), color)
+
+    def hline(self, x, y, w, color):
+        self.fill_spans(self.planner.hline(x, y, w), color)
+
+    def vline(self, x, y, h, color):
+        self.fill_spans(self.planner.vline(x, y, h), color)
+
+    def line(self, x0, y0, x1, y1, color):
+        self.fill_spans(self.planner.line(x0, y0, x1, y1), color)
+
+    def fill(self, color):
+        self.fill_rect(0, 0, self.width, self.height, color)
+
+    def blit(self, x, y, w, h, data):
+        """Copy packed little-endian RGB565 pixels (w*h*2 bytes)"""
+        spans = self.planner.blit(x, y, w, h)
+        for offset, length, src in spans:
+            self.shadow[offset:offset + length] = data[src:src + length]
+        self._mark_spans(spans)
+
+    def draw_bitmap(self, x, y, columns, color, bg_color=None, height=8):
+        """Draw a column-major 1bpp glyph (bit 0 = top row)"""
+        for cx, col in enumerate(columns):
+            for row in range(height):
+                if col & (1 << row):
+                    self.set_pixel(x + cx, y + row, color)
+                elif bg_color is not None:
+                    self.set_pixel(x + cx, y + row, bg_color)
+
+    # ==========================================================================
+    # Flushing
+    # ==========================================================================
+
+    def load(self, progress=False):
+        """Read the device buffer into the shadow (slow: full DRAM read)"""
+        data = self.serdb.read_dram_range(self.base, len(self.shadow),
+                                          progress=progress)
+        self.shadow[:] = data
+        self._device[:] = data
+        self._known = bytearray(b'\x01' * self.height)
+        self._dirty.clear()
+
+    def load_rect(self, x, y, w, h):
+        """Read a rectangle of the device buffer into the shadow
+
+        For drawing over existing content (e.g. transparent text)
+        without reading the whole buffer. Unflushed edits are kept: the
+        shadow is not overwritten inside a row's dirty range. Rows read
+        edge to edge are marked known.
+        """
+        stride = self.stride
+        for i, n in self.planner.rect(x, y, w, h):
+            data = self.serdb.read_dram_range(self.base + i, n)
+            self._device[i:i + n] = data
+            for row in range(i // stride, (i + n - 1) // stride + 1):
+                start = max(i, row * stride)
+                end = min(i + n, (row + 1) * stride)
+                d0 = d1 = end
+                if row in self._dirty:
+                    b0, b1 = self._dirty[row]
+                    d0, d1 = row * stride + b0, row * stride + b1
+                for a0, a1 in ((start, min(end, d0)), (max(start, d1), end)):
+                    if a0 < a1:
+                        self.shadow[a0:a1] = data[a0 - i:a1 - i]
+                if end - start == stride:
+                    self._known[row] = 1
+
+    def _row_spans(self, y, b0, b1):
+        """Changed byte spans of one dirty row (buffer offsets)"""
+        base = y * self.stride
+        if not self._known[y]:
+            return [(base + b0, base + b1)]
+
+        spans = []
+        shadow, device = self.shadow, self._device
+        i, end = base + b0, base + b1
+        while i < end:
+            # Skip equal 32-byte blocks quickly
+            j = min(i + 32, end)
+            if shadow[i:j] == device[i:j]:
+                i = j
+                continue
+            for k in range(i, j):
+                if shadow[k] != device[k]:
+                    if spans and k - spans[-1][1] <= self.max_gap:
+                        spans[-1][1] = k + 1
+                    else:
+                        spans.append([k, k + 1])
+            i = j
+        return [tuple(s) for s in spans]
+
+    def dirty_spans(self):
+        """Merged (offset, length) spans that flush() would write"""
+        merged = []
+        for y in sorted(self._dirty):
+            b0, b1 = self._dirty[y]
+            for start, end in self._row_spans(y, b0, b1):
+                if merged and start - merged[-1][1] <= self.max_gap:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+        return [(s, e - s) for s, e in merged]
+
+    def _runs(self, offset, length):
+        """Split a span at row boundaries into (pos, n, pattern) runs
+
+        pattern is the repeated pixel for uniform runs, else None.
+        Adjacent pieces with the same pattern are joined.
+        """
+        runs = []
+        pos, end = offset, offset + length
+        while pos < end:
+            n = min(end, (pos // self.stride + 1) * self.stride) - pos
+            piece = self.shadow[pos:pos + n]
+            pattern = None
+            if pos % 2 == 0 and n % 2 == 0 and piece == piece[:2] * (n // 2):
+                pattern = bytes(piece[:2])
+            if runs and runs[-1][2] == pattern:
+                runs[-1][1] += n
+            else:
+                runs.append([pos, n, pattern])
+            pos += n
+        return runs
+
+    def flush(self, progress=False):
+        """Write changed bytes to DRAM
+
+        Returns:
+            Number of bytes written
+        """
+        spans = self.dirty_spans()
+        total = sum(n for _, n in spans)
+        done = 0
+
+        for offset, length in spans:
+            runs = [(offset, length, None)]
+            if self.engine is not None:
+                runs = self._runs(offset, length)
+            for start, count, pattern in runs:
+                if pattern is not None and \
+                        count >= self.engine.min_helper_bytes:
+                    self.engine.fill(self.base + start, count, pattern,
+                                     progress=progress)
+                    done += count
+                    continue
+                for pos in range(start, start + count, FLUSH_CHUNK):
+                    n = min(FLUSH_CHUNK, start + count - pos)
+                    self.serdb.write_dram_range(self.base + pos,
+                                                self.shadow[pos:pos + n])
+                    done += n
+                    if progress:
+                        print(f"\rWriting: {(done * 100) // total}%",
+                              end='', flush=True)
+            self._device[offset:offset + length] = \
+                self.shadow[offset:offset + length]
+
+        # Rows written edge to edge now match the device
+        for y, (b0, b1) in self._dirty.items():
+            if b0 == 0 and b1 == self.stride:
+                self._known[y] = 1
+        self._dirty.clear()
+
+        if progress and total:
+            print("\rWriting: 100%")
+        self.bytes_written += total
+        self.flushes += 1
+        return total
+
+
+# ==============================================================================
+# Image conversion
+# ==============================================================================
+
+def _read_bmp(path):
+    """Read an uncompressed 24/32-bit BMP
+
+    Returns:
+        (width, height, rgb bytes top-down)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] != b'BM':
+        raise ValueError(f"{path}: not a BMP (install Pillow for PNG/JPEG)")
+    offset, = struct.unpack_from('<I', data, 10)
+    width, height, _, bpp, compression = struct.unpack_from('<iiHHI', data, 18)
+    if bpp not in (24, 32) or compression not in (0, 3):
+        raise ValueError(f"{path}: {bpp}bpp/compression {compression} BMP "
+                         f"needs Pillow")
+
+    step = bpp // 8
+    stride = (width * step + 3) & ~3
+    rows = range(height - 1, -1, -1) if height > 0 else range(-height)
+    rgb = bytearray()
+    for row in rows:
+        line = data[offset + row * stride:offset + row * stride + width * step]
+        rgb += bytes(line[c] for i in range(0, len(line), step)
+                     for c in (i + 2, i + 1, i))
+    return width, abs(height), bytes(rgb)
+
+
+def _scale_nearest(rgb, width, height, out_w, out_h):
+    out = bytearray()
+    cols = [(x * width // out_w) * 3 for x in range(out_w)]
+    for y in range(out_h):
+        row = (y * height // out_h) * width * 3
+        for c in cols:
+            out += rgb[row + c:row + c + 3]
+    return bytes(out)
+
+
+def load_image(path, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+    """Load an image scaled to width x height
+
+    Uses Pillow (any format, Lanczos scaling) when installed, otherwise
+    reads uncompressed BMP with nearest-neighbour scaling.
+
+    Returns:
+        Packed RGB888 bytes, row-major, top-down
+    """
+    if _PIL_Image is not None:
+        img = _PIL_Image.open(path).convert('RGB')
+        if img.size != (width, height):
+            img = img.resize((width, height), _PIL_Image.LANCZOS)
+        return img.tobytes()
+
+    w, h, rgb = _read_bmp(path)
+    if (w, h) != (width, height):
+        rgb = _scale_nearest(rgb, w, h, width, height)
+    return rgb
+
+
+def rgb888_to_565(rgb, width, height, dither=False):
+    """Pack RGB888 to little-endian RGB565
+
+    Args:
+        rgb: width*height*3 bytes
+        dither: Add a 4x4 Bayer offset (one quantisation step) before
+                truncating, instead of plain truncation
+
+    Returns:
+        width*height*2 bytes
+    """
+    if _numpy is not None:
+        np = _numpy
+        px = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width, 3)
+        px = px.astype(np.uint16)
+        if dither:
+            bayer = np.array(BAYER_4X4, dtype=np.uint16)
+            bayer = np.tile(bayer, (height // 4 + 1, width // 4 + 1))
+            bayer = bayer[:height, :width]
+            # Step is 8 for 5-bit channels, 4 for the 6-bit green
+            px[..., 0] += bayer // 2
+            px[..., 1] += bayer // 4
+            px[..., 2] += bayer // 2
+            np.minimum(px, 255, out=px)
+        out = ((px[..., 0] >> 3) << 11) | ((px[..., 1] >> 2) << 5) | (px[..., 2] >> 3)
+        return out.astype('<u2').tobytes()
+
+    out = bytearray(width * height * 2)
+    i = o = 0
+    for y in range(height):
+        bayer_row = BAYER_4X4[y & 3]
+        for x in range(width):
+            r, g, b = rgb[i], rgb[i + 1], rgb[i + 2]
+            if dither:
+                d = bayer_row[x & 3]
+                r = min(r + (d >> 1), 255)
+                g = min(g + (d >> 2), 255)
+                b = min(b + (d >> 1), 255)
+            color = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+            out[o] = color & 0xFF
+            out[o + 1] = color >> 8
+            i += 3
+            o += 2
+    return bytes(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Framebuffer',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Fill the screen (one contiguous write)
+    python3 d72n_framebuffer.py /dev/i2c-1 --fill 0xF800
+
+    # Draw a rectangle (only its rows are written)
+    python3 d72n_framebuffer.py /dev/i2c-1 --rect 10 10 100 50 0x07E0
+
+    # Diagonal line (one span per scanline run)
+    python3 d72n_framebuffer.py /dev/i2c-1 --line 0 0 479 233 0xFFFF
+
+    # Show the spans a flush would write, without writing
+    python3 d72n_framebuffer.py sim:// --rect 10 10 100 50 0x07E0 --dry-run
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (/dev/i2c-1, ftdi://..., sim://)')
+    parser.add_argument('--fill', type=lambda x: int(x, 0), metavar='COLOR',
+                        help='Fill screen with RGB565 color')
+    parser.add_argument('--rect', nargs=5, type=lambda x: int(x, 0),
+                        metavar=('X', 'Y', 'W', 'H', 'COLOR'),
+                        help='Fill rectangle with RGB565 color')
+    parser.add_argument('--line', nargs=5, type=lambda x: int(x, 0),
+                        metavar=('X0', 'Y0', 'X1', 'Y1', 'COLOR'),
+                        help='Draw line with RGB565 color')
+    parser.add_argument('--max-gap', type=int, default=DEFAULT_MAX_GAP,
+                        help=f'Merge spans closer than this many bytes '
+                             f'(default: {DEFAULT_MAX_GAP})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print flush spans without writing')
+
+    args = parser.parse_args()
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            fb = Framebuffer(serdb, max_gap=args.max_gap)
+            if args.fill is not None:
+                fb.fill(args.fill)
+            if args.rect:
+                fb.fill_rect(*args.rect)
+            if args.line:
+                fb.line(*args.line)
+
+            spans = fb.dirty_spans()
+            print(f"[*] {len(spans)} spans, {sum(n for _, n in spans)} bytes")
+            if args.dry_run:
+                for offset, length in spans:
+                    print(f"    0x{fb.base + offset:06X} +{length}")
+                return 0
+
+            t0 = time.time()
+            written = fb.flush(progress=True)
+            elapsed = time.time() - t0
+            print(f"[+] Flushed {written} bytes in {elapsed:.2f}s "
+                  f"({written / elapsed / 1024 if elapsed else 0:.1f} KB/s)")
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
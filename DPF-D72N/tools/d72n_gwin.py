@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+D72N GWin Double Buffering
+==========================
+
+Tear-free display updates: draw into an off-screen DRAM buffer, then
+point the graphics window at it with one short batched XDATA write.
+
+Writing a full frame over SERDB takes seconds, so drawing straight into
+the visible output buffer (0x150000) shows the update sweeping down
+the panel. With double buffering the slow write goes to the back
+buffer (default: secondary buffer 0x0C0000) and only the flip - a few
+XDATA bytes, one pipelined transfer under the session lock - touches
+what is shown. Each flip records its host-side write time, then reads
+the base register back to confirm it took the value (write + read-back
+time is recorded too). Neither measures when the panel actually shows
+the new buffer.
+
+GWin layout
+-----------
+The GWin control bytes are traced (docs/D72N_SERDB_CONTROL.md), but
+which bytes hold the frame base address, and in what format, is NOT
+verified. Only 0x6F00 itself is traced; 0x6EFF next to it is GWin
+status. The default layout below is used for reading ('status') only.
+Every command that writes (flip, image, bench, reset) refuses to run
+without a JSON layout (--layout) that names at least base and width;
+other fields default as shown:
+
+  base        0x6F00   GWin base B: frame base, low byte first
+  width       3        Bytes of base address
+  shift       0        Base register = address >> shift (0 = bytes)
+  endian      little
+  latch       []       [addr, value] pairs written after the base in
+                       the same batch (e.g. [["0x6EA8", 1]] to re-arm
+                       the primary control byte)
+
+  0x6EA8  GWin primary control      \\
+  0x6FA8  GWin secondary control     > shown by 'status'
+  0x6EE0  GWin enable                /
+
+The firmware also uses the secondary buffer (673 refs) and may redraw
+either buffer. 'image' and 'bench' put the previous base back when they
+finish or fail ('image --keep' leaves the new one); 'reset' points the
+window back at 0x150000.
+
+Usage:
+    python3 d72n_gwin.py /dev/i2c-1 status
+    python3 d72n_gwin.py /dev/i2c-1 image photo.jpg --layout gwin.json
+    python3 d72n_gwin.py /dev/i2c-1 bench 20 --layout gwin.json
+    python3 d72n_gwin.py /dev/i2c-1 reset --layout gwin.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from d72n_serdb import open_serdb, D72N_ADDR
+from d72n_framebuffer import Framebuffer, load_image, rgb888_to_565
+
+
+# Default base register layout (hypothesis, read-only, see module docstring)
+DEFAULT_LAYOUT = {
+    'base': 0x6F00,
+    'width': 3,
+    'shift': 0,
+    'endian': 'little',
+    'latch': [],
+}
+
+# Fields a layout file must give explicitly
+REQUIRED_FIELDS = ('base', 'width')
+
+FRONT_BUFFER = D72N_ADDR.DRAM_OUTPUT       # 0x150000, shown at boot
+BACK_BUFFER = D72N_ADDR.DRAM_SECONDARY     # 0x0C0000
+
+
+def load_layout(path):
+    """Load a JSON layout, merged over DEFAULT_LAYOUT
+
+    Addresses and values may be numbers or "0x..." strings. base and
+    width must be given.
+    """
+    with open(path, 'r') as f:
+        override = json.load(f)
+
+    missing = [k for k in REQUIRED_FIELDS if k not in override]
+    if missing:
+        raise ValueError(f"{path}: layout must define {', '.join(missing)}")
+
+    def num(v):
+        return int(v, 0) if isinstance(v, str) else v
+
+    layout = dict(DEFAULT_LAYOUT)
+    for key, value in override.items():
+        if key == 'latch':
+            layout['latch'] = [(num(a), num(v)) for a, v in value]
+        elif key == 'endian':
+            layout['endian'] = value
+        else:
+            layout[key] = num(value)
+    return layout
+
+
+class D72N_GWin:
+    """GWin frame base flipping
+
+    Without an explicit layout only read_base() works; flip() raises
+    ValueError rather than write the unverified default registers.
+
+    Args:
+        serdb: D72N_SERDB instance
+        layout: Base register layout (load_layout(); default:
+                DEFAULT_LAYOUT, read-only)
+    """
+
+    def __init__(self, serdb, layout=None):
+        self.serdb = serdb
+        self.layout = layout or DEFAULT_LAYOUT
+        self.writable = layout is not None
+        self.latencies = []       # Host-side write time per flip
+        self.confirm_times = []   # Write + read-back time per flip
+        self.mismatches = 0
+        self.confirmed = None     # Last flip read back as written
+
+    def read_base(self):
+        """Current frame base address (per layout)"""
+        lay = self.layout
+        raw = self.serdb.read_xdata_int(lay['base'], lay['width'], lay['endian'])
+        return raw << lay['shift']
+
+    def _base_writes(self, addr):
+        lay = self.layout
+        value = (addr >> lay['shift']).to_bytes(lay['width'], lay['endian'])
+        writes = [(lay['base'] + i, b) for i, b in enumerate(value)]
+        return writes + [tuple(w) for w in lay['latch']]
+
+    def flip(self, addr, verify=True):
+        """Point the window at addr in one batched write
+
+        All bytes go out as a single pipelined transfer (one lock hold,
+        one settle delay). With `verify` the base register is read back
+        afterwards; self.confirmed says whether it held addr, and
+        mismatches are counted.
+
+        Returns:
+            Host-side write time in seconds (not display latency)
+        """
+        if not self.writable:
+            raise ValueError("GWin base layout is unverified; flipping "
+                             "needs an explicit layout (--layout)")
+        writes = self._base_writes(addr)
+        t0 = time.perf_counter()
+        self.serdb.write_xdata_batch(writes, depth=len(writes))
+        latency = time.perf_counter() - t0
+        self.latencies.append(latency)
+
+        self.confirmed = None
+        if verify:
+            self.confirmed = self.read_base() == addr
+            self.confirm_times.append(time.perf_counter() - t0)
+            if not self.confirmed:
+                self.mismatches += 1
+        return latency
+
+    def latency_stats(self):
+        if not self.latencies:
+            return None
+        ms = sorted(v * 1000 for v in self.latencies)
+        confirm = [v * 1000 for v in self.confirm_times]
+        return {
+            'flips': len(ms),
+            'min_ms': ms[0],
+            'mean_ms': sum(ms) / len(ms),
+            'max_ms': ms[-1],
+            'confirm_mean_ms': sum(confirm) / len(confirm) if confirm else None,
+            'mismatches': self.mismatches,
+        }
+
+
+class DoubleBuffer:
+    """Two Framebuffers presented through GWin flips
+
+    Draw into `back`, then present(): the back buffer is flushed, the
+    window flips to it, and the buffers swap. The back shadow starts
+    all zero (black); call seed() first when drawing only part of the
+    frame. The new back buffer gets
+    the presented shadow with every row marked dirty; its flush diffs
+    against what it held two frames ago, so only changes are written.
+
+    Args:
+        serdb: D72N_SERDB instance
+        gwin: D72N_GWin with an explicit layout
+        front, back: DRAM buffer addresses
+        engine: Optional FillEngine for both framebuffers
+    """
+
+    def __init__(self, serdb, gwin, front=FRONT_BUFFER, back=BACK_BUFFER,
+                 engine=None):
+        self.gwin = gwin
+        self.front = Framebuffer(serdb, base=front, engine=engine)
+        self.back = Framebuffer(serdb, base=back, engine=engine)
+        # Back buffer contents are unknown: the first frame is written whole
+        self.back.mark_all()
+
+    def seed(self, progress=False):
+        """Start the back buffer from what the front buffer shows
+
+        Reads the front buffer (a full DRAM read) into both shadows, so
+        partial drawing overlays the current picture instead of the
+        all-zero initial shadow. The first present() still writes the
+        whole back buffer, whose contents are unknown.
+        """
+        self.front.load(progress=progress)
+        self.back.shadow[:] = self.front.shadow
+        self.back.mark_all()
+
+    def present(self, progress=False):
+        """Flush the back buffer and flip to it
+
+        Returns:
+            (bytes written, flip host-side write time in seconds)
+        """
+        written = self.back.flush(progress=progress)
+        latency = self.gwin.flip(self.back.base)
+
+        shown = self.back
+        self.back, self.front = self.front, shown
+        self.back.shadow[:] = shown.shadow
+        self.back.mark_all()
+        return written, latency
+
+
+def print_latency(stats):
+    print(f"[*] Host-side write time over {stats['flips']} flips: "
+          f"min {stats['min_ms']:.2f} ms, mean {stats['mean_ms']:.2f} ms, "
+          f"max {stats['max_ms']:.2f} ms")
+    if stats['confirm_mean_ms'] is not None:
+        print(f"[*] Write + read-back: mean {stats['confirm_mean_ms']:.2f} ms, "
+              f"{stats['mismatches']} read-back mismatches")
+
+
+def describe_flip(gwin, latency):
+    """One-line flip result: host write time and read-back outcome"""
+    text = f"host write {latency * 1000:.2f} ms"
+    if gwin.confirmed is True:
+        return text + ", register read back OK"
+    if gwin.confirmed is False:
+        return text + f", register reads back 0x{gwin.read_base():06X}"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N GWin Double Buffering',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Commands:
+    status                  Show GWin control bytes and current base
+    flip ADDR               Point the window at ADDR
+    image FILE              Draw FILE off-screen, flip to it, show it for
+                            --hold seconds, then restore the old base
+    bench [N]               N flips between the two buffers (default 10)
+    reset                   Point the window back at 0x150000
+
+Examples:
+    # Read-only: what the default hypothesis sees
+    python3 d72n_gwin.py /dev/i2c-1 status
+
+    # Tear-free image upload (drawn into 0x0C0000, then flipped)
+    python3 d72n_gwin.py /dev/i2c-1 image photo.jpg --dither --layout gwin.json
+
+    # Flip timing (host write time and read-back)
+    python3 d72n_gwin.py /dev/i2c-1 bench 20 --layout gwin.json
+
+Layout JSON (base and width required):
+    {"base": "0x6F00", "width": 1, "latch": [["0x6EA8", 1]]}
+
+The base register layout is unverified, so every command that writes
+needs --layout; check with 'status' and a screenshot before relying on
+it. Times are host-side write time; the read-back only confirms the
+register holds the value, not that the panel switched.
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (/dev/i2c-1, ftdi://..., sim://)')
+    parser.add_argument('command', choices=['status', 'flip', 'image', 'bench', 'reset'])
+    parser.add_argument('args', nargs='*', help='Command arguments')
+    parser.add_argument('--back', type=lambda x: int(x, 0), default=BACK_BUFFER,
+                        help=f'Back buffer address (default: 0x{BACK_BUFFER:06X})')
+    parser.add_argument('--layout', help='JSON base register layout '
+                                         '(required except for status)')
+    parser.add_argument('--dither', action='store_true',
+                        help='Ordered dithering for image')
+    parser.add_argument('--hold', type=float, default=5.0,
+                        help='Seconds to show the image before restoring '
+                             'the previous base (default: 5)')
+    parser.add_argument('--keep', action='store_true',
+                        help='Leave the window on the image')
+
+    args = parser.parse_args()
+
+    if args.command != 'status' and not args.layout:
+        parser.error(f"{args.command} writes the unverified GWin base "
+                     f"register; give its layout with --layout")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        layout = load_layout(args.layout) if args.layout else None
+
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            gwin = D72N_GWin(serdb, layout)
+
+            if args.command == 'status':
+                for name, addr in (('Primary', D72N_ADDR.GWIN_PRIMARY),
+                                   ('Secondary', D72N_ADDR.GWIN_SECONDARY),
+                                   ('Enable', D72N_ADDR.GWIN_ENABLE)):
+                    print(f"  {name + ':':<11}0x{serdb.read_xdata(addr):02X}"
+                          f"  (0x{addr:04X})")
+                print(f"  {'Base:':<11}0x{gwin.read_base():06X}"
+                      f"  (0x{gwin.layout['base']:04X}, unverified)")
+
+            elif args.command == 'flip':
+                if len(args.args) != 1:
+                    parser.error("flip takes an address")
+                addr = int(args.args[0], 0)
+                latency = gwin.flip(addr)
+                print(f"[{'+' if gwin.confirmed else '-'}] Flip to "
+                      f"0x{addr:06X}: {describe_flip(gwin, latency)}")
+                if not gwin.confirmed:
+                    return 1
+
+            elif args.command == 'reset':
+                latency = gwin.flip(FRONT_BUFFER)
+                print(f"[{'+' if gwin.confirmed else '-'}] Window back at "
+                      f"0x{FRONT_BUFFER:06X}: {describe_flip(gwin, latency)}")
+                if not gwin.confirmed:
+                    return 1
+
+            elif args.command == 'image':
+                if len(args.args) != 1:
+                    parser.error("image takes a file")
+                original = gwin.read_base()
+                keep = False
+                try:
+                    db = DoubleBuffer(serdb, gwin, back=args.back)
+                    fb = db.back
+                    rgb = load_image(args.args[0], fb.width, fb.height)
+                    fb.blit(0, 0, fb.width, fb.height,
+                            rgb888_to_565(rgb, fb.width, fb.height, args.dither))
+                    print(f"[*] Drawing off-screen at 0x{fb.base:06X}...")
+                    t0 = time.time()
+                    written, latency = db.present(progress=True)
+                    print(f"[+] Wrote {written} bytes in {time.time() - t0:.2f}s, "
+                          f"flip: {describe_flip(gwin, latency)}")
+                    keep = args.keep
+                    if not keep:
+                        print(f"[*] Showing for {args.hold:.1f}s "
+                              f"(--keep to leave it up)")
+                        time.sleep(args.hold)
+                finally:
+                    if not keep:
+                        latency = gwin.flip(original)
+                        print(f"[*] Base restored to 0x{original:06X}: "
+                              f"{describe_flip(gwin, latency)}")
+
+            elif args.command == 'bench':
+                count = int(args.args[0]) if args.args else 10
+                original = gwin.read_base()
+                try:
+                    for i in range(count):
+                        gwin.flip(args.back if i % 2 == 0 else FRONT_BUFFER)
+                    stats = gwin.latency_stats()
+                finally:
+                    gwin.flip(original, verify=False)
+                print_latency(stats)
+
+    except (ValueError, FileNotFoundError) as e:
+        print(f"[-] {e}")
+        return 1
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+D72N Hex Viewer
+===============
+
+Fast hex dump of saved XDATA/DRAM dumps. No hardware required.
+
+The formatter is table driven (bytes.hex + bytes.translate per block of
+lines), and output is streamed, so multi-megabyte dumps render in well
+under a second and can be piped or written straight to a file.
+
+Range selection is by device address (--start/--length, relative to
+--base) and paging is by fixed-size pages of lines.
+
+Usage:
+    python3 d72n_hexview.py main_buffer.bin --base 0x100000
+    python3 d72n_hexview.py main_buffer.bin --base 0x100000 --start 0x100400 --length 0x100
+    python3 d72n_hexview.py main_buffer.bin --page 3 --page-lines 64
+    python3 d72n_hexview.py main_buffer.bin -o main_buffer.txt
+    python3 d72n_hexview.py xdata_full.bin | less
+"""
+
+import argparse
+import mmap
+import os
+import sys
+from d72n_serdb import write_hexdump
+
+
+def view(path, base=0, start=None, length=None, width=16, page=None,
+         page_lines=64, output=None):
+    """Hex dump a file (or a range/page of it)
+
+    Args:
+        path: Dump file
+        base: Device address of the first byte in the file
+        start: First device address to show (default: base)
+        length: Bytes to show (default: to end of file)
+        width: Bytes per line
+        page: Page number (0-based) within the selected range
+        page_lines: Lines per page
+        output: Output file (default: stdout)
+
+    Returns:
+        Number of lines written
+    """
+    size = os.path.getsize(path)
+    offset = 0 if start is None else start - base
+    if offset < 0 or offset > size:
+        raise ValueError(f"Start 0x{start:06X} outside dump "
+                         f"0x{base:06X}-0x{base + size:06X}")
+    if length is None:
+        length = size - offset
+
+    if page is not None:
+        page_bytes = page_lines * width
+        offset += page * page_bytes
+        length = max(0, min(page_bytes, length - page * page_bytes))
+
+    if size == 0 or length == 0:
+        return 0
+
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if output:
+                with open(output, 'w') as out:
+                    return write_hexdump(out, data, base, width,
+                                         offset, length)
+            return write_hexdump(sys.stdout, data, base, width,
+                                 offset, length)
+        finally:
+            data.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Hex Viewer',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Whole dump, addresses relative to the DRAM main buffer
+    python3 d72n_hexview.py main_buffer.bin --base 0x100000
+
+    # Parameter block only
+    python3 d72n_hexview.py main_buffer.bin --base 0x100000 \\
+        --start 0x100400 --length 0x100
+
+    # Page through a large dump
+    python3 d72n_hexview.py main_buffer.bin --page 0
+    python3 d72n_hexview.py main_buffer.bin --page 1
+
+    # Render to a text file
+    python3 d72n_hexview.py main_buffer.bin -o main_buffer.txt
+        """
+    )
+
+    parser.add_argument('file', help='Dump file')
+    parser.add_argument('--base', type=lambda x: int(x, 0), default=0,
+                        help='Address of first byte in file (default: 0)')
+    parser.add_argument('--start', type=lambda x: int(x, 0),
+                        help='First address to show')
+    parser.add_argument('--length', type=lambda x: int(x, 0),
+                        help='Bytes to show')
+    parser.add_argument('--width', type=int, default=16,
+                        help='Bytes per line (default: 16)')
+    parser.add_argument('--page', type=int,
+                        help='Show one page (0-based)')
+    parser.add_argument('--page-lines', type=int, default=64,
+                        help='Lines per page (default: 64)')
+    parser.add_argument('-o', '--output', help='Write to file instead of stdout')
+
+    args = parser.parse_args()
+
+    try:
+        lines = view(args.file, args.base, args.start, args.length,
+                     args.width, args.page, args.page_lines, args.output)
+    except BrokenPipeError:
+        # Output piped to head/less and closed early
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"[-] {e}")
+        return 1
+
+    if args.output:
+        print(f"[+] Wrote {lines} lines to {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -27,12 +27,17 @@ Usage:
     python3 d72n_mailbox.py /dev/i2c-1 status
     python3 d72n_mailbox.py /dev/i2c-1 send 0x01
     python3 d72n_mailbox.py /dev/i2c-1 send 0x10 --params 00 00 10 00
+    python3 d72n_mailbox.py /dev/i2c-1 trace -o trace.json
 """
 
 import argparse
+import json
 import sys
+import threading
 import time
-from d72n_serdb import D72N_SERDB, D72N_ADDR
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from d72n_serdb import open_serdb, D72N_ADDR
 
 
 # Mailbox commands (traced from D72N docs)
@@ -95,7 +100,7 @@ class D72N_Mailbox:
         Returns:
             List of param values
         """
-        return [self.serdb.read_xdata(self.ADDR_PARAM + i) for i in range(count)]
+        return list(self.serdb.read_xdata_range(self.ADDR_PARAM, count))
 
     def read_response(self, count=4):
         """Read response bytes
@@ -108,7 +113,7 @@ class D72N_Mailbox:
         Returns:
             List of response values
         """
-        return [self.serdb.read_xdata(self.ADDR_RESP + i) for i in range(count)]
+        return list(self.serdb.read_xdata_range(self.ADDR_RESP, count))
 
     def read_sync(self):
         """Read sync flag"""
@@ -134,6 +139,69 @@ class D72N_Mailbox:
             time.sleep(0.01)
         return False
 
+    def poll_completion(self, t_written, timeout=1.0, min_interval=0.0005,
+                        max_interval=0.02):
+        """Poll status and sync until a written command completes
+
+        The poll interval starts at min_interval and doubles up to
+        max_interval. A command is complete when status is not
+        Processing and the firmware has either been seen processing it
+        or consumed the sync flag.
+
+        Args:
+            t_written: Time the command write finished
+
+        Returns:
+            (status, t_started, t_done, polls); t_started is the first
+            poll that saw Processing, or None
+
+        Raises:
+            TimeoutError: Not complete within timeout
+        """
+        read = self.serdb.read_xdata
+        t_started = None
+        interval = min_interval
+        polls = 0
+
+        while True:
+            with self.serdb.lock:
+                status = read(self.ADDR_STATUS)
+                sync = read(self.ADDR_SYNC)
+            t = time.time()
+            polls += 1
+
+            if status == STATUS_PROCESSING:
+                if t_started is None:
+                    t_started = t
+            elif t_started is not None or sync != 0xFF:
+                return status, t_started, t, polls
+
+            if t - t_written > timeout:
+                raise TimeoutError(f"Mailbox command timed out "
+                                   f"(status 0x{status:02X})")
+            time.sleep(interval)
+            interval = min(interval * 2, max_interval)
+
+    def command_writes(self, cmd, params=None):
+        """XDATA writes for one command, in firmware order
+
+        Returns:
+            List of (addr, value) tuples: command, params, sync
+        """
+        # Command (traced: 0x2835-0x2839)
+        writes = [(self.ADDR_CMD, cmd)]
+        # Params (traced: 0x283A-0x283C)
+        for i, p in enumerate((params or [])[:self.MAX_PARAMS]):
+            writes.append((self.ADDR_PARAM + i, p))
+        # Sync trigger (traced: 0x24AA-0x24B5)
+        for i in range(4):
+            writes.append((self.ADDR_SYNC + i, 0xFF))
+        return writes
+
+    def write_command(self, cmd, params=None):
+        """Write command, params and sync as one batched transfer"""
+        self.serdb.write_xdata_batch(self.command_writes(cmd, params))
+
     def send_command(self, cmd, params=None, wait=True, timeout=1.0):
         """Send mailbox command
 
@@ -148,20 +216,12 @@ class D72N_Mailbox:
         Returns:
             Response bytes if wait=True, else None
         """
-        # Write command (traced: 0x2835-0x2839)
-        self.serdb.write_xdata(self.ADDR_CMD, cmd)
-
-        # Write params (traced: 0x283A-0x283C)
-        if params:
-            for i, p in enumerate(params[:self.MAX_PARAMS]):
-                self.serdb.write_xdata(self.ADDR_PARAM + i, p)
-
-        # Trigger sync (traced: 0x24AA-0x24B5)
-        for i in range(4):
-            self.serdb.write_xdata(self.ADDR_SYNC + i, 0xFF)
+        self.write_command(cmd, params)
 
         if wait:
-            if not self.wait_ready(timeout):
+            try:
+                self.poll_completion(time.time(), timeout)
+            except TimeoutError:
                 return None
             return self.read_response()
 
@@ -218,6 +278,295 @@ class D72N_Mailbox:
             print(f"  0x{cmd:02X}: {name}{marker}")
 
 
+class MailboxResult(namedtuple('MailboxResult', [
+        'command', 'params', 'status', 'response',
+        't_queued', 't_submit', 't_written', 't_started', 't_done'])):
+    """Completed mailbox command with timing
+
+    t_queued: submit() called
+    t_submit: Batched write started (after earlier commands completed)
+    t_written: Batched write finished
+    t_started: First poll that saw the command accepted (or None)
+    t_done: First poll that saw completion
+    """
+
+    __slots__ = ()
+
+    @property
+    def queue_time(self):
+        return self.t_submit - self.t_queued
+
+    @property
+    def transport_time(self):
+        return self.t_written - self.t_submit
+
+    @property
+    def service_time(self):
+        return self.t_done - self.t_written
+
+    @property
+    def latency(self):
+        return self.t_done - self.t_queued
+
+
+class MailboxClient:
+    """Pipelined mailbox submission with completion futures
+
+    submit() queues a command and returns a concurrent.futures.Future.
+    A shared poller thread writes each command (command, params, sync
+    in one batched transfer) as soon as the previous one completes,
+    then polls status and sync. The poll interval starts at
+    `min_interval` after a submit and backs off exponentially to
+    `max_interval`, capped at a fraction of the average service time
+    seen so far.
+
+    A command is complete when status is not Processing and the
+    firmware has either been seen processing it or consumed the sync
+    flag. Futures resolve to MailboxResult, or raise TimeoutError.
+
+    Args:
+        mb: D72N_Mailbox instance
+        timeout: Per-command completion timeout in seconds
+        min_interval: Shortest poll interval
+        max_interval: Longest poll interval
+    """
+
+    def __init__(self, mb, timeout=1.0, min_interval=0.0005, max_interval=0.02):
+        self.mb = mb
+        self.serdb = mb.serdb
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.polls = 0
+        self.avg_service = None
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, cmd, params=None):
+        """Queue a command
+
+        Returns:
+            Future resolving to MailboxResult
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MailboxClient is closed")
+            self._queue.append((cmd, list(params or []), time.time(), future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='mailbox-poller',
+                                                daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def send(self, cmd, params=None):
+        """Submit and wait for completion"""
+        return self.submit(cmd, params).result()
+
+    def close(self, wait=True):
+        """Stop the poller (after queued commands complete if wait)"""
+        with self._cond:
+            self._closed = True
+            if not wait:
+                for *_, future in self._queue:
+                    future.cancel()
+                self._queue.clear()
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                cmd, params, t_queued, future = self._queue.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._execute(cmd, params, t_queued))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _execute(self, cmd, params, t_queued):
+        mb = self.mb
+
+        t_submit = time.time()
+        mb.write_command(cmd, params)
+        t_written = time.time()
+
+        cap = self.max_interval
+        if self.avg_service:
+            cap = max(self.min_interval, min(cap, self.avg_service / 4))
+
+        try:
+            status, t_started, t, polls = mb.poll_completion(
+                t_written, self.timeout, self.min_interval, cap)
+        except TimeoutError as e:
+            raise TimeoutError(f"{e}, command 0x{cmd:02X}") from None
+        self.polls += polls
+
+        response = mb.read_response()
+        service = t - t_written
+        self.avg_service = (service if self.avg_service is None
+                            else 0.8 * self.avg_service + 0.2 * service)
+        return MailboxResult(cmd, params, status, response,
+                             t_queued, t_submit, t_written, t_started, t)
+
+
+def status_name(status):
+    return {
+        STATUS_PROCESSING: 'Processing',
+        STATUS_READY: 'Ready',
+        STATUS_COMPLETE: 'Complete',
+    }.get(status, f'0x{status:02X}')
+
+
+class MailboxTracer:
+    """Edge-triggered mailbox command tracer
+
+    Polls only the change-indicator bytes (status 0x40FB, command 0x4401,
+    sync 0x4417) in a tight loop. Params are read when a command is
+    issued (sync set or command changed) and the response block when
+    status leaves Processing, so a poll costs three XDATA reads.
+
+    Timestamps are poll times: resolution is one poll period.
+
+    Args:
+        mb: D72N_Mailbox instance
+        param_count: Param bytes captured per command
+    """
+
+    def __init__(self, mb, param_count=8):
+        self.mb = mb
+        self.serdb = mb.serdb
+        self.param_count = param_count
+        self.events = []
+        self.polls = 0
+        self._last = None
+        self._pending = None
+
+    def poll(self):
+        """Read the indicator bytes and handle edges
+
+        Returns:
+            Completed event dictionary, or None
+        """
+        read = self.serdb.read_xdata
+        status = read(self.mb.ADDR_STATUS)
+        cmd = read(self.mb.ADDR_CMD)
+        sync = read(self.mb.ADDR_SYNC)
+        t = time.time()
+        self.polls += 1
+
+        last = self._last
+        self._last = (status, cmd, sync)
+        if last is None:
+            return None
+        last_status, last_cmd, last_sync = last
+
+        done = None
+        pending = self._pending
+        sync_edge = sync and not last_sync
+        if sync_edge and pending and pending['command'] == cmd and \
+                pending['t_start'] is None:
+            # Command byte written one poll before params and sync flag
+            pending['t_sync'] = t
+            pending['params'] = self.mb.read_params(self.param_count)
+        elif sync_edge or cmd != last_cmd:
+            # New command; close out one whose completion was not seen
+            if pending:
+                done = self._finish(pending, t, status, complete=False)
+            self._pending = self._begin(cmd, t_sync=t)
+
+        if status != last_status:
+            pending = self._pending
+            if status == STATUS_PROCESSING:
+                if pending is None:
+                    # Sync edge missed between polls
+                    self._pending = self._begin(cmd, t_start=t)
+                elif pending['t_start'] is None:
+                    pending['t_start'] = t
+            elif pending is not None:
+                done = self._finish(pending, t, status, complete=True)
+                self._pending = None
+
+        return done
+
+    def _begin(self, cmd, t_sync=None, t_start=None):
+        return {
+            'command': cmd,
+            'command_name': MAILBOX_COMMANDS.get(cmd, f'0x{cmd:02X}'),
+            'params': self.mb.read_params(self.param_count),
+            't_sync': t_sync,
+            't_start': t_start,
+            't_done': None,
+        }
+
+    def _finish(self, event, t, status, complete):
+        event['t_done'] = t
+        event['status'] = status
+        event['status_name'] = status_name(status)
+        event['complete'] = complete
+        event['response'] = self.mb.read_response() if complete else None
+        t0 = event['t_sync'] or event['t_start']
+        event['latency'] = t - t0
+        self.events.append(event)
+        return event
+
+    def run(self, duration=None, callback=None):
+        """Trace until duration elapses or Ctrl+C
+
+        Args:
+            duration: Seconds (default: until Ctrl+C)
+            callback: Called with each completed event
+
+        Returns:
+            List of events
+        """
+        t0 = time.time()
+        seen = len(self.events)
+        try:
+            while duration is None or time.time() - t0 < duration:
+                self.poll()
+                if callback and len(self.events) > seen:
+                    for event in self.events[seen:]:
+                        callback(event)
+                seen = len(self.events)
+        except KeyboardInterrupt:
+            pass
+        self.elapsed = time.time() - t0
+        return self.events
+
+
+def format_event(event, t0=0.0):
+    """Single timeline line for a traced command"""
+    start = event['t_sync'] or event['t_start']
+    params = ' '.join(f'{p:02X}' for p in event['params'])
+    if event['complete']:
+        response = ' '.join(f'{r:02X}' for r in event['response'])
+        result = f"{event['status_name']:<10} [{response}]"
+    else:
+        result = "superseded"
+    return (f"{start - t0:10.4f}  0x{event['command']:02X} "
+            f"{event['command_name']:<28} [{params}]  -> {result}  "
+            f"{event['latency'] * 1000:8.1f} ms")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='D72N Mailbox Protocol',
@@ -227,6 +576,8 @@ Commands:
     status  - Show mailbox status
     send    - Send mailbox command
     watch   - Monitor mailbox activity
+    trace   - Edge-triggered command timeline (params, response, latency)
+    submit  - Queue a command N times back to back (batched writes, futures)
 
 Examples:
     # Show current status
@@ -241,6 +592,12 @@ Examples:
     # Monitor mailbox activity
     python3 d72n_mailbox.py /dev/i2c-1 watch
 
+    # Queue 10 JPEG init commands, report per-command service time
+    python3 d72n_mailbox.py /dev/i2c-1 submit 0x01 --repeat 10
+
+    # Trace full command round trips for 60 s, save the timeline
+    python3 d72n_mailbox.py /dev/i2c-1 trace --duration 60 -o trace.json
+
 Known Commands (traced from D72N blocks):
     0x01: MB_JPD_CMD_INIT
     0x02: MB_JPD_CMD_MJPG_START_DEC
@@ -251,7 +608,7 @@ Known Commands (traced from D72N blocks):
 
     parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
     parser.add_argument('command', nargs='?', default='status',
-                        choices=['status', 'send', 'watch'],
+                        choices=['status', 'send', 'watch', 'trace', 'submit'],
                         help='Command to execute (default: status)')
     parser.add_argument('cmd_byte', nargs='?', type=lambda x: int(x, 0),
                         help='Command byte to send (for "send" command)')
@@ -263,6 +620,13 @@ Known Commands (traced from D72N blocks):
                         help='Wait timeout in seconds (default: 1.0)')
     parser.add_argument('--interval', '-i', type=float, default=0.5,
                         help='Watch interval in seconds (default: 0.5)')
+    parser.add_argument('--repeat', '-n', type=int, default=1,
+                        help='Times to queue the command (for "submit")')
+    parser.add_argument('--duration', '-d', type=float,
+                        help='Trace duration in seconds (default: Ctrl+C)')
+    parser.add_argument('--param-count', type=int, default=8,
+                        help='Params captured per traced command (default: 8)')
+    parser.add_argument('-o', '--output', help='Save trace timeline as JSON')
 
     args = parser.parse_args()
 
@@ -273,7 +637,7 @@ Known Commands (traced from D72N blocks):
         bus = args.bus
 
     try:
-        with D72N_SERDB(bus) as serdb:
+        with open_serdb(bus) as serdb:
             if not serdb.probe():
                 print("[-] SERDB not responding at 0x59")
                 return 1
@@ -313,6 +677,32 @@ Known Commands (traced from D72N blocks):
                 else:
                     print("[-] Timeout waiting for response")
 
+            elif args.command == 'submit':
+                if args.cmd_byte is None:
+                    print("[-] Command byte required for 'submit'")
+                    return 1
+
+                params = [int(p, 16) for p in args.params or []]
+                cmd_name = MAILBOX_COMMANDS.get(args.cmd_byte, 'Unknown')
+                print(f"[*] Queueing command 0x{args.cmd_byte:02X} ({cmd_name}) "
+                      f"x{args.repeat}")
+
+                with MailboxClient(mb, timeout=args.timeout) as client:
+                    futures = [client.submit(args.cmd_byte, params)
+                               for _ in range(args.repeat)]
+                    for i, future in enumerate(futures):
+                        try:
+                            r = future.result()
+                        except TimeoutError as e:
+                            print(f"[-] #{i}: {e}")
+                            continue
+                        print(f"[+] #{i}: {status_name(r.status):<10} "
+                              f"[{', '.join(f'0x{b:02X}' for b in r.response)}]  "
+                              f"queue {r.queue_time * 1000:7.1f} ms  "
+                              f"write {r.transport_time * 1000:5.1f} ms  "
+                              f"service {r.service_time * 1000:7.1f} ms")
+                    print(f"[*] {client.polls} status polls")
+
             elif args.command == 'watch':
                 print("Watching mailbox activity (Ctrl+C to stop)...")
                 print()
@@ -341,6 +731,32 @@ Known Commands (traced from D72N blocks):
                 except KeyboardInterrupt:
                     print("\nStopped.")
 
+            elif args.command == 'trace':
+                print("Tracing mailbox commands (Ctrl+C to stop)...")
+                print()
+
+                tracer = MailboxTracer(mb, args.param_count)
+                t0 = time.time()
+                events = tracer.run(args.duration,
+                                    lambda e: print(format_event(e, t0)))
+
+                rate = tracer.polls / tracer.elapsed if tracer.elapsed else 0
+                print()
+                print(f"[+] {len(events)} commands traced, {tracer.polls} polls "
+                      f"({rate:.0f} Hz, {1000 / rate if rate else 0:.1f} ms resolution)")
+                latencies = [e['latency'] for e in events if e['complete']]
+                if latencies:
+                    latencies.sort()
+                    print(f"[*] Latency min/median/max: "
+                          f"{latencies[0] * 1000:.1f} / "
+                          f"{latencies[len(latencies) // 2] * 1000:.1f} / "
+                          f"{latencies[-1] * 1000:.1f} ms")
+
+                if args.output:
+                    with open(args.output, 'w') as f:
+                        json.dump(events, f, indent=2)
+                    print(f"[+] Saved timeline to {args.output}")
+
     except OSError as e:
         print(f"[-] I2C error: {e}")
         return 1
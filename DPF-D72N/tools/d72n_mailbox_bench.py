@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+D72N Mailbox Benchmark
+======================
+
+Throughput and latency benchmark for AEON mailbox commands.
+
+Sends configurable command sequences through MailboxClient (batched
+command/params/sync write, futures completed by a shared poller) and
+splits each command's end-to-end latency into:
+
+  queue      submit() -> batched write starts (waiting for earlier commands)
+  transport  batched write over SERDB
+  service    write finished -> completion seen by the poller (AEON
+             processing plus up to one poll interval)
+
+Distributions are reported per command. Works on hardware and on the
+simulation backend (sim:// models mailbox service delays).
+
+Sequence files are JSON lists of steps:
+
+    [
+      {"cmd": "0x01"},
+      {"cmd": "0x10", "params": "{addr:be32} {size:be32}", "repeat": 20,
+       "stage": {"file": "test.bmp", "addr": "0x100000"}}
+    ]
+
+Param templates are space-separated hex bytes or {field:fmt} tokens.
+Fields: i (iteration), addr, size (staged data). Formats: u8, be16,
+le16, be24, le24, be32, le32.
+
+Usage:
+    python3 d72n_mailbox_bench.py sim:// --cmd 0x01 --repeat 100
+    python3 d72n_mailbox_bench.py /dev/i2c-1 --cmd 0x01 0x20 --repeat 20
+    python3 d72n_mailbox_bench.py /dev/i2c-1 --sequence bench.json -o results.csv
+"""
+
+import argparse
+import csv
+import json
+import re
+import statistics
+import sys
+import time
+from d72n_serdb import open_serdb, SimulationBackend
+from d72n_mailbox import D72N_Mailbox, MailboxClient, MAILBOX_COMMANDS
+
+
+PARAM_FORMATS = {
+    'u8': (1, 'big'),
+    'be16': (2, 'big'), 'le16': (2, 'little'),
+    'be24': (3, 'big'), 'le24': (3, 'little'),
+    'be32': (4, 'big'), 'le32': (4, 'little'),
+}
+
+PHASES = ('queue', 'transport', 'service', 'total')
+
+
+def expand_params(template, **fields):
+    """Expand a param template to a list of bytes
+
+    Args:
+        template: e.g. "00 01 {addr:be32} {i:u8}"
+        fields: Values for {field} tokens
+
+    Returns:
+        List of byte values
+    """
+    out = []
+    for token in (template or '').split():
+        m = re.fullmatch(r'\{(\w+)(?::(\w+))?\}', token)
+        if not m:
+            out.append(int(token, 16))
+            continue
+        name, fmt = m.group(1), m.group(2) or 'u8'
+        if name not in fields:
+            raise ValueError(f"Unknown param field: {name}")
+        if fmt not in PARAM_FORMATS:
+            raise ValueError(f"Unknown param format: {fmt}")
+        width, order = PARAM_FORMATS[fmt]
+        value = fields[name] & ((1 << (8 * width)) - 1)
+        out.extend(value.to_bytes(width, order))
+    return out
+
+
+def load_sequence(path):
+    """Load and normalise a JSON sequence file"""
+    with open(path, 'r') as f:
+        steps = json.load(f)
+    for step in steps:
+        if isinstance(step['cmd'], str):
+            step['cmd'] = int(step['cmd'], 0)
+        stage = step.get('stage')
+        if stage and isinstance(stage.get('addr'), str):
+            stage['addr'] = int(stage['addr'], 0)
+    return steps
+
+
+def stage_dram(serdb, stage):
+    """Write staging data to DRAM (not timed)
+
+    Returns:
+        (addr, size)
+    """
+    with open(stage['file'], 'rb') as f:
+        data = f.read()
+    addr = stage['addr']
+    print(f"[*] Staging {len(data)} bytes at 0x{addr:06X}")
+    serdb.write_dram_range(addr, data)
+    return addr, len(data)
+
+
+def run_benchmark(serdb, steps, serial=False, timeout=1.0):
+    """Run a command sequence
+
+    Args:
+        serdb: D72N_SERDB instance
+        steps: List of {cmd, params, repeat, stage} dictionaries
+        serial: Wait for each command before submitting the next
+                (no queueing); default queues a whole step at once
+        timeout: Per-command timeout
+
+    Returns:
+        (samples, elapsed, polls) - samples are dictionaries with
+        command, iteration, ok and per-phase times (seconds)
+    """
+    mb = D72N_Mailbox(serdb)
+    samples = []
+
+    with MailboxClient(mb, timeout=timeout) as client:
+        t0 = time.time()
+        for step in steps:
+            cmd = step['cmd']
+            addr, size = 0, 0
+            if step.get('stage'):
+                addr, size = stage_dram(serdb, step['stage'])
+
+            repeat = step.get('repeat', 1)
+            futures = []
+            for i in range(repeat):
+                params = expand_params(step.get('params'), i=i,
+                                       addr=addr, size=size)
+                futures.append((i, client.submit(cmd, params)))
+                if serial:
+                    futures[-1][1].exception()
+
+            for i, future in futures:
+                sample = {'command': cmd, 'iteration': i}
+                try:
+                    r = future.result()
+                except TimeoutError:
+                    sample['ok'] = False
+                else:
+                    sample.update(ok=True, queue=r.queue_time,
+                                  transport=r.transport_time,
+                                  service=r.service_time, total=r.latency,
+                                  response=list(r.response))
+                samples.append(sample)
+
+        elapsed = time.time() - t0
+        polls = client.polls
+
+    return samples, elapsed, polls
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1,
+            max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def summarize(samples):
+    """Per-command, per-phase distributions
+
+    Returns:
+        {cmd: {'count', 'timeouts', phase: {min, p50, p90, p99, max, mean}}}
+    """
+    summary = {}
+    for cmd in dict.fromkeys(s['command'] for s in samples):
+        rows = [s for s in samples if s['command'] == cmd]
+        ok = [s for s in rows if s['ok']]
+        entry = {'count': len(rows), 'timeouts': len(rows) - len(ok)}
+        for phase in PHASES:
+            values = sorted(s[phase] for s in ok)
+            entry[phase] = {
+                'min': values[0] if values else 0.0,
+                'p50': percentile(values, 50),
+                'p90': percentile(values, 90),
+                'p99': percentile(values, 99),
+                'max': values[-1] if values else 0.0,
+                'mean': statistics.fmean(values) if values else 0.0,
+            }
+        summary[cmd] = entry
+    return summary
+
+
+def print_summary(summary, elapsed, polls):
+    print()
+    print("=" * 78)
+    print("Mailbox Benchmark (ms)")
+    print("=" * 78)
+    for cmd, entry in summary.items():
+        name = MAILBOX_COMMANDS.get(cmd, 'Unknown')
+        print(f"\n0x{cmd:02X} {name}: {entry['count']} sent, "
+              f"{entry['timeouts']} timeouts")
+        print(f"  {'phase':<10} {'min':>8} {'p50':>8} {'p90':>8} "
+              f"{'p99':>8} {'max':>8} {'mean':>8}")
+        for phase in PHASES:
+            d = entry[phase]
+            print(f"  {phase:<10} " + ' '.join(
+                f"{d[k] * 1000:8.2f}"
+                for k in ('min', 'p50', 'p90', 'p99', 'max', 'mean')))
+
+    total = sum(e['count'] - e['timeouts'] for e in summary.values())
+    print()
+    print(f"[+] {total} commands in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:.1f} cmd/s), {polls} status polls")
+
+
+def save_samples(samples, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['command', 'iteration', 'ok'] +
+                        [f"{p}_ms" for p in PHASES])
+        for s in samples:
+            writer.writerow([f"0x{s['command']:02X}", s['iteration'],
+                             int(s['ok'])] +
+                            [f"{s[p] * 1000:.3f}" if s['ok'] else ''
+                             for p in PHASES])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Mailbox Benchmark',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Simulation (5 ms modelled service time)
+    python3 d72n_mailbox_bench.py sim:// --cmd 0x01 --repeat 100
+
+    # JPEG init and TIFF header commands, 20 each
+    python3 d72n_mailbox_bench.py /dev/i2c-1 --cmd 0x01 0x20 --repeat 20
+
+    # One command at a time (no queueing)
+    python3 d72n_mailbox_bench.py /dev/i2c-1 --cmd 0x01 --repeat 20 --serial
+
+    # BMP decode with a staged image and templated params
+    python3 d72n_mailbox_bench.py /dev/i2c-1 --cmd 0x10 --repeat 10 \\
+        --stage test.bmp 0x100000 --params "{addr:be32} {size:be32}"
+
+    # Sequence file, per-sample CSV
+    python3 d72n_mailbox_bench.py /dev/i2c-1 --sequence bench.json -o results.csv
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1, sim://)')
+    parser.add_argument('--cmd', nargs='+', type=lambda x: int(x, 0),
+                        help='Command bytes to benchmark')
+    parser.add_argument('--params', help='Param template (hex / {field:fmt})')
+    parser.add_argument('--repeat', '-n', type=int, default=10,
+                        help='Repeats per command (default: 10)')
+    parser.add_argument('--stage', nargs=2, metavar=('FILE', 'ADDR'),
+                        help='Write FILE to DRAM at ADDR before the commands')
+    parser.add_argument('--sequence', help='JSON sequence file')
+    parser.add_argument('--serial', action='store_true',
+                        help='Wait for each command before the next')
+    parser.add_argument('--timeout', '-t', type=float, default=1.0,
+                        help='Per-command timeout in seconds (default: 1.0)')
+    parser.add_argument('--sim-service', type=float, metavar='MS',
+                        help='Simulated service time in ms (sim:// only)')
+    parser.add_argument('-o', '--output', help='Save per-sample CSV')
+    parser.add_argument('--json', action='store_true',
+                        help='Print summary as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        if args.sequence:
+            steps = load_sequence(args.sequence)
+        elif args.cmd:
+            stage = None
+            if args.stage:
+                stage = {'file': args.stage[0], 'addr': int(args.stage[1], 0)}
+            steps = [{'cmd': c, 'params': args.params, 'repeat': args.repeat,
+                      'stage': stage} for c in args.cmd]
+        else:
+            parser.error("nothing to run (use --cmd or --sequence)")
+        # Validate templates before touching the device
+        for step in steps:
+            expand_params(step.get('params'), i=0, addr=0, size=0)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[-] Bad sequence: {e}")
+        return 1
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            if args.sim_service is not None and \
+                    isinstance(serdb.backend, SimulationBackend):
+                serdb.backend.mailbox_default_service = args.sim_service / 1000
+
+            count = sum(s.get('repeat', 1) for s in steps)
+            mode = 'serial' if args.serial else 'queued'
+            print(f"[*] Running {count} commands ({mode})")
+
+            samples, elapsed, polls = run_benchmark(
+                serdb, steps, serial=args.serial, timeout=args.timeout)
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    summary = summarize(samples)
+    if args.json:
+        print(json.dumps({f"0x{c:02X}": e for c, e in summary.items()},
+                         indent=2))
+    else:
+        print_summary(summary, elapsed, polls)
+
+    if args.output:
+        save_samples(samples, args.output)
+        print(f"[+] Saved {len(samples)} samples to {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+D72N Screenshot
+===============
+
+Capture the display output buffer (0x150000) to PNG.
+
+  - The 480x234 RGB565 frame is read with read_dram_range, optionally
+    with AEON halted (watchdog paused, exact control values restored,
+    see d72n_snapshot.py) so the frame is not torn by a redraw
+  - RGB565 is unpacked to RGB888 with NumPy when installed (lookup
+    table otherwise) and written as PNG with zlib only (no Pillow)
+
+Every capture reads the whole 224KB frame by default. Incremental
+captures are opt-in (--probes N with --repeat): after the first frame,
+each capture reads N probe rows per 16-pixel tile band (contiguous
+full-width rows, rotating so every row is probed over time) and
+re-reads only the tiles whose probe bytes changed. A change that misses
+every probe row is NOT seen until the rotation reaches it or the next
+full read (--full-every, default every 5th capture in probe mode), so
+a saved frame may hold stale rows; each such frame is reported with a
+warning.
+
+Works offline on snapshots too (snap://DIR).
+
+Usage:
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot.png
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot.png --halt
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot_%03d.png --repeat 20 --interval 1
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot_%03d.png --repeat 20 --probes 2
+    python3 d72n_screenshot.py snap://snap/ -o shot.png
+"""
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+from d72n_serdb import open_serdb
+from d72n_framebuffer import DISPLAY_WIDTH, DISPLAY_HEIGHT, DISPLAY_BUFFER
+
+# Optional vectorised conversion
+_numpy = None
+try:
+    import numpy
+    _numpy = numpy
+except ImportError:
+    pass
+
+
+DEFAULT_TILE = 16
+DEFAULT_PROBES = 0       # Probe rows per tile band (0 = full reads)
+DEFAULT_FULL_EVERY = 5   # Full re-read interval in probe mode
+
+_RGB_TABLE = None
+
+
+def rgb565_to_rgb888(data, width, height):
+    """Unpack little-endian RGB565 to RGB888 bytes
+
+    Channels are expanded with bit replication (0x1F -> 0xFF).
+    """
+    if _numpy is not None:
+        np = _numpy
+        px = np.frombuffer(bytes(data), dtype='<u2').reshape(height, width)
+        out = np.empty((height, width, 3), dtype=np.uint8)
+        r = (px >> 11) & 0x1F
+        g = (px >> 5) & 0x3F
+        b = px & 0x1F
+        out[..., 0] = (r << 3) | (r >> 2)
+        out[..., 1] = (g << 2) | (g >> 4)
+        out[..., 2] = (b << 3) | (b >> 2)
+        return out.tobytes()
+
+    global _RGB_TABLE
+    if _RGB_TABLE is None:
+        _RGB_TABLE = []
+        for v in range(0x10000):
+            r, g, b = (v >> 11) & 0x1F, (v >> 5) & 0x3F, v & 0x1F
+            _RGB_TABLE.append(bytes(((r << 3) | (r >> 2),
+                                     (g << 2) | (g >> 4),
+                                     (b << 3) | (b >> 2))))
+    table = _RGB_TABLE
+    pixels = struct.unpack(f'<{width * height}H', bytes(data))
+    return b''.join(table[v] for v in pixels)
+
+
+def write_png(path, rgb, width, height):
+    """Write 8-bit RGB PNG (filter 0 per row, zlib only)"""
+    stride = width * 3
+    raw = b''.join(b'\x00' + rgb[y * stride:(y + 1) * stride]
+                   for y in range(height))
+
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data +
+                struct.pack('>I', zlib.crc32(kind + data)))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                           8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw, 6)))
+        f.write(chunk(b'IEND', b''))
+
+
+class ScreenCapture:
+    """Full and incremental captures of a DRAM RGB565 buffer
+
+    Args:
+        serdb: D72N_SERDB (or SnapshotSERDB) instance
+        base: DRAM address of the buffer
+        width, height: Size in pixels
+        tile: Tile size for incremental captures
+        probes: Probe rows per tile band per incremental capture
+                (0 = every capture is a full read)
+        halt: Halt AEON while reading
+
+    After each capture last_unread is the number of rows that were not
+    read in full this time (carried over from earlier captures, and
+    possibly stale). It is always 0 for full reads.
+    """
+
+    def __init__(self, serdb, base=DISPLAY_BUFFER, width=DISPLAY_WIDTH,
+                 height=DISPLAY_HEIGHT, tile=DEFAULT_TILE,
+                 probes=DEFAULT_PROBES, halt=False):
+        self.serdb = serdb
+        self.base = base
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.probes = probes
+        self.halt = halt
+        self.stride = width * 2
+        self.cols = (width + tile - 1) // tile
+        self.bands = (height + tile - 1) // tile
+
+        self.frame = None
+        self._phase = 0
+        self.last_bytes = 0
+        self.last_tiles = 0
+        self.last_unread = 0
+
+    def _frozen(self):
+        # Import here: only needed when halting
+        from d72n_snapshot import D72N_Snapshot
+        return D72N_Snapshot(self.serdb, disable_watchdog=True,
+                             halt_aeon=True, stop_mcu=False)
+
+    def capture(self, full=False, progress=False):
+        """Capture a frame
+
+        Args:
+            full: Re-read the whole buffer even if a previous frame exists
+
+        Returns:
+            Packed RGB565 bytes
+        """
+        if self.halt:
+            with self._frozen():
+                return self._capture(full, progress)
+        return self._capture(full, progress)
+
+    def _capture(self, full, progress):
+        if self.frame is None or full or not self.probes:
+            self.frame = bytearray(self.serdb.read_dram_range(
+                self.base, self.stride * self.height,
+                progress=progress))
+            self.last_bytes = len(self.frame)
+            self.last_tiles = self.cols * self.bands
+            self.last_unread = 0
+            return bytes(self.frame)
+
+        read = 0
+        changed = set()
+        rows_read = set()
+
+        # Probe rows: `probes` rows per band, rotating each capture
+        for band in range(self.bands):
+            y0 = band * self.tile
+            rows = min(self.tile, self.height - y0)
+            for p in range(self.probes):
+                y = y0 + (self._phase + p * rows // self.probes) % rows
+                offset = y * self.stride
+                data = self.serdb.read_dram_range(self.base + offset, self.stride)
+                read += self.stride
+                rows_read.add(y)
+                old = self.frame[offset:offset + self.stride]
+                if data == old:
+                    continue
+                self.frame[offset:offset + self.stride] = data
+                for tx in range(self.cols):
+                    a, b = tx * self.tile * 2, min((tx + 1) * self.tile * 2, self.stride)
+                    if data[a:b] != old[a:b]:
+                        changed.add((band, tx))
+        self._phase += 1
+
+        # Re-read changed tiles, grouped into horizontal runs per band
+        for band in range(self.bands):
+            tx = 0
+            while tx < self.cols:
+                if (band, tx) not in changed:
+                    tx += 1
+                    continue
+                end = tx
+                while end < self.cols and (band, end) in changed:
+                    end += 1
+                x0 = tx * self.tile * 2
+                x1 = min(end * self.tile * 2, self.stride)
+                y0 = band * self.tile
+                y1 = min(y0 + self.tile, self.height)
+                if x0 == 0 and x1 == self.stride:
+                    start = y0 * self.stride
+                    length = (y1 - y0) * self.stride
+                    self.frame[start:start + length] = \
+                        self.serdb.read_dram_range(self.base + start, length)
+                    read += length
+                    rows_read.update(range(y0, y1))
+                else:
+                    for y in range(y0, y1):
+                        start = y * self.stride + x0
+                        self.frame[start:start + x1 - x0] = \
+                            self.serdb.read_dram_range(self.base + start, x1 - x0)
+                        read += x1 - x0
+                tx = end
+
+        self.last_bytes = read
+        self.last_tiles = len(changed)
+        self.last_unread = self.height - len(rows_read)
+        return bytes(self.frame)
+
+    def save(self, path, frame=None):
+        """Write the (last) frame as PNG"""
+        frame = self.frame if frame is None else frame
+        write_png(path, rgb565_to_rgb888(frame, self.width, self.height),
+                  self.width, self.height)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Screenshot',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Single screenshot
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot.png
+
+    # Tear-free (AEON halted while reading, watchdog paused)
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot.png --halt
+
+    # 20 captures, one per second (full reads)
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot_%03d.png --repeat 20 --interval 1
+
+    # Same, reading 2 probe rows per tile band and only changed tiles
+    # (may miss changes between probe rows; full read every 5th capture)
+    python3 d72n_screenshot.py /dev/i2c-1 -o shot_%03d.png --repeat 20 --probes 2
+
+    # From an offline snapshot containing the output buffer
+    python3 d72n_screenshot.py snap://snap/ -o shot.png
+
+    # Secondary buffer
+    python3 d72n_screenshot.py /dev/i2c-1 -o secondary.png --addr 0x0C0000
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (/dev/i2c-1, ftdi://..., sim://, snap://DIR)')
+    parser.add_argument('-o', '--output', default='screenshot.png',
+                        help='PNG file; use %%d for --repeat (default: screenshot.png)')
+    parser.add_argument('--addr', type=lambda x: int(x, 0), default=DISPLAY_BUFFER,
+                        help=f'Buffer address (default: 0x{DISPLAY_BUFFER:06X})')
+    parser.add_argument('--halt', action='store_true',
+                        help='Halt AEON while reading')
+    parser.add_argument('--repeat', '-n', type=int, default=1,
+                        help='Number of captures (default: 1)')
+    parser.add_argument('--interval', '-i', type=float, default=1.0,
+                        help='Seconds between captures (default: 1.0)')
+    parser.add_argument('--probes', type=int, default=DEFAULT_PROBES,
+                        help='Probe rows per tile band for incremental '
+                             'captures (default: 0 = full reads)')
+    parser.add_argument('--full-every', type=int, metavar='N',
+                        default=DEFAULT_FULL_EVERY,
+                        help='With --probes, full re-read every N captures '
+                             f'(default: {DEFAULT_FULL_EVERY}, 0 = never)')
+    parser.add_argument('--raw', help='Also save the last frame as raw RGB565')
+
+    args = parser.parse_args()
+
+    if args.repeat > 1 and '%' not in args.output:
+        parser.error("--repeat needs a %d pattern in --output")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            cap = ScreenCapture(serdb, base=args.addr, probes=args.probes,
+                                halt=args.halt)
+
+            for i in range(args.repeat):
+                full = bool(args.full_every) and i % args.full_every == 0
+                t0 = time.time()
+                frame = cap.capture(full=full, progress=(i == 0))
+                t_read = time.time() - t0
+
+                path = args.output % i if '%' in args.output else args.output
+                t0 = time.time()
+                cap.save(path, frame)
+                t_save = time.time() - t0
+
+                print(f"[+] {path}: read {cap.last_bytes} bytes "
+                      f"({cap.last_tiles} tiles) in {t_read:.2f}s, "
+                      f"PNG in {t_save * 1000:.0f} ms")
+                if cap.last_unread:
+                    print(f"  [!] {cap.last_unread} of {cap.height} rows not "
+                          f"re-read (unprobed, may be stale)")
+
+                if i < args.repeat - 1:
+                    time.sleep(args.interval)
+
+            if args.raw:
+                with open(args.raw, 'wb') as f:
+                    f.write(cap.frame)
+                print(f"[+] Raw RGB565 saved to {args.raw}")
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -39,10 +39,23 @@ Usage:
 
     # Simulation mode (no hardware)
     serdb = D72N_SERDB('sim://')
+
+    # Simulation with the output buffer rendered to a live PNG
+    serdb = D72N_SERDB('sim://?display=live.png&fps=5')
+
+    # Offline analysis of a saved snapshot directory (read-only)
+    serdb = open_serdb('snap://./snap/')
 """
 
+import bisect
+import functools
+import json
+import mmap
+import os
 import sys
+import threading
 import time
+import urllib.parse
 
 # =============================================================================
 # I2C Backend Detection
@@ -50,8 +63,10 @@ import time
 
 # Try smbus (Linux native)
 _smbus = None
+_i2c_msg = None  # smbus2 only: combined transfers via i2c_rdwr
 try:
     import smbus2 as _smbus
+    from smbus2 import i2c_msg as _i2c_msg
 except ImportError:
     try:
         import smbus as _smbus
@@ -111,13 +126,52 @@ CHANNEL_NONPM_RIU = 4   # Non-PM RIU
 # Initialization magic
 SERDB_MAGIC = b'SERDB'
 
+# Bus accesses per pipelined group (one lock hold; one kernel call on
+# queued backends)
+DEFAULT_PIPELINE_DEPTH = 32
+
+# Re-reads allowed per tear-free multi-byte read
+DEFAULT_TEAR_RETRIES = 8
+
 
 # =============================================================================
 # I2C Backend Abstraction
 # =============================================================================
 
 class I2CBackend:
-    """Abstract I2C backend interface"""
+    """Abstract I2C backend interface
+
+    Options (query string of the bus spec, e.g. '/dev/i2c-1?queued=1'):
+        settle: Settle delay between SERDB operations (seconds)
+        depth: Bus accesses per pipelined group
+        queued: 1 = run each group as one combined transfer, where the
+                backend supports it (SMBus via smbus2 i2c_rdwr). Off by
+                default: combined transfers use repeated starts, which
+                have not been validated against SERDB hardware.
+    """
+
+    # Settle time between SERDB operations (seconds)
+    settle_delay = 0.001
+
+    # Bus accesses per pipelined group
+    pipeline_depth = DEFAULT_PIPELINE_DEPTH
+
+    # True if transfer() issues a group as one combined transaction.
+    # Otherwise groups run access by access with the settle delay after
+    # each, exactly like single accesses.
+    queued_transfers = False
+
+    def configure(self, options):
+        """Apply bus spec options common to all backends"""
+        if 'settle' in options:
+            self.settle_delay = float(options['settle'])
+        if 'depth' in options:
+            self.pipeline_depth = max(1, int(options['depth']))
+        if options.get('queued', '0') not in ('0', ''):
+            self.enable_queued()
+
+    def enable_queued(self):
+        raise ValueError(f"{type(self).__name__} has no queued transfers")
 
     def write_byte(self, addr, byte):
         raise NotImplementedError
@@ -128,6 +182,29 @@ class I2CBackend:
     def read_byte(self, addr):
         raise NotImplementedError
 
+    def transfer(self, addr, ops):
+        """Run a group of operations back to back
+
+        Args:
+            addr: I2C slave address
+            ops: List of (write_data, read_len) tuples. Each op writes
+                 write_data and then reads read_len bytes (0 = no read).
+
+        Returns:
+            List of read results (bytes) for ops with read_len > 0
+
+        Backends that can queue several transactions in one USB/kernel
+        call override this and set queued_transfers; the default issues
+        them sequentially.
+        """
+        results = []
+        for data, read_len in ops:
+            self.write_bytes(addr, data)
+            if read_len:
+                results.append(bytes(self.read_byte(addr)
+                                     for _ in range(read_len)))
+        return results
+
     def close(self):
         pass
 
@@ -163,6 +240,26 @@ class SMBusBackend(I2CBackend):
     def read_byte(self, addr):
         return self.bus.read_byte(addr)
 
+    def enable_queued(self):
+        if _i2c_msg is None:
+            raise ImportError("queued transfers need smbus2 (pip install smbus2)")
+        self.queued_transfers = True
+
+    def transfer(self, addr, ops):
+        """Run a group as one I2C_RDWR ioctl (repeated starts)"""
+        if not self.queued_transfers:
+            return super().transfer(addr, ops)
+        msgs = []
+        reads = []
+        for data, read_len in ops:
+            msgs.append(_i2c_msg.write(addr, list(data)))
+            if read_len:
+                msg = _i2c_msg.read(addr, read_len)
+                msgs.append(msg)
+                reads.append(msg)
+        self.bus.i2c_rdwr(*msgs)
+        return [bytes(msg) for msg in reads]
+
     def close(self):
         self.bus.close()
 
@@ -211,16 +308,87 @@ class PyFTDIBackend(I2CBackend):
 class SimulationBackend(I2CBackend):
     """Simulation backend for testing without hardware
 
-    Maintains a simulated memory space for XDATA and DRAM.
+    Maintains a simulated memory space for XDATA and DRAM. Transfers
+    count as queued (there is no bus to validate against).
+
+    DRAM model: a write to 0x0000 sets the XDMIU high address byte and
+    arms the next bus access (read or write), which then goes to DRAM
+    at (high << 16) | addr, as on hardware. DRAM writes are kept, so
+    display tools draw into a real output buffer.
+
+    Options (query string of the bus spec, e.g. 'sim://?display=live.png'):
+        display: Render the output buffer to this PNG while running
+                 (see d72n_display_emu.py)
+        fps: Display refresh rate (default 5)
+        fast: 1 = no settle delays (CPU-speed benchmarking)
+
+    Mailbox model: writing 0xFF to the sync flag (0x4417) consumes the
+    sync bytes and sets status (0x40FB) to Processing. After the
+    service delay for that command (mailbox_service, seconds; default
+    mailbox_default_service) status becomes Ready (0xFE) and the
+    response (0x40FC-0x40FF) holds the command byte and a sequence
+    number.
     """
 
-    def __init__(self):
+    # Mailbox addresses (see D72N_ADDR)
+    MB_CMD = 0x4401
+    MB_SYNC = 0x4417
+    MB_STATUS = 0x40FB
+    MB_RESP = 0x40FC
+
+    queued_transfers = True
+
+    def enable_queued(self):
+        pass  # Always queued
+
+    def __init__(self, options=None):
+        options = options or {}
         self.xdata = bytearray(65536)  # 64KB XDATA
         self.dram = bytearray(0x200000)  # 2MB DRAM
         self._dram_high_byte = 0
+        self._dram_armed = False
         self._last_addr = 0
+        self._last_dram = None
+        self.dram_writes = 0
+
+        # Mailbox model
+        self.mailbox_default_service = 0.005
+        self.mailbox_service = {}
+        self.mailbox_count = 0
+        self._mb_done_at = None
+        self.xdata[self.MB_STATUS] = 0xFE
         print("[SIM] Simulation mode - no hardware connected")
 
+        if options.get('fast', '0') not in ('0', ''):
+            self.settle_delay = 0
+
+        self.display = None
+        if options.get('display'):
+            # Import here: only needed when rendering
+            from d72n_display_emu import DisplayEmulator
+            fps = float(options.get('fps', 5))
+            self.display = DisplayEmulator(self, options['display'], fps=fps)
+            self.display.start()
+            print(f"[SIM] Display -> {options['display']} at {fps:g} fps")
+
+    def _mailbox_tick(self):
+        if self._mb_done_at is not None and time.time() >= self._mb_done_at:
+            self._mb_done_at = None
+            self.mailbox_count += 1
+            resp = self.MB_RESP
+            self.xdata[resp] = self.xdata[self.MB_CMD]
+            self.xdata[resp + 1] = self.mailbox_count & 0xFF
+            self.xdata[resp + 2] = 0x00
+            self.xdata[resp + 3] = 0x00
+            self.xdata[self.MB_STATUS] = 0xFE
+
+    def _mailbox_sync(self):
+        cmd = self.xdata[self.MB_CMD]
+        delay = self.mailbox_service.get(cmd, self.mailbox_default_service)
+        self.xdata[self.MB_SYNC:self.MB_SYNC + 4] = bytes(4)
+        self.xdata[self.MB_STATUS] = 0x00
+        self._mb_done_at = time.time() + delay
+
     def write_byte(self, addr, byte):
         # Just track commands
         pass
@@ -230,22 +398,43 @@ class SimulationBackend(I2CBackend):
             # Bus access command
             full_addr = (data[1] << 24) | (data[2] << 16) | (data[3] << 8) | data[4]
             self._last_addr = full_addr
+            self._last_dram = None
+
+            if self._dram_armed:
+                # Access following an XDMIU high-byte write goes to DRAM
+                self._dram_armed = False
+                dram_addr = ((self._dram_high_byte << 16) |
+                             (full_addr & 0xFFFF)) % len(self.dram)
+                if len(data) > 5:
+                    self.dram[dram_addr] = data[5]
+                    self.dram_writes += 1
+                else:
+                    self._last_dram = dram_addr
+                return
 
             if len(data) > 5:
                 # Write operation
                 if full_addr == 0x0000:
                     self._dram_high_byte = data[5]
+                    self._dram_armed = True
                 elif full_addr < 0x10000:
                     self.xdata[full_addr] = data[5]
+                    if full_addr == self.MB_SYNC and data[5] == 0xFF:
+                        self._mailbox_sync()
 
     def read_byte(self, addr):
         # Return from last accessed address
+        self._mailbox_tick()
+        if self._last_dram is not None:
+            return self.dram[self._last_dram]
         if self._last_addr < 0x10000:
             return self.xdata[self._last_addr]
         return 0
 
     def close(self):
-        pass
+        if self.display is not None:
+            self.display.stop()
+            self.display = None
 
 
 def create_backend(bus_spec):
@@ -255,7 +444,9 @@ def create_backend(bus_spec):
         bus_spec: One of:
             - '/dev/i2c-1' or '1' - Linux smbus
             - 'ftdi://...' - FTDI USB adapter
-            - 'sim://' - Simulation mode
+            - 'sim://' - Simulation mode ('sim://?display=live.png&fps=5&fast=1',
+              see SimulationBackend)
+            Any spec may carry '?settle=S&depth=N&queued=1' (see I2CBackend)
 
     Returns:
         I2CBackend instance
@@ -263,23 +454,105 @@ def create_backend(bus_spec):
     if isinstance(bus_spec, int):
         return SMBusBackend(bus_spec)
 
+    bus_spec, _, query = bus_spec.partition('?')
+    options = dict(urllib.parse.parse_qsl(query))
+
     if bus_spec.startswith('sim://') or bus_spec == 'sim':
-        return SimulationBackend()
+        backend = SimulationBackend(options)
+    elif bus_spec.startswith('ftdi://'):
+        backend = PyFTDIBackend(bus_spec)
+    elif bus_spec.startswith('/dev/i2c-') or bus_spec.isdigit():
+        backend = SMBusBackend(bus_spec)
+    else:
+        raise ValueError(f"Unknown bus specification: {bus_spec}\n"
+                         f"Available backends: {get_available_backends()}")
 
-    if bus_spec.startswith('ftdi://'):
-        return PyFTDIBackend(bus_spec)
+    backend.configure(options)
+    return backend
+
+
+# =============================================================================
+# Hex Dump Formatting
+# =============================================================================
+
+# Byte -> ASCII column character ('.' for non-printable)
+HEXDUMP_ASCII = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
+
+# Lines formatted per block in hexdump_lines()
+HEXDUMP_BLOCK_LINES = 4096
+
+
+def hexdump_lines(data, start_addr=0, width=16, offset=0, length=None):
+    """Yield hex dump lines
+
+    Table driven: each block of lines is converted with one bytes.hex()
+    call and one bytes.translate() call, then sliced per line.
+
+    Args:
+        data: bytes-like object
+        start_addr: Address of data[0]
+        width: Bytes per line
+        offset: First byte of data to show
+        length: Bytes to show (default: to end of data)
+
+    Yields:
+        "AAAAAA  HH HH ...  ascii" lines (no trailing newline)
+    """
+    data = memoryview(data).cast('B')
+    end = len(data) if length is None else min(len(data), offset + length)
+    pad = width * 3
+    step = width * HEXDUMP_BLOCK_LINES
+
+    for block_start in range(offset, end, step):
+        block = bytes(data[block_start:min(block_start + step, end)])
+        hex_str = block.hex(' ').upper()
+        ascii_str = block.translate(HEXDUMP_ASCII).decode('ascii')
+        addr = start_addr + block_start
+
+        for i in range(0, len(block), width):
+            hex_part = hex_str[i * 3:(i + width) * 3 - 1]
+            yield (f"{addr + i:06X}  {hex_part:<{pad}}  "
+                   f"{ascii_str[i:i + width]}")
 
-    if bus_spec.startswith('/dev/i2c-') or bus_spec.isdigit():
-        return SMBusBackend(bus_spec)
 
-    raise ValueError(f"Unknown bus specification: {bus_spec}\n"
-                     f"Available backends: {get_available_backends()}")
+def hexdump(data, start_addr=0, width=16, offset=0, length=None):
+    """Format data as hex dump string"""
+    return '\n'.join(hexdump_lines(data, start_addr, width, offset, length))
+
+
+def write_hexdump(fp, data, start_addr=0, width=16, offset=0, length=None):
+    """Stream a hex dump to a text file/pipe without building it in memory
+
+    Returns:
+        Number of lines written
+    """
+    lines = 0
+    batch = []
+    for line in hexdump_lines(data, start_addr, width, offset, length):
+        batch.append(line)
+        if len(batch) == HEXDUMP_BLOCK_LINES:
+            fp.write('\n'.join(batch) + '\n')
+            lines += len(batch)
+            batch = []
+    if batch:
+        fp.write('\n'.join(batch) + '\n')
+        lines += len(batch)
+    return lines
 
 
 # =============================================================================
 # Main SERDB Class
 # =============================================================================
 
+def _locked(method):
+    """Run a SERDB access method holding the session lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class D72N_SERDB:
     """D72N SERDB I2C interface using proper protocol
 
@@ -292,6 +565,10 @@ class D72N_SERDB:
     - Linux: native I2C via smbus
     - Windows/macOS: FTDI USB adapters via pyftdi
     - Any platform: simulation mode for testing
+
+    Access methods hold `lock` (an RLock), so one session can be shared
+    between threads (e.g. a background poller). Hold `lock` explicitly
+    to make a sequence of calls atomic.
     """
 
     def __init__(self, i2c_bus, addr=SERDB_I2C_ADDR, auto_init=True):
@@ -307,9 +584,14 @@ class D72N_SERDB:
         """
         self.backend = create_backend(i2c_bus)
         self.addr = addr
-        self._delay = 0.001  # 1ms between operations
+        self._delay = self.backend.settle_delay  # 1ms on hardware
+        self.pipeline_depth = self.backend.pipeline_depth
+        self.tear_retries = DEFAULT_TEAR_RETRIES
+        self.tear_stats = {'reads': 0, 'retries': 0, 'failures': 0}
+        self.bus_accesses = 0  # Bus access commands sent (all channels)
         self._current_channel = None
         self._initialized = False
+        self.lock = threading.RLock()
 
         if auto_init:
             self.init()
@@ -376,8 +658,8 @@ class D72N_SERDB:
         self._write_byte(CMD_ENABLE_ACCESS)  # 0x35
         self._write_byte(CMD_I2C_RESHAPE)    # 0x71
 
-    def _bus_access(self, addr, read=True, write_data=None):
-        """Perform bus access with 4-byte big-endian address"""
+    def _bus_cmd(self, addr, write_data=None):
+        """Build a bus access command with 4-byte big-endian address"""
         cmd = bytes([
             CMD_BUS_ACCESS,
             (addr >> 24) & 0xFF,
@@ -389,12 +671,94 @@ class D72N_SERDB:
         if write_data is not None:
             cmd = cmd + bytes([write_data])
 
-        self._write_bytes(cmd)
+        return cmd
+
+    def _bus_access(self, addr, read=True, write_data=None):
+        """Perform bus access with 4-byte big-endian address"""
+        self._write_bytes(self._bus_cmd(addr, write_data))
+        self.bus_accesses += 1
 
         if read:
             return self._read_byte()
         return None
 
+    def _bus_pipeline(self, ops, depth=None, channel=CHANNEL_XDATA):
+        """Run bus accesses in groups of `depth`
+
+        Each group runs under one hold of the session lock (not the
+        whole range), so other threads such as a watchdog keep-alive get
+        the bus between groups of a long dump, and multi-access
+        sequences (XDMIU high byte + access, hi-lo-hi) are never split.
+
+        On backends with queued transfers (smbus2 with '?queued=1', the
+        simulator) a group is one combined transaction followed by a
+        single settle delay. Elsewhere accesses run one by one with the
+        usual settle delay after each; only the locking is grouped.
+
+        Args:
+            ops: List of (bus_cmd, read_len) tuples
+            depth: Accesses per group (default: self.pipeline_depth)
+            channel: Bus channel for the accesses
+
+        Returns:
+            Concatenated read data (bytes)
+        """
+        depth = depth or self.pipeline_depth
+        out = bytearray()
+        for i in range(0, len(ops), depth):
+            group = ops[i:i + depth]
+            with self.lock:
+                self._set_channel(channel)
+                self.bus_accesses += len(group)
+                if not self.backend.queued_transfers:
+                    for data, read_len in group:
+                        self._write_bytes(data)
+                        for _ in range(read_len):
+                            out.append(self._read_byte())
+                    continue
+                for result in self.backend.transfer(self.addr, group):
+                    out += result
+            time.sleep(self._delay)
+        return bytes(out)
+
+    def _read_stable(self, addrs, channel=CHANNEL_XDATA, retries=None):
+        """Tear-free read of a multi-byte value
+
+        Reads the upper bytes, the least significant byte, then the
+        upper bytes again (hi-lo-hi) as one pipelined transfer under
+        the session lock. The value is accepted when both upper reads
+        agree, so a carry out of the low byte between the accesses is
+        never combined into a torn value. Retries and failures (value
+        still changing after `retries` re-reads; the last read is
+        returned) are counted in tear_stats.
+
+        Args:
+            addrs: Byte addresses, least significant first
+            channel: Bus channel
+            retries: Re-reads allowed (default: self.tear_retries)
+
+        Returns:
+            Integer value
+        """
+        if retries is None:
+            retries = self.tear_retries
+        upper = [self._bus_cmd(a) for a in reversed(addrs[1:])]
+        ops = [(c, 1) for c in upper]
+        ops = ops + [(self._bus_cmd(addrs[0]), 1)] + ops
+        n = len(upper)
+
+        self.tear_stats['reads'] += 1
+        for attempt in range(retries + 1):
+            data = self._bus_pipeline(ops, len(ops), channel)
+            if data[:n] == data[n + 1:]:
+                break
+            if attempt < retries:
+                self.tear_stats['retries'] += 1
+        else:
+            self.tear_stats['failures'] += 1
+
+        return int.from_bytes(data[n + 1:] + data[n:n + 1], 'big')
+
     def _exit_serdb(self):
         """Send exit sequence: 0x34 then 0x45"""
         try:
@@ -404,6 +768,7 @@ class D72N_SERDB:
             pass  # Expected NAK on 0x45
         self._initialized = False
 
+    @_locked
     def init(self):
         """Initialize SERDB session"""
         self._write_magic()
@@ -412,6 +777,7 @@ class D72N_SERDB:
         self._initialized = True
         self._current_channel = CHANNEL_XDATA
 
+    @_locked
     def reinit(self):
         """Re-initialize after errors"""
         self._current_channel = None
@@ -422,25 +788,63 @@ class D72N_SERDB:
     # XDATA Access (Channel 0)
     # ==========================================================================
 
+    @_locked
     def read_xdata(self, addr):
         """Read byte from XDATA (16-bit address space)"""
         self._set_channel(CHANNEL_XDATA)
         return self._bus_access(addr & 0xFFFF, read=True)
 
+    @_locked
     def write_xdata(self, addr, value):
         """Write byte to XDATA"""
         self._set_channel(CHANNEL_XDATA)
         self._bus_access(addr & 0xFFFF, read=False, write_data=value & 0xFF)
 
-    def read_xdata_range(self, start, length):
-        """Read range of bytes from XDATA"""
-        self._set_channel(CHANNEL_XDATA)
-        return bytes(self.read_xdata(start + i) for i in range(length))
+    def read_xdata_range(self, start, length, depth=None):
+        """Read range of bytes from XDATA
+
+        Reads are pipelined `depth` accesses at a time (see _bus_pipeline).
+        """
+        ops = [(self._bus_cmd((start + i) & 0xFFFF), 1) for i in range(length)]
+        return self._bus_pipeline(ops, depth)
+
+    def read_xdata_int(self, addr, width=2, endian='little', retries=None):
+        """Tear-free read of a multi-byte XDATA integer (see _read_stable)"""
+        addrs = [(addr + i) & 0xFFFF for i in range(width)]
+        if endian == 'big':
+            addrs.reverse()
+        return self._read_stable(addrs, CHANNEL_XDATA, retries)
+
+    def write_xdata_range(self, start, data, depth=None):
+        """Write contiguous bytes to XDATA
+
+        Writes are pipelined `depth` accesses at a time (see _bus_pipeline).
+        """
+        self.write_xdata_batch(
+            [((start + i) & 0xFFFF, b) for i, b in enumerate(data)], depth)
+
+    def write_xdata_batch(self, writes, depth=None):
+        """Write scattered XDATA bytes as one pipelined batch
+
+        Writes are issued in list order.
+
+        Args:
+            writes: List of (addr, value) tuples
+            depth: Accesses per group (default: self.pipeline_depth)
+        """
+        ops = [(self._bus_cmd(addr & 0xFFFF, value & 0xFF), 0)
+               for addr, value in writes]
+        self._bus_pipeline(ops, depth)
 
     # ==========================================================================
     # DRAM Access via XDMIU
     # ==========================================================================
 
+    def _pair_depth(self, depth):
+        """Round a pipeline depth down to whole (high byte, access) pairs"""
+        return max(2, (depth or self.pipeline_depth) & ~1)
+
+    @_locked
     def read_dram(self, addr):
         """Read byte from DRAM (24-bit address via XDMIU)"""
         self._set_channel(CHANNEL_XDATA)
@@ -449,36 +853,61 @@ class D72N_SERDB:
         # Access low 16 bits
         return self._bus_access(addr & 0xFFFF, read=True)
 
+    @_locked
     def write_dram(self, addr, value):
         """Write byte to DRAM"""
         self._set_channel(CHANNEL_XDATA)
         self._bus_access(0x0000, read=False, write_data=(addr >> 16) & 0xFF)
         self._bus_access(addr & 0xFFFF, read=False, write_data=value & 0xFF)
 
-    def read_dram_range(self, start, length, progress=False):
-        """Read range of bytes from DRAM"""
-        data = bytearray(length)
-        for i in range(length):
-            data[i] = self.read_dram(start + i)
-            if progress and (i % 1024 == 0):
-                pct = (i * 100) // length
+    def read_dram_range(self, start, length, progress=False, depth=None):
+        """Read range of bytes from DRAM
+
+        Each byte still takes the XDMIU high-byte write plus the read, but
+        the accesses are pipelined `depth` at a time (see _bus_pipeline).
+        Groups hold an even number of accesses so a high-byte write and
+        its access are never split between two lock holds.
+        """
+        depth = self._pair_depth(depth)
+        data = bytearray()
+        for offset in range(0, length, 1024):
+            ops = []
+            for addr in range(start + offset, start + min(offset + 1024, length)):
+                ops.append((self._bus_cmd(0x0000, (addr >> 16) & 0xFF), 0))
+                ops.append((self._bus_cmd(addr & 0xFFFF), 1))
+            data += self._bus_pipeline(ops, depth)
+            if progress:
+                pct = (offset * 100) // length
                 print(f"\rReading: {pct}%", end='', flush=True)
         if progress:
             print("\rReading: 100%")
         return bytes(data)
 
+    def write_dram_range(self, start, data, depth=None):
+        """Write contiguous bytes to DRAM
+
+        Each byte takes the XDMIU high-byte write plus the data write,
+        pipelined `depth` accesses at a time (see read_dram_range).
+        """
+        depth = self._pair_depth(depth)
+        ops = []
+        for i, value in enumerate(data):
+            addr = start + i
+            ops.append((self._bus_cmd(0x0000, (addr >> 16) & 0xFF), 0))
+            ops.append((self._bus_cmd(addr & 0xFFFF, value & 0xFF), 0))
+        self._bus_pipeline(ops, depth)
+
     # ==========================================================================
     # RIU Access
     # ==========================================================================
 
     def read_riu(self, bank, offset, pm=False):
-        """Read 16-bit RIU register"""
-        self._set_channel(CHANNEL_PM_RIU if pm else CHANNEL_NONPM_RIU)
+        """Read 16-bit RIU register (tear-free, see _read_stable)"""
         addr = (bank << 8) | (offset & 0xFF)
-        low = self._bus_access(addr, read=True)
-        high = self._bus_access(addr + 1, read=True)
-        return (high << 8) | low
+        return self._read_stable([addr, addr + 1],
+                                 CHANNEL_PM_RIU if pm else CHANNEL_NONPM_RIU)
 
+    @_locked
     def write_riu(self, bank, offset, value, pm=False):
         """Write 16-bit RIU register"""
         self._set_channel(CHANNEL_PM_RIU if pm else CHANNEL_NONPM_RIU)
@@ -486,15 +915,34 @@ class D72N_SERDB:
         self._bus_access(addr, read=False, write_data=value & 0xFF)
         self._bus_access(addr + 1, read=False, write_data=(value >> 8) & 0xFF)
 
+    def write_riu_batch(self, writes, pm=False, depth=None):
+        """Write RIU register bytes as one pipelined batch
+
+        For programming a block of byte-wide registers (e.g. a DMA
+        descriptor) without a settle delay per byte. Writes are issued
+        in list order.
+
+        Args:
+            writes: List of (addr, value) tuples, addr = (bank << 8) | offset
+            pm: PM RIU instead of non-PM
+            depth: Accesses per group (default: self.pipeline_depth)
+        """
+        ops = [(self._bus_cmd(addr & 0xFFFF, value & 0xFF), 0)
+               for addr, value in writes]
+        self._bus_pipeline(ops, depth,
+                           CHANNEL_PM_RIU if pm else CHANNEL_NONPM_RIU)
+
     # ==========================================================================
     # MCU Control
     # ==========================================================================
 
+    @_locked
     def stop_mcu(self):
         """Stop the MCU (8051)"""
         self._write_byte(CMD_BEFORE_STOP)
         self._write_byte(CMD_STOP_MCU)
 
+    @_locked
     def resume_mcu(self):
         """Resume the MCU (8051)"""
         self._write_byte(CMD_RESUME_MCU)
@@ -515,13 +963,204 @@ class D72N_SERDB:
 
     def hexdump(self, data, start_addr=0, width=16):
         """Format data as hex dump"""
-        lines = []
-        for i in range(0, len(data), width):
-            chunk = data[i:i+width]
-            hex_part = ' '.join(f'{b:02X}' for b in chunk)
-            ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-            lines.append(f"{start_addr + i:06X}  {hex_part:<{width*3}}  {ascii_part}")
-        return '\n'.join(lines)
+        return hexdump(data, start_addr, width)
+
+
+# =============================================================================
+# Offline Snapshot Access
+# =============================================================================
+
+class SnapshotSERDB:
+    """Read-only D72N_SERDB stand-in backed by memory-mapped snapshot files
+
+    Offers the same read API as D72N_SERDB (read_xdata, read_dram,
+    read_xdata_range, read_dram_range, read_riu) so live-hardware scripts
+    run unchanged against saved dumps. Range reads that fall inside one
+    region return zero-copy memoryview slices of the mapped file.
+
+    Sources:
+        - A snapshot/session directory with manifest.json
+          (d72n_snapshot.py, d72n_dump_scheduler.py)
+        - A single file, taken as an XDATA image at 0x0000
+          (d72n_dump_xdata.py --full)
+        - Any file added with add_region()
+
+    Writes raise OSError; reading an address not covered by the
+    snapshot raises OSError as well.
+    """
+
+    SPACES = ('xdata', 'dram', 'riu', 'pm_riu')
+
+    def __init__(self, path=None):
+        self._regions = {space: [] for space in self.SPACES}
+        self._starts = {space: [] for space in self.SPACES}
+        self._files = []
+        self.manifest = None
+        self.lock = threading.RLock()
+        self.tear_stats = {'reads': 0, 'retries': 0, 'failures': 0}
+        self.bus_accesses = 0
+
+        if path is None:
+            return
+        if os.path.isdir(path):
+            self._load_manifest(path)
+        else:
+            self.add_region('xdata', 0x0000, path)
+
+    def _load_manifest(self, path):
+        with open(os.path.join(path, 'manifest.json'), 'r') as f:
+            self.manifest = json.load(f)
+        for entry in self.manifest['regions']:
+            if entry.get('done', entry['length']) <= 0:
+                continue
+            self.add_region(entry['space'], entry['start'],
+                            os.path.join(path, entry['file']),
+                            entry.get('done', entry['length']))
+
+    def add_region(self, space, start, filename, length=None):
+        """Map a dump file at `start` in `space`
+
+        Args:
+            space: 'xdata', 'dram', 'riu' or 'pm_riu'
+            start: Address of the first byte in the file
+            filename: Dump file
+            length: Valid bytes (default: whole file)
+        """
+        if space not in self.SPACES:
+            raise ValueError(f"Unknown address space: {space}")
+
+        f = open(filename, 'rb')
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            f.close()
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append((f, mm))
+
+        view = memoryview(mm)
+        if length is not None:
+            view = view[:min(length, size)]
+
+        idx = bisect.bisect(self._starts[space], start)
+        self._starts[space].insert(idx, start)
+        self._regions[space].insert(idx, (start, start + len(view), view))
+
+    def _covering(self, space, addr):
+        """Find the region containing addr that extends furthest"""
+        best = None
+        idx = bisect.bisect(self._starts[space], addr) - 1
+        while idx >= 0:
+            region = self._regions[space][idx]
+            if region[1] > addr and (best is None or region[1] > best[1]):
+                best = region
+            idx -= 1
+        return best
+
+    def _read_range(self, space, addr, length):
+        region = self._covering(space, addr)
+        if region is not None and addr + length <= region[1]:
+            start, _, view = region
+            return view[addr - start:addr - start + length]
+
+        # Range spans several regions - assemble a copy
+        out = bytearray()
+        while len(out) < length:
+            pos = addr + len(out)
+            region = self._covering(space, pos)
+            if region is None:
+                raise OSError(f"{space} 0x{pos:06X} not in snapshot")
+            start, end, view = region
+            take = min(end - pos, length - len(out))
+            out += view[pos - start:pos - start + take]
+        return memoryview(bytes(out))
+
+    def regions(self, space):
+        """List (start, length) of mapped regions in a space"""
+        return [(start, end - start) for start, end, _ in self._regions[space]]
+
+    def close(self):
+        """Unmap all snapshot files"""
+        for space in self.SPACES:
+            for _, _, view in self._regions[space]:
+                view.release()
+            self._regions[space] = []
+            self._starts[space] = []
+        for f, mm in self._files:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # Caller still holds a memoryview slice
+            f.close()
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Read API (D72N_SERDB compatible)
+
+    def read_xdata(self, addr):
+        return self._read_range('xdata', addr & 0xFFFF, 1)[0]
+
+    def read_xdata_range(self, start, length, depth=None):
+        return self._read_range('xdata', start, length)
+
+    def read_xdata_int(self, addr, width=2, endian='little', retries=None):
+        return int.from_bytes(self._read_range('xdata', addr, width), endian)
+
+    def read_dram(self, addr):
+        return self._read_range('dram', addr & 0xFFFFFF, 1)[0]
+
+    def read_dram_range(self, start, length, progress=False, depth=None):
+        return self._read_range('dram', start, length)
+
+    def read_riu(self, bank, offset, pm=False):
+        addr = (bank << 8) | (offset & 0xFF)
+        data = self._read_range('pm_riu' if pm else 'riu', addr, 2)
+        return (data[1] << 8) | data[0]
+
+    # Write API - snapshots are read-only
+
+    def _read_only(self, *args, **kwargs):
+        raise OSError("Snapshot is read-only")
+
+    write_xdata = _read_only
+    write_xdata_range = _read_only
+    write_xdata_batch = _read_only
+    write_dram = _read_only
+    write_dram_range = _read_only
+    write_riu = _read_only
+    write_riu_batch = _read_only
+
+    # Session API
+
+    def stop_mcu(self):
+        pass
+
+    def resume_mcu(self):
+        pass
+
+    def probe(self):
+        return True
+
+    hexdump = D72N_SERDB.hexdump
+
+
+def open_serdb(bus_spec, **kwargs):
+    """Open a live SERDB session or an offline snapshot
+
+    Args:
+        bus_spec: Any D72N_SERDB bus specification, or
+                  'snap://<dir or file>' for a SnapshotSERDB
+
+    Returns:
+        D72N_SERDB or SnapshotSERDB
+    """
+    if isinstance(bus_spec, str) and bus_spec.startswith('snap://'):
+        return SnapshotSERDB(bus_spec[len('snap://'):])
+    return D72N_SERDB(bus_spec, **kwargs)
 
 
 # =============================================================================
@@ -529,13 +1168,18 @@ class D72N_SERDB:
 # =============================================================================
 
 class D72N_ADDR:
-    """D72N traced addresses from documentation"""
+    """D72N traced addresses from documentation
+
+    See d72n_varmap.py for the full declarative variable map
+    (widths, bitfields, volatility).
+    """
 
     # Mailbox
     MAILBOX_CMD = 0x4401
     MAILBOX_PARAM = 0x4402
     MAILBOX_SYNC = 0x4417
     MAILBOX_STATUS = 0x40FB
+    MAILBOX_RESP = 0x40FC
 
     # AEON Control
     AEON_CTRL = 0x0FE6
@@ -545,6 +1189,17 @@ class D72N_ADDR:
     WDT_COUNTER_LO = 0x44D3
     WDT_COUNTER_HI = 0x44D4
 
+    # State machine (high ref count)
+    STATE_PRIMARY = 0x4800      # 16-bit, high byte first
+    STATE_SECONDARY = 0x4185
+    STATE_DECODE = 0x4A9D
+    STATE_STORAGE = 0x4100
+
+    # GWin (traced from multiple blocks)
+    GWIN_PRIMARY = 0x6EA8
+    GWIN_SECONDARY = 0x6FA8
+    GWIN_ENABLE = 0x6EE0
+
     # DRAM Buffers
     DRAM_MAIN_BUFFER = 0x100000
     DRAM_SECONDARY = 0x0C0000
@@ -624,12 +1279,12 @@ Available backends: """ + ', '.join(get_available_backends())
             if args.dump_xdata:
                 start, length = args.dump_xdata
                 data = serdb.read_xdata_range(start, length)
-                print(serdb.hexdump(data, start))
+                write_hexdump(sys.stdout, data, start)
 
             if args.dump_dram:
                 start, length = args.dump_dram
                 data = serdb.read_dram_range(start, length, progress=True)
-                print(serdb.hexdump(data, start))
+                write_hexdump(sys.stdout, data, start)
 
             if args.write_xdata:
                 addr, val = int(args.write_xdata[0], 0), int(args.write_xdata[1], 0)
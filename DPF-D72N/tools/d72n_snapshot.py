@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+D72N Point-in-Time Snapshot
+===========================
+
+Reproducible DRAM/XDATA snapshots with both processors frozen.
+
+AEON keeps decoding into 0x100000 while a multi-minute SERDB read is in
+progress, so plain dumps are never consistent. The snapshot orchestrator:
+
+  1. Reads the prior watchdog state/counter and AEON control values
+  2. Disables the watchdog (D72N_Watchdog.disable)
+  3. Halts AEON (D72N_AEON.halt)
+  4. Stops the 8051 (D72N_SERDB.stop_mcu)
+  5. Dumps the requested regions with pipelined range reads
+  6. Writes back the exact prior watchdog counter, watchdog state and
+     AEON control values while the 8051 is still stopped, then resumes
+     the 8051 last
+
+Freeze/restore happen in a try/finally, so the device is never left
+halted after an error or Ctrl+C. If a freeze step fails, the steps
+already taken are undone before the error propagates. The frozen
+duration (AEON halt to the first restore step) is recorded in the
+snapshot manifest.
+
+Snapshot directories use the same manifest.json layout as
+d72n_dump_scheduler.py.
+
+Usage:
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --region main
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --region header --region params
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --range 0x100000 0x2000
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --xdata 0x4000 0x500
+"""
+
+import argparse
+import os
+import sys
+import time
+from d72n_serdb import D72N_SERDB
+from d72n_aeon_control import D72N_AEON
+from d72n_watchdog import D72N_Watchdog
+from d72n_dump_dram import dump_dram_region, DRAM_BUFFERS, MAIN_BUFFER_REGIONS
+from d72n_dump_xdata import dump_region
+from d72n_dump_scheduler import new_manifest, write_manifest
+
+
+class D72N_Snapshot:
+    """Freeze both processors, dump, and restore
+
+    Args:
+        serdb: D72N_SERDB instance
+        disable_watchdog: Disable the watchdog while frozen
+        halt_aeon: Halt AEON while frozen
+        stop_mcu: Stop the 8051 while frozen
+    """
+
+    def __init__(self, serdb, disable_watchdog=True, halt_aeon=True,
+                 stop_mcu=True):
+        self.serdb = serdb
+        self.aeon = D72N_AEON(serdb)
+        self.wdt = D72N_Watchdog(serdb)
+        self.disable_watchdog = disable_watchdog
+        self.halt_aeon = halt_aeon
+        self.stop_mcu = stop_mcu
+
+        self.prior = None
+        self.frozen = False
+        self._wdt_disabled = False
+        self._aeon_halted = False
+        self._mcu_stopped = False
+        self._t_frozen = None
+        self.frozen_duration = 0.0
+
+    def freeze(self):
+        """Record prior control values and freeze the device
+
+        Each step's flag is set before the step runs, so a step that
+        fails midway is still undone (restores write prior values and
+        are safe to repeat). On error the device is thawed before the
+        exception propagates.
+        """
+        self.prior = {
+            'aeon_ctrl': self.aeon.read_ctrl(),
+            'wdt_state': self.wdt.read_state(),
+            'wdt_counter': self.wdt.read_counter(),
+        }
+
+        self.frozen = True
+        self._t_frozen = time.time()
+        try:
+            if self.disable_watchdog:
+                self._wdt_disabled = True
+                self.wdt.disable()
+            if self.halt_aeon:
+                self._aeon_halted = True
+                self.aeon.halt()
+            if self.stop_mcu:
+                self._mcu_stopped = True
+                self.serdb.stop_mcu()
+        except BaseException:
+            self.thaw()
+            raise
+
+    def thaw(self):
+        """Restore the exact prior control values and resume the device
+
+        The watchdog and AEON are restored while the 8051 is still
+        stopped, so the firmware never runs against a half-restored
+        watchdog; the 8051 resumes last. Every step is attempted; the
+        first error is re-raised afterwards.
+        """
+        if not self.frozen:
+            return
+        self.frozen_duration = time.time() - self._t_frozen
+
+        steps = []
+        if self._wdt_disabled:
+            steps.append(lambda: self.wdt.write_counter(self.prior['wdt_counter']))
+            steps.append(lambda: self.wdt.write_state(self.prior['wdt_state']))
+        if self._aeon_halted:
+            steps.append(lambda: self.aeon.write_ctrl(self.prior['aeon_ctrl']))
+        if self._mcu_stopped:
+            steps.append(self.serdb.resume_mcu)
+
+        error = None
+        for step in steps:
+            try:
+                step()
+            except OSError as e:
+                error = error or e
+
+        self._wdt_disabled = self._aeon_halted = self._mcu_stopped = False
+        self.frozen = False
+        if error is not None:
+            raise error
+
+    def __enter__(self):
+        self.freeze()
+        return self
+
+    def __exit__(self, *args):
+        self.thaw()
+
+    def capture(self, regions, output_dir):
+        """Freeze, dump regions, restore
+
+        Args:
+            regions: List of (name, space, start, length) tuples,
+                     space is 'dram' or 'xdata'
+            output_dir: Snapshot directory
+
+        Returns:
+            Manifest dictionary
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = new_manifest(kind='snapshot')
+
+        with self:
+            for name, space, start, length in regions:
+                if space == 'xdata':
+                    filename = f"xdata_{name}_{start:04X}.bin"
+                else:
+                    filename = f"dram_{name}_{start:06X}.bin"
+                path = os.path.join(output_dir, filename)
+
+                t0 = time.time()
+                if space == 'xdata':
+                    dump_region(self.serdb, start, length, path,
+                                show_hex=False)
+                else:
+                    dump_dram_region(self.serdb, start, length, path,
+                                     show_hex=False)
+
+                manifest['regions'].append({
+                    'name': name,
+                    'space': space,
+                    'start': start,
+                    'length': length,
+                    'file': filename,
+                    'done': length,
+                    'elapsed': time.time() - t0,
+                })
+
+        manifest['registers'] = self.prior
+        manifest['frozen_duration'] = self.frozen_duration
+        manifest['frozen'] = {
+            'watchdog': self.disable_watchdog,
+            'aeon': self.halt_aeon,
+            'mcu': self.stop_mcu,
+        }
+        write_manifest(output_dir, manifest)
+        return manifest
+
+
+def named_region(name):
+    """Resolve a DRAM_BUFFERS / MAIN_BUFFER_REGIONS name"""
+    if name in DRAM_BUFFERS:
+        start, length, _ = DRAM_BUFFERS[name]
+        return (name, 'dram', start, length)
+    if name in MAIN_BUFFER_REGIONS:
+        start, length, _ = MAIN_BUFFER_REGIONS[name]
+        return (f"main_{name}", 'dram', start, length)
+    raise ValueError(f"Unknown region: {name}")
+
+
+def main():
+    region_names = list(DRAM_BUFFERS.keys()) + [
+        n for n in MAIN_BUFFER_REGIONS if n not in DRAM_BUFFERS]
+
+    parser = argparse.ArgumentParser(
+        description='D72N Point-in-Time Snapshot',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Consistent dump of the main decode buffer
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --region main
+
+    # Decode header + parameter block only
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --region header --region params
+
+    # Arbitrary DRAM range plus the mailbox XDATA page
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --range 0x100000 0x2000 \\
+        --xdata 0x4000 0x500
+
+    # Keep the 8051 running (AEON halted only)
+    python3 d72n_snapshot.py /dev/i2c-1 -o snap/ --region header --no-stop-mcu
+
+Regions: """ + ', '.join(region_names)
+    )
+
+    parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
+    parser.add_argument('-o', '--output-dir', required=True,
+                        help='Snapshot output directory')
+    parser.add_argument('--region', action='append', default=[],
+                        choices=region_names, help='Named DRAM region')
+    parser.add_argument('--range', nargs=2, action='append', default=[],
+                        metavar=('START', 'LENGTH'), help='DRAM range')
+    parser.add_argument('--xdata', nargs=2, action='append', default=[],
+                        metavar=('START', 'LENGTH'), help='XDATA range')
+    parser.add_argument('--no-watchdog', action='store_true',
+                        help='Do not disable the watchdog')
+    parser.add_argument('--no-halt', action='store_true',
+                        help='Do not halt AEON')
+    parser.add_argument('--no-stop-mcu', action='store_true',
+                        help='Do not stop the 8051')
+
+    args = parser.parse_args()
+
+    regions = [named_region(n) for n in args.region]
+    for start, length in args.range:
+        start, length = int(start, 0), int(length, 0)
+        regions.append((f"range_{start:06X}", 'dram', start, length))
+    for start, length in args.xdata:
+        start, length = int(start, 0), int(length, 0)
+        regions.append((f"xdata_{start:04X}", 'xdata', start, length))
+
+    if not regions:
+        parser.error("nothing to capture (use --region, --range or --xdata)")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with D72N_SERDB(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            print("[+] SERDB connection established")
+
+            snap = D72N_Snapshot(serdb,
+                                 disable_watchdog=not args.no_watchdog,
+                                 halt_aeon=not args.no_halt,
+                                 stop_mcu=not args.no_stop_mcu)
+            manifest = snap.capture(regions, args.output_dir)
+
+            prior = manifest['registers']
+            print()
+            print(f"[+] Snapshot saved to {args.output_dir}")
+            print(f"[+] Frozen for {manifest['frozen_duration']:.2f}s")
+            print(f"[*] Restored AEON ctrl 0x{prior['aeon_ctrl']:02X}, "
+                  f"WDT state 0x{prior['wdt_state']:02X}, "
+                  f"WDT counter 0x{prior['wdt_counter']:04X}")
+
+    except KeyboardInterrupt:
+        print("\n[*] Interrupted - device restored")
+        return 1
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
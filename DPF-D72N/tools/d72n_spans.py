@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+D72N Span Planner
+=================
+
+Scanline-ordered write planning for display primitives.
+
+Each primitive (rect, hline, vline, line, blit) is clipped once and
+turned into contiguous byte spans of a linear RGB565 buffer, in
+scanline order. Spans that touch in memory are merged, so a
+full-width rectangle becomes a single span however many rows it
+covers. The span list goes to a bulk writer: Framebuffer (shadow +
+flush), FillEngine (solid fills) or write_dram_range.
+
+Spans are (offset, length) in bytes from the buffer start; blit spans
+carry a third element, the offset into the source pixels.
+
+Usage:
+    from d72n_spans import SpanPlanner
+    planner = SpanPlanner(480, 234)
+    spans = planner.rect(0, 10, 480, 20)     # [(9600, 19200)]
+
+    python3 d72n_spans.py rect 0 10 480 20
+    python3 d72n_spans.py line 0 0 479 233
+"""
+
+import argparse
+import sys
+
+
+# Display parameters (traced from firmware, see d72n_display_test.py)
+DISPLAY_WIDTH = 480
+DISPLAY_HEIGHT = 234
+
+
+def merge_spans(spans):
+    """Sort spans into scanline order and join touching ones
+
+    Blit spans (offset, length, src) join only when the source is
+    contiguous too.
+    """
+    merged = []
+    for span in sorted(spans):
+        if merged:
+            last = merged[-1]
+            if last[0] + last[1] == span[0] and (
+                    len(span) == 2 or last[2] + last[1] == span[2]):
+                merged[-1] = (last[0], last[1] + span[1]) + tuple(last[2:])
+                continue
+        merged.append(tuple(span))
+    return merged
+
+
+class SpanPlanner:
+    """Plans primitives as byte spans of a width x height buffer
+
+    Args:
+        width, height: Buffer size in pixels
+        bpp: Bytes per pixel
+    """
+
+    def __init__(self, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, bpp=2):
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        self.stride = width * bpp
+
+    def clip(self, x, y, w, h):
+        """Clip a rectangle, returns (x0, y0, x1, y1) or None if empty"""
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def rect(self, x, y, w, h):
+        box = self.clip(x, y, w, h)
+        if box is None:
+            return []
+        x0, y0, x1, y1 = box
+        n = (x1 - x0) * self.bpp
+        if n == self.stride:
+            # Full-width rows are one contiguous run
+            return [(y0 * self.stride, (y1 - y0) * self.stride)]
+        return [(row * self.stride + x0 * self.bpp, n) for row in range(y0, y1)]
+
+    def hline(self, x, y, w):
+        return self.rect(x, y, w, 1)
+
+    def vline(self, x, y, h):
+        return self.rect(x, y, 1, h)
+
+    def line(self, x0, y0, x1, y1):
+        """Bresenham line, horizontal pixel runs joined per scanline"""
+        spans = []
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        x, y = x0, y0
+        while True:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                spans.append((y * self.stride + x * self.bpp, self.bpp))
+            if x == x1 and y == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x += sx
+            if e2 <= dx:
+                err += dx
+                y += sy
+        return merge_spans(spans)
+
+    def blit(self, x, y, w, h):
+        """Spans for copying a w x h source image to (x, y)
+
+        Returns:
+            List of (offset, length, src_offset)
+        """
+        box = self.clip(x, y, w, h)
+        if box is None:
+            return []
+        x0, y0, x1, y1 = box
+        n = (x1 - x0) * self.bpp
+        src_stride = w * self.bpp
+        spans = [(row * self.stride + x0 * self.bpp, n,
+                  (row - y) * src_stride + (x0 - x) * self.bpp)
+                 for row in range(y0, y1)]
+        return merge_spans(spans)
+
+    def rows(self, spans):
+        """Yield (row, byte start, byte end) pieces of spans per scanline"""
+        for span in spans:
+            offset, length = span[0], span[1]
+            end = offset + length
+            while offset < end:
+                row = offset // self.stride
+                stop = min(end, (row + 1) * self.stride)
+                yield row, offset - row * self.stride, stop - row * self.stride
+                offset = stop
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Span Planner',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Primitives:
+    rect X Y W H            Filled rectangle
+    hline X Y W             Horizontal line
+    vline X Y H             Vertical line
+    line X0 Y0 X1 Y1        Line
+    blit X Y W H            Image copy
+
+Examples:
+    # Full-width band: one span
+    python3 d72n_spans.py rect 0 10 480 20
+
+    # Clipped rectangle
+    python3 d72n_spans.py rect -10 -10 50 30
+        """
+    )
+
+    parser.add_argument('primitive', choices=['rect', 'hline', 'vline', 'line', 'blit'])
+    parser.add_argument('args', nargs='+', type=int, help='Primitive arguments')
+    parser.add_argument('--width', type=int, default=DISPLAY_WIDTH,
+                        help=f'Buffer width (default: {DISPLAY_WIDTH})')
+    parser.add_argument('--height', type=int, default=DISPLAY_HEIGHT,
+                        help=f'Buffer height (default: {DISPLAY_HEIGHT})')
+
+    args = parser.parse_args()
+
+    planner = SpanPlanner(args.width, args.height)
+    try:
+        spans = getattr(planner, args.primitive)(*args.args)
+    except TypeError:
+        parser.error(f"wrong number of arguments for {args.primitive}")
+
+    total = sum(s[1] for s in spans)
+    print(f"[*] {len(spans)} spans, {total} bytes")
+    for span in spans:
+        line = f"    +0x{span[0]:05X} {span[1]:6d} bytes"
+        if len(span) > 2:
+            line += f"  (src +0x{span[2]:05X})"
+        print(line)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
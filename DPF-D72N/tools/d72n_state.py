@@ -4,7 +4,8 @@ D72N System State Dump
 ======================
 
 Comprehensive system state dump for DPF-D72N via SERDB.
-All addresses traced from D72N 8051 overlay blocks.
+All addresses traced from D72N 8051 overlay blocks; variables are
+declared in d72n_varmap.py and read with one coalesced ReadPlan.
 
 Shows:
   - AEON processor status
@@ -16,79 +17,95 @@ Shows:
 Usage:
     python3 d72n_state.py /dev/i2c-1
     python3 d72n_state.py /dev/i2c-1 --watch  # Continuous monitoring
+    python3 d72n_state.py /dev/i2c-1 --record -o changes.csv
     python3 d72n_state.py /dev/i2c-1 --json   # JSON output
 """
 
 import argparse
+import csv
 import json
 import sys
 import time
-from d72n_serdb import D72N_SERDB, D72N_ADDR
+from array import array
+from d72n_serdb import open_serdb
+from d72n_varmap import ReadPlan
 
+# Optional columnar output
+_pyarrow = None
+try:
+    import pyarrow
+    import pyarrow.parquet
+    _pyarrow = pyarrow
+except ImportError:
+    pass
 
-def read_state(serdb):
-    """Read complete D72N system state
 
-    Returns:
-        Dictionary with all state values
-    """
-    state = {
-        'timestamp': time.time(),
-        'aeon': {},
-        'watchdog': {},
-        'mailbox': {},
-        'state': {},
-        'gwin': {},
-    }
+# Default variables for --record (mailbox handshake, watchdog, AEON, state)
+RECORD_VARIABLES = [
+    'mailbox_status', 'mailbox_cmd', 'mailbox_sync',
+    'wdt_state', 'wdt_counter', 'aeon_ctrl', 'state_primary',
+]
 
-    # AEON Control (traced from block 01: 0x3CDF, 0x3D25, 0xD96C)
-    aeon_ctrl = serdb.read_xdata(D72N_ADDR.AEON_CTRL)
-    state['aeon'] = {
-        'register': aeon_ctrl,
-        'running': bool(aeon_ctrl & 0x01),
-        'enabled': bool(aeon_ctrl & 0x02),
-        'reset_n': bool(aeon_ctrl & 0x04),
-    }
+DEFAULT_RING_CAPACITY = 65536
 
-    # Watchdog (traced from blocks 15, 16)
-    wdt_state = serdb.read_xdata(D72N_ADDR.WDT_STATE)
-    wdt_lo = serdb.read_xdata(D72N_ADDR.WDT_COUNTER_LO)
-    wdt_hi = serdb.read_xdata(D72N_ADDR.WDT_COUNTER_HI)
-    state['watchdog'] = {
-        'state': wdt_state,
-        'enabled': bool(wdt_state & 0x01),
-        'counter': (wdt_hi << 8) | wdt_lo,
-    }
 
+# Variables read by read_state(), coalesced into a few range reads
+STATE_PLAN = ReadPlan([
+    # AEON Control (traced from block 01: 0x3CDF, 0x3D25, 0xD96C)
+    'aeon_ctrl',
+    # Watchdog (traced from blocks 15, 16)
+    'wdt_state', 'wdt_counter',
     # Mailbox (traced from block 02: 0x2830-0x2845)
-    state['mailbox'] = {
-        'command': serdb.read_xdata(D72N_ADDR.MAILBOX_CMD),
-        'param0': serdb.read_xdata(D72N_ADDR.MAILBOX_PARAM),
-        'sync': serdb.read_xdata(D72N_ADDR.MAILBOX_SYNC),
-        'status': serdb.read_xdata(D72N_ADDR.MAILBOX_STATUS),
-        'response': [
-            serdb.read_xdata(D72N_ADDR.MAILBOX_RESP + i)
-            for i in range(4)
-        ],
-    }
-
+    'mailbox_cmd', 'mailbox_params', 'mailbox_sync',
+    'mailbox_status', 'mailbox_response',
     # Primary State Variables (high ref count)
-    state['state'] = {
-        'primary_0': serdb.read_xdata(D72N_ADDR.STATE_PRIMARY),
-        'primary_1': serdb.read_xdata(D72N_ADDR.STATE_PRIMARY + 1),
-        'secondary': serdb.read_xdata(D72N_ADDR.STATE_SECONDARY),
-        'decode': serdb.read_xdata(D72N_ADDR.STATE_DECODE),
-        'storage': serdb.read_xdata(D72N_ADDR.STATE_STORAGE),
-    }
-
+    'state_primary', 'state_secondary', 'state_decode', 'state_storage',
     # GWin Display (traced from multiple blocks)
-    state['gwin'] = {
-        'primary': serdb.read_xdata(D72N_ADDR.GWIN_PRIMARY),
-        'secondary': serdb.read_xdata(D72N_ADDR.GWIN_SECONDARY),
-        'enable': serdb.read_xdata(D72N_ADDR.GWIN_ENABLE),
-    }
+    'gwin_primary', 'gwin_secondary', 'gwin_enable_ctrl',
+])
+
 
-    return state
+def read_state(serdb):
+    """Read complete D72N system state
+
+    Returns:
+        Dictionary with all state values
+    """
+    snap = STATE_PLAN.read(serdb)
+    aeon = snap.bits('aeon_ctrl')
+
+    return {
+        'timestamp': snap.timestamp,
+        'aeon': {
+            'register': snap.aeon_ctrl,
+            'running': aeon['running'],
+            'enabled': aeon['enabled'],
+            'reset_n': aeon['reset_n'],
+        },
+        'watchdog': {
+            'state': snap.wdt_state,
+            'enabled': snap.bits('wdt_state')['enabled'],
+            'counter': snap.wdt_counter,
+        },
+        'mailbox': {
+            'command': snap.mailbox_cmd,
+            'param0': snap.mailbox_params[0],
+            'sync': snap.mailbox_sync,
+            'status': snap.mailbox_status,
+            'response': snap.mailbox_response,
+        },
+        'state': {
+            'primary': snap.state_primary,
+            'secondary': snap.state_secondary,
+            'decode': snap.state_decode,
+            'storage': snap.state_storage,
+        },
+        'gwin': {
+            'primary': snap.gwin_primary,
+            'secondary': snap.gwin_secondary,
+            'enable': snap.gwin_enable_ctrl,
+        },
+    }
 
 
 def print_state(state, colorize=True):
@@ -137,7 +154,7 @@ def print_state(state, colorize=True):
     # State Variables
     st = state['state']
     print(f"\n{color('State Variables', '1;33')}")
-    print(f"  Primary:   0x{st['primary_0']:02X}{st['primary_1']:02X}")
+    print(f"  Primary:   0x{st['primary']:04X}")
     print(f"  Secondary: 0x{st['secondary']:02X}")
     print(f"  Decode:    0x{st['decode']:02X}")
     print(f"  Storage:   0x{st['storage']:02X}")
@@ -192,6 +209,156 @@ def watch_state(serdb, interval=1.0):
         print("\nStopped.")
 
 
+class StateRecorder:
+    """Change-only time series in a preallocated ring buffer
+
+    Samples are stored in parallel arrays (timestamp, channel, value);
+    when full, the oldest entries are overwritten. Raw byte-array
+    variables are split into one channel per byte.
+
+    Args:
+        variables: Variable names (see d72n_varmap.py)
+        capacity: Ring buffer entries
+    """
+
+    def __init__(self, variables, capacity=DEFAULT_RING_CAPACITY):
+        self.plan = ReadPlan(variables)
+        self.capacity = capacity
+
+        # (variable name, byte index or None) per channel
+        self.channels = []
+        for var in self.plan.variables:
+            if var.endian is None:
+                self.channels.extend((var.name, i) for i in range(var.width))
+            else:
+                self.channels.append((var.name, None))
+
+        self.times = array('d', bytes(8 * capacity))
+        self.chans = array('H', bytes(2 * capacity))
+        self.values = array('L', bytes(array('L').itemsize * capacity))
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self.samples = 0
+        self._last = [None] * len(self.channels)
+
+    def channel_name(self, index):
+        name, byte = self.channels[index]
+        return name if byte is None else f"{name}[{byte}]"
+
+    def _append(self, t, chan, value):
+        i = self.head
+        self.times[i] = t
+        self.chans[i] = chan
+        self.values[i] = value
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.dropped += 1
+
+    def sample(self, serdb):
+        """Read all variables once and record changed channels
+
+        Returns:
+            Number of changes recorded
+        """
+        blocks = self.plan.read_raw(serdb)
+        t = time.time()
+        values = self.plan.decode(blocks)
+        self.samples += 1
+
+        changes = 0
+        last = self._last
+        for chan, (name, byte) in enumerate(self.channels):
+            value = values[name] if byte is None else values[name][byte]
+            if value != last[chan]:
+                last[chan] = value
+                self._append(t, chan, value)
+                changes += 1
+        return changes
+
+    def entries(self):
+        """Yield (timestamp, channel name, value), oldest first"""
+        start = (self.head - self.count) % self.capacity
+        for k in range(self.count):
+            i = (start + k) % self.capacity
+            yield (self.times[i], self.channel_name(self.chans[i]),
+                   self.values[i])
+
+    def columns(self):
+        """Recorded entries as columns (time, variable, value)"""
+        t, names, values = [], [], []
+        for ts, name, value in self.entries():
+            t.append(ts)
+            names.append(name)
+            values.append(value)
+        return {'time': t, 'variable': names, 'value': values}
+
+    def save(self, path):
+        """Write entries to CSV, or Parquet for *.parquet (needs pyarrow)"""
+        if path.endswith('.parquet'):
+            if _pyarrow is None:
+                raise RuntimeError("pyarrow not installed. "
+                                   "Install: pip install pyarrow")
+            table = _pyarrow.table(self.columns())
+            _pyarrow.parquet.write_table(table, path)
+            return
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['time', 'variable', 'value'])
+            for ts, name, value in self.entries():
+                writer.writerow([f"{ts:.6f}", name, value])
+
+
+def record_state(serdb, variables=None, duration=None,
+                 capacity=DEFAULT_RING_CAPACITY, verbose=True):
+    """Sample variables as fast as the bus allows, recording changes
+
+    Args:
+        serdb: D72N_SERDB instance
+        variables: Variable names (default: RECORD_VARIABLES)
+        duration: Seconds to record (default: until Ctrl+C)
+        capacity: Ring buffer entries
+        verbose: Print each change as it is recorded
+
+    Returns:
+        StateRecorder
+    """
+    rec = StateRecorder(variables or RECORD_VARIABLES, capacity)
+    spans = len(rec.plan.spans)
+    print(f"[*] Recording {len(rec.channels)} channels "
+          f"({spans} range reads, {rec.plan.bytes_read} bytes per sample)")
+    print("[*] Ctrl+C to stop")
+
+    t0 = time.time()
+    try:
+        while duration is None or time.time() - t0 < duration:
+            changes = rec.sample(serdb)
+            if changes and verbose:
+                # The newest `changes` entries belong to this sample
+                new = []
+                for k in range(changes, 0, -1):
+                    i = (rec.head - k) % rec.capacity
+                    new.append(f"{rec.channel_name(rec.chans[i])}="
+                               f"0x{rec.values[i]:X}")
+                t = rec.times[(rec.head - 1) % rec.capacity]
+                print(f"{t - t0:10.4f}  {' '.join(new)}")
+    except KeyboardInterrupt:
+        print()
+
+    elapsed = time.time() - t0
+    rate = rec.samples / elapsed if elapsed else 0
+    print(f"[+] {rec.samples} samples in {elapsed:.1f}s ({rate:.0f} Hz), "
+          f"{rec.count} changes recorded, {rec.dropped} overwritten")
+    tears = serdb.tear_stats
+    if tears['retries'] or tears['failures']:
+        print(f"[*] Tear-free reads: {tears['retries']} retries, "
+              f"{tears['failures']} failures")
+    return rec
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='D72N System State Dump',
@@ -204,6 +371,11 @@ Examples:
     # Watch for changes
     python3 d72n_state.py /dev/i2c-1 --watch
 
+    # Record every change at full bus rate for 30 s
+    python3 d72n_state.py /dev/i2c-1 --record --duration 30 -o changes.csv
+    python3 d72n_state.py /dev/i2c-1 --record mailbox_status mailbox_cmd \\
+        -o changes.parquet
+
     # JSON output (for scripting)
     python3 d72n_state.py /dev/i2c-1 --json
 
@@ -221,6 +393,17 @@ Examples:
                         help='Output as JSON')
     parser.add_argument('--no-color', action='store_true',
                         help='Disable colored output')
+    parser.add_argument('--record', '-r', nargs='*', metavar='NAME',
+                        help='Record changes at full bus rate '
+                             '(variables from d72n_varmap.py)')
+    parser.add_argument('--duration', '-d', type=float,
+                        help='Record duration in seconds (default: Ctrl+C)')
+    parser.add_argument('--capacity', type=int, default=DEFAULT_RING_CAPACITY,
+                        help=f'Ring buffer entries (default: {DEFAULT_RING_CAPACITY})')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='Do not print changes while recording')
+    parser.add_argument('-o', '--output',
+                        help='Record output file (.csv or .parquet)')
 
     args = parser.parse_args()
 
@@ -231,12 +414,18 @@ Examples:
         bus = args.bus
 
     try:
-        with D72N_SERDB(bus) as serdb:
+        with open_serdb(bus) as serdb:
             if not serdb.probe():
                 print("[-] SERDB not responding at 0x59")
                 return 1
 
-            if args.watch:
+            if args.record is not None:
+                rec = record_state(serdb, args.record, args.duration,
+                                   args.capacity, verbose=not args.quiet)
+                if args.output:
+                    rec.save(args.output)
+                    print(f"[+] Saved {rec.count} changes to {args.output}")
+            elif args.watch:
                 watch_state(serdb, args.interval)
             else:
                 state = read_state(serdb)
@@ -246,6 +435,12 @@ Examples:
                 else:
                     print_state(state, colorize=not args.no_color)
 
+    except KeyError as e:
+        print(f"[-] {e.args[0]}")
+        return 1
+    except RuntimeError as e:
+        print(f"[-] {e}")
+        return 1
     except OSError as e:
         print(f"[-] I2C error: {e}")
         return 1
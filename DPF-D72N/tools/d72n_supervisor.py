@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+D72N Supervisor
+===============
+
+Automatic crash detection and recovery for AEON.
+
+Runs low-overhead liveness checks (one coalesced ReadPlan per cycle:
+mailbox status, AEON control, watchdog state/counter) and recovers with
+the fastest path for each fault:
+
+  watchdog_near    Watchdog counter above margin -> feed
+  aeon_halted      AEON_CTRL RUN bit cleared past
+                   the halt deadline             -> resume (single write)
+  aeon_disabled    ENABLE/RESET_N cleared past
+                   the halt deadline             -> batched reset sequence
+  mailbox_stuck    Status Processing (0x00) past
+                   the deadline                  -> batched reset sequence
+
+A fault must persist for its deadline before it is an incident, so a
+deliberate halt (d72n_snapshot freeze, screenshot --halt, aeon_control
+halt) shorter than --halt-deadline is left alone. Onset is the first
+sample that showed the fault. One incident stays open per fault until
+a sample shows it cleared; a failed recovery is retried with
+exponential backoff, not on every check. A resume that does not stick
+escalates to a full reset. Every incident is logged (one JSON line per
+update) with time-to-detect (onset to detection) and time-to-recover
+(detection to verified recovery).
+
+Usage:
+    python3 d72n_supervisor.py /dev/i2c-1
+    python3 d72n_supervisor.py /dev/i2c-1 --mailbox-deadline 5 --log incidents.jsonl
+    python3 d72n_supervisor.py /dev/i2c-1 --holds holds.json
+    python3 d72n_supervisor.py /dev/i2c-1 --detect-only
+    python3 d72n_supervisor.py /dev/i2c-1 --halt-deadline 60
+"""
+
+import argparse
+import json
+import sys
+import time
+from d72n_serdb import open_serdb
+from d72n_varmap import ReadPlan
+from d72n_aeon_control import D72N_AEON, AEONSequencer, load_holds
+from d72n_mailbox import STATUS_PROCESSING
+from d72n_watchdog import D72N_Watchdog, WDT_THRESHOLD
+
+
+# Liveness variables read each cycle (see d72n_varmap.py)
+SUPERVISOR_VARIABLES = ['mailbox_status', 'aeon_ctrl', 'wdt_state',
+                        'wdt_counter']
+
+
+class D72N_Supervisor:
+    """Liveness checks with automatic recovery
+
+    Args:
+        serdb: D72N_SERDB instance
+        interval: Seconds between checks
+        mailbox_deadline: Seconds status may stay Processing
+        halt_deadline: Seconds AEON may stay halted or disabled
+        wdt_margin: Feed above this fraction of the watchdog threshold
+        holds: Reset hold times for AEONSequencer
+        recover: Run recovery actions (False = detect and log only)
+        cooldown: Seconds to wait after a recovery before re-checking
+        retry_backoff: First wait after a failed recovery (doubles up
+                       to max_backoff while the fault persists)
+        max_backoff: Longest wait between recovery attempts
+        log: Open file for JSON-lines incident records
+    """
+
+    def __init__(self, serdb, interval=0.1, mailbox_deadline=2.0,
+                 halt_deadline=30.0, wdt_margin=0.9, holds=None, recover=True,
+                 cooldown=0.5, retry_backoff=1.0, max_backoff=60.0, log=None):
+        self.serdb = serdb
+        self.aeon = D72N_AEON(serdb)
+        self.wdt = D72N_Watchdog(serdb)
+        self.sequencer = AEONSequencer(self.aeon, holds)
+        self.plan = ReadPlan(SUPERVISOR_VARIABLES)
+
+        self.interval = interval
+        self.deadlines = {
+            'watchdog_near': 0.0,
+            'aeon_halted': halt_deadline,
+            'aeon_disabled': halt_deadline,
+            'mailbox_stuck': mailbox_deadline,
+        }
+        self.wdt_limit = int(WDT_THRESHOLD * wdt_margin)
+        self.recover = recover
+        self.cooldown = cooldown
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.log = log
+
+        self.checks = 0
+        self.incidents = []
+        self._fault = None       # Fault seen in the latest sample
+        self._onset = None       # First sample that showed it
+        self._open = None        # Open incident for that fault
+        self._backoff = retry_backoff
+        self._retry_at = None
+
+    def check(self):
+        """Run one liveness check (and recovery)
+
+        Returns:
+            The incident if it was opened, retried or cleared by this
+            check, else None
+        """
+        snap = self.plan.read(self.serdb)
+        t = time.time()
+        self.checks += 1
+
+        fault = self._diagnose(snap)
+        if fault != self._fault:
+            closed = self._close(t)
+            self._fault = fault
+            self._onset = t
+            if fault is None:
+                return closed
+
+        if fault is None:
+            return None
+
+        incident = self._open
+        if incident is None:
+            if t - self._onset < self.deadlines[fault]:
+                return None
+            incident = {
+                'id': len(self.incidents) + 1,
+                'fault': fault,
+                't_onset': self._onset,
+                't_detect': t,
+                'time_to_detect': t - self._onset,
+                'aeon_ctrl': snap.aeon_ctrl,
+                'mailbox_status': snap.mailbox_status,
+                'wdt_counter': snap.wdt_counter,
+            }
+            self._open = incident
+            self.incidents.append(incident)
+            self._backoff = self.retry_backoff
+        elif not self.recover or t < self._retry_at:
+            return None
+
+        if self.recover:
+            self._recover(fault, snap, incident)
+            if incident['recovered']:
+                # Verified: a recurrence is a new incident
+                self._open = None
+                self._fault = None
+            else:
+                self._retry_at = time.time() + self._backoff
+                incident['next_retry_in'] = self._backoff
+                self._backoff = min(self._backoff * 2, self.max_backoff)
+
+        self._write_log(incident)
+        return incident
+
+    def _close(self, t):
+        """Close the open incident (its fault cleared or changed)"""
+        incident = self._open
+        if incident is None:
+            return None
+        incident['t_cleared'] = t
+        incident['time_to_clear'] = t - incident['t_detect']
+        incident.pop('next_retry_in', None)
+        self._open = None
+        self._retry_at = None
+        self._write_log(incident)
+        return incident
+
+    def _write_log(self, incident):
+        if self.log:
+            self.log.write(json.dumps(incident) + '\n')
+            self.log.flush()
+
+    def _diagnose(self, snap):
+        """Fault shown by this sample (before deadlines), or None"""
+        a = self.aeon
+
+        if snap.bits('wdt_state')['enabled'] and \
+                snap.wdt_counter >= self.wdt_limit:
+            return 'watchdog_near'
+
+        ctrl = snap.aeon_ctrl
+        if not (ctrl & a.BIT_ENABLE and ctrl & a.BIT_RESET_N):
+            return 'aeon_disabled'
+        if not ctrl & a.BIT_RUN:
+            return 'aeon_halted'
+
+        if snap.mailbox_status == STATUS_PROCESSING:
+            return 'mailbox_stuck'
+        return None
+
+    def _recover(self, fault, snap, incident):
+        a = self.aeon
+        running = a.BIT_RUN | a.BIT_ENABLE | a.BIT_RESET_N
+
+        if fault == 'watchdog_near':
+            self.wdt.feed()
+            success = self.wdt.read_counter() < self.wdt_limit
+            actions = ['feed']
+
+        elif fault == 'aeon_halted':
+            a.write_ctrl(snap.aeon_ctrl | a.BIT_RUN)
+            success = (a.read_ctrl() & running) == running
+            actions = ['resume']
+            if not success:
+                success = self.sequencer.reset().success
+                actions.append('reset')
+
+        else:
+            success = self.sequencer.reset().success
+            actions = ['reset']
+
+        t = time.time()
+        incident['attempts'] = incident.get('attempts', 0) + 1
+        incident['actions'] = incident.get('actions', []) + actions
+        incident['recovered'] = success
+        incident['t_recovered'] = t
+        incident['time_to_recover'] = t - incident['t_detect']
+
+        if self.cooldown:
+            time.sleep(self.cooldown)
+
+    def run(self, duration=None, callback=None):
+        """Check until duration elapses or Ctrl+C
+
+        Args:
+            duration: Seconds (default: until Ctrl+C)
+            callback: Called with each incident
+        """
+        t0 = time.time()
+        try:
+            while duration is None or time.time() - t0 < duration:
+                incident = self.check()
+                if incident and callback:
+                    callback(incident)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+        self.elapsed = time.time() - t0
+
+
+def format_incident(incident):
+    line = (f"[{time.strftime('%H:%M:%S', time.localtime(incident['t_detect']))}] "
+            f"#{incident['id']:<3} {incident['fault']:<14} "
+            f"detect {incident['time_to_detect'] * 1000:8.1f} ms")
+    if 'actions' in incident:
+        state = 'recovered' if incident['recovered'] else 'FAILED'
+        actions = '+'.join(dict.fromkeys(incident['actions']))
+        if incident['attempts'] > 1:
+            actions += f" x{incident['attempts']}"
+        line += (f"  {actions:<13} {state} in "
+                 f"{incident['time_to_recover'] * 1000:.1f} ms")
+        if 'next_retry_in' in incident:
+            line += f", retry in {incident['next_retry_in']:.1f}s"
+    if 't_cleared' in incident:
+        line += f"  cleared after {incident['time_to_clear']:.1f}s"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Supervisor',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Faults and recovery:
+    watchdog_near   Counter above --wdt-margin of 0xEA00 -> feed
+    aeon_halted     RUN bit clear                        -> resume
+    aeon_disabled   ENABLE/RESET_N clear                 -> reset
+    mailbox_stuck   Status 0x00 past --mailbox-deadline  -> reset
+
+aeon_halted and aeon_disabled only count after --halt-deadline, so
+deliberate halts (snapshot freeze, screenshot --halt) are left alone.
+A fault is one incident until it clears; failed recoveries are retried
+with exponential backoff (--retry-backoff, doubling to --max-backoff).
+
+Examples:
+    # Supervise with defaults (100 ms checks)
+    python3 d72n_supervisor.py /dev/i2c-1
+
+    # Longer decode deadline, log incidents
+    python3 d72n_supervisor.py /dev/i2c-1 --mailbox-deadline 5 --log incidents.jsonl
+
+    # Use calibrated reset holds (d72n_aeon_control.py calibrate)
+    python3 d72n_supervisor.py /dev/i2c-1 --holds holds.json
+
+    # Detect and log only
+    python3 d72n_supervisor.py /dev/i2c-1 --detect-only
+        """
+    )
+
+    parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
+    parser.add_argument('--interval', '-i', type=float, default=0.1,
+                        help='Check interval in seconds (default: 0.1)')
+    parser.add_argument('--mailbox-deadline', type=float, default=2.0,
+                        help='Seconds mailbox may stay Processing (default: 2.0)')
+    parser.add_argument('--halt-deadline', type=float, default=30.0,
+                        help='Seconds AEON may stay halted/disabled '
+                             '(default: 30.0)')
+    parser.add_argument('--retry-backoff', type=float, default=1.0,
+                        help='First wait after a failed recovery, doubled '
+                             'per failure (default: 1.0)')
+    parser.add_argument('--max-backoff', type=float, default=60.0,
+                        help='Longest wait between recovery attempts '
+                             '(default: 60.0)')
+    parser.add_argument('--wdt-margin', type=float, default=0.9,
+                        help='Feed above this fraction of the watchdog '
+                             'threshold (default: 0.9)')
+    parser.add_argument('--holds', help='Reset hold times (JSON)')
+    parser.add_argument('--detect-only', action='store_true',
+                        help='Log faults without recovering')
+    parser.add_argument('--duration', '-d', type=float,
+                        help='Run time in seconds (default: Ctrl+C)')
+    parser.add_argument('--log', help='Append incidents as JSON lines')
+
+    args = parser.parse_args()
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    log = None
+    try:
+        holds = load_holds(args.holds) if args.holds else None
+        if args.log:
+            log = open(args.log, 'a')
+
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            sup = D72N_Supervisor(serdb, interval=args.interval,
+                                  mailbox_deadline=args.mailbox_deadline,
+                                  halt_deadline=args.halt_deadline,
+                                  wdt_margin=args.wdt_margin, holds=holds,
+                                  recover=not args.detect_only,
+                                  retry_backoff=args.retry_backoff,
+                                  max_backoff=args.max_backoff, log=log)
+
+            print("Supervising AEON (Ctrl+C to stop)...")
+            print()
+            sup.run(args.duration, lambda i: print(format_incident(i)))
+
+            print()
+            recovered = [i for i in sup.incidents if i.get('recovered')]
+            print(f"[+] {sup.checks} checks in {sup.elapsed:.1f}s, "
+                  f"{len(sup.incidents)} incidents, {len(recovered)} recovered")
+            if sup.incidents:
+                ttd = sorted(i['time_to_detect'] for i in sup.incidents)
+                print(f"[*] Time to detect: median {ttd[len(ttd) // 2] * 1000:.1f} ms, "
+                      f"max {ttd[-1] * 1000:.1f} ms")
+            if recovered:
+                ttr = sorted(i['time_to_recover'] for i in recovered)
+                print(f"[*] Time to recover: median {ttr[len(ttr) // 2] * 1000:.1f} ms, "
+                      f"max {ttr[-1] * 1000:.1f} ms")
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+    finally:
+        if log:
+            log.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+D72N Variable Map
+=================
+
+Declarative XDATA variable map with coalesced snapshot reads.
+
+Every traced variable is described once (name, address, width, endian,
+bitfields, volatility). DOC_VARIABLES is generated from
+docs/D72N_VARIABLE_MAP.md; ANNOTATIONS adds widths/bitfields/names for
+the registers the tools use, and TOOL_VARIABLES adds addresses traced
+by the tools but not listed in the doc tables.
+
+A ReadPlan sorts the requested variables, merges nearby addresses into
+a minimal set of contiguous read_xdata_range() calls, and decodes the
+fields into a VarSnapshot. Volatile multi-byte integers (counters,
+16-bit state) are read tear-free with read_xdata_int() instead.
+
+Usage:
+    python3 d72n_varmap.py --list
+    python3 d72n_varmap.py --list mailbox
+    python3 d72n_varmap.py --plan mailbox_status wdt_counter aeon_ctrl
+    python3 d72n_varmap.py /dev/i2c-1 --read mailbox_status wdt_counter aeon_ctrl
+    python3 d72n_varmap.py --update ../docs/D72N_VARIABLE_MAP.md
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from d72n_serdb import open_serdb, D72N_ADDR
+
+
+Var = namedtuple('Var', 'name addr width endian bits volatile group desc')
+Var.__doc__ = """XDATA variable
+
+    name: Identifier
+    addr: XDATA address
+    width: Bytes
+    endian: 'little' / 'big' for integers, None for raw byte arrays
+    bits: {field: mask} bitfields, or None
+    volatile: Changes at runtime (counters, status, state)
+    group: Variable group (doc section)
+    desc: Description
+"""
+
+# Addresses closer than this are merged into one range read. A gap byte
+# costs one pipelined access; a new range costs a settle delay.
+DEFAULT_MAX_GAP = 4
+
+DOC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        '..', 'docs', 'D72N_VARIABLE_MAP.md')
+
+
+# =============================================================================
+# Variable Tables
+# =============================================================================
+
+# (name, addr, refs, group, volatile, description)
+# BEGIN GENERATED - python3 d72n_varmap.py --update
+DOC_VARIABLES = [
+    ('jpeg_command_byte', 0x4401, 8, 'mailbox', True, 'JPEG command byte'),
+    ('jpeg_params_start', 0x4402, 10, 'mailbox', False, 'JPEG params start'),
+    ('sync_flag', 0x4417, 1, 'mailbox', True, 'Sync flag'),
+    ('bmp_tiff_command_byte', 0x40BC, 115, 'mailbox', True, 'BMP/TIFF command byte'),
+    ('bmp_tiff_params_start', 0x40BD, 131, 'mailbox', False, 'BMP/TIFF params start'),
+    ('status_register', 0x40FB, 77, 'mailbox', True, 'Status register'),
+    ('response_0', 0x40FC, 88, 'mailbox', True, 'Response[0]'),
+    ('response_1', 0x40FD, 83, 'mailbox', True, 'Response[1]'),
+    ('response_2', 0x40FE, 44, 'mailbox', True, 'Response[2]'),
+    ('response_3', 0x40FF, 59, 'mailbox', True, 'Response[3]'),
+    ('watchdog_state', 0x44CE, 10, 'control', True, 'Watchdog state'),
+    ('watchdog_counter_low', 0x44D3, 4, 'control', True, 'Watchdog counter low'),
+    ('watchdog_counter_high', 0x44D4, 17, 'control', True, 'Watchdog counter high'),
+    ('aeon_control', 0x0FE6, 6, 'control', False, 'AEON control'),
+    ('primary_state', 0x40EA, 710, 'base', True, 'Primary state'),
+    ('state_field_2', 0x40EE, 322, 'base', True, 'State field 2'),
+    ('decode_control_40f9', 0x40F9, 253, 'base', False, 'Decode control'),
+    ('state_field_3', 0x40EB, 202, 'base', True, 'State field 3'),
+    ('system_base', 0x4037, 162, 'base', False, 'System base'),
+    ('status_a', 0x40F1, 145, 'base', True, 'Status A'),
+    ('control', 0x40C3, 135, 'base', False, 'Control'),
+    ('system_field_2', 0x403B, 132, 'base', False, 'System field 2'),
+    ('mode', 0x4040, 130, 'base', False, 'Mode'),
+    ('buffer_control_40b6', 0x40B6, 123, 'base', False, 'Buffer control'),
+    ('system_field_3', 0x402F, 107, 'base', False, 'System field 3'),
+    ('extended_mode_4066', 0x4066, 106, 'base', False, 'Extended mode'),
+    ('flag_a', 0x403C, 103, 'base', False, 'Flag A'),
+    ('flag_b', 0x4046, 101, 'base', False, 'Flag B'),
+    ('status_b', 0x40F2, 100, 'base', True, 'Status B'),
+    ('status_c', 0x40F3, 98, 'base', True, 'Status C'),
+    ('counter', 0x4033, 98, 'base', True, 'Counter'),
+    ('decode_status_40fa', 0x40FA, 97, 'base', True, 'Decode status'),
+    ('mode_2', 0x404E, 97, 'base', False, 'Mode 2'),
+    ('extended_status_40f6', 0x40F6, 117, 'base', True, 'Extended status'),
+    ('storage_state', 0x4102, 119, 'storage', True, 'Storage state'),
+    ('storage_config', 0x4129, 94, 'storage', False, 'Storage config'),
+    ('storage_mode', 0x412D, 78, 'storage', False, 'Storage mode'),
+    ('storage_control_a', 0x410F, 75, 'storage', False, 'Storage control A'),
+    ('storage_control_b', 0x4112, 75, 'storage', False, 'Storage control B'),
+    ('storage_status', 0x410C, 73, 'storage', True, 'Storage status'),
+    ('storage_base', 0x4101, 66, 'storage', False, 'Storage base'),
+    ('storage_field', 0x4115, 66, 'storage', False, 'Storage field'),
+    ('storage_index', 0x4103, 65, 'storage', False, 'Storage index'),
+    ('storage_flag', 0x4107, 60, 'storage', False, 'Storage flag'),
+    ('file_state', 0x42D5, 73, 'file', True, 'File state'),
+    ('file_base', 0x4201, 51, 'file', False, 'File base'),
+    ('file_index', 0x4214, 37, 'file', False, 'File index'),
+    ('file_mode', 0x42D2, 36, 'file', False, 'File mode'),
+    ('file_status', 0x42F7, 29, 'file', True, 'File status'),
+    ('file_control', 0x42B2, 28, 'file', False, 'File control'),
+    ('file_config', 0x421F, 27, 'file', False, 'File config'),
+    ('file_handle', 0x4204, 27, 'file', False, 'File handle'),
+    ('file_position', 0x42AF, 26, 'file', False, 'File position'),
+    ('file_size', 0x42B0, 24, 'file', False, 'File size'),
+    ('process_state', 0x439D, 119, 'process', True, 'Process state'),
+    ('process_control', 0x4380, 34, 'process', False, 'Process control'),
+    ('process_index', 0x4348, 33, 'process', False, 'Process index'),
+    ('process_status', 0x43F9, 29, 'process', True, 'Process status'),
+    ('process_mode', 0x4345, 29, 'process', False, 'Process mode'),
+    ('process_flag_a', 0x437D, 28, 'process', False, 'Process flag A'),
+    ('process_config', 0x4366, 27, 'process', False, 'Process config'),
+    ('process_counter', 0x4350, 27, 'process', True, 'Process counter'),
+    ('process_flag_b', 0x4383, 25, 'process', False, 'Process flag B'),
+    ('process_pointer', 0x437A, 24, 'process', False, 'Process pointer'),
+    ('mb_param_extended', 0x445B, 42, 'mailbox', False, 'MB param extended'),
+    ('mb_config', 0x44B3, 34, 'mailbox', False, 'MB config'),
+    ('mb_counter', 0x44D2, 28, 'mailbox', True, 'MB counter'),
+    ('mb_status', 0x44E9, 26, 'mailbox', True, 'MB status'),
+    ('mb_mode', 0x44B2, 24, 'mailbox', False, 'MB mode'),
+    ('mb_index', 0x442A, 23, 'mailbox', False, 'MB index'),
+    ('mb_response', 0x44F3, 23, 'mailbox', True, 'MB response'),
+    ('mb_control', 0x44CD, 22, 'mailbox', False, 'MB control'),
+    ('mb_flag_a', 0x44E2, 20, 'mailbox', False, 'MB flag A'),
+    ('mb_flag_b', 0x44DD, 20, 'mailbox', False, 'MB flag B'),
+    ('extended_state_a', 0x4542, 194, 'extended', True, 'Extended state A'),
+    ('extended_control', 0x4522, 165, 'extended', False, 'Extended control'),
+    ('extended_mode_4525', 0x4525, 147, 'extended', False, 'Extended mode'),
+    ('extended_config', 0x4566, 132, 'extended', False, 'Extended config'),
+    ('extended_state_b', 0x4541, 107, 'extended', True, 'Extended state B'),
+    ('extended_status_4581', 0x4581, 107, 'extended', True, 'Extended status'),
+    ('extended_index', 0x456F, 90, 'extended', False, 'Extended index'),
+    ('extended_flag', 0x4575, 88, 'extended', False, 'Extended flag'),
+    ('extended_pointer', 0x456B, 85, 'extended', False, 'Extended pointer'),
+    ('extended_counter', 0x45D3, 80, 'extended', True, 'Extended counter'),
+    ('decode_state', 0x4641, 219, 'decode', True, 'Decode state'),
+    ('decode_control_4665', 0x4665, 120, 'decode', False, 'Decode control'),
+    ('decode_config', 0x46D5, 94, 'decode', False, 'Decode config'),
+    ('decode_mode', 0x4605, 78, 'decode', False, 'Decode mode'),
+    ('decode_base', 0x4640, 75, 'decode', False, 'Decode base'),
+    ('decode_status_465f', 0x465F, 72, 'decode', True, 'Decode status'),
+    ('decode_index', 0x4661, 68, 'decode', False, 'Decode index'),
+    ('decode_param', 0x46C4, 68, 'decode', False, 'Decode param'),
+    ('decode_flag', 0x4670, 60, 'decode', False, 'Decode flag'),
+    ('decode_counter', 0x4673, 59, 'decode', True, 'Decode counter'),
+    ('display_state', 0x4720, 238, 'display', True, 'Display state'),
+    ('display_control_a', 0x47A4, 163, 'display', False, 'Display control A'),
+    ('display_control_b', 0x47A2, 162, 'display', False, 'Display control B'),
+    ('display_base', 0x47A0, 126, 'display', False, 'Display base'),
+    ('display_mode', 0x474C, 72, 'display', False, 'Display mode'),
+    ('display_config', 0x471D, 56, 'display', False, 'Display config'),
+    ('display_index', 0x4723, 48, 'display', False, 'Display index'),
+    ('display_status', 0x4724, 39, 'display', True, 'Display status'),
+    ('display_flag_a', 0x47A5, 36, 'display', False, 'Display flag A'),
+    ('display_flag_b', 0x4754, 36, 'display', False, 'Display flag B'),
+    ('buffer_state', 0x504F, 168, 'extended2', True, 'Buffer state'),
+    ('buffer_control_5271', 0x5271, 107, 'extended2', False, 'Buffer control'),
+    ('buffer_config', 0x530A, 97, 'extended2', False, 'Buffer config'),
+    ('buffer_mode', 0x5080, 93, 'extended2', False, 'Buffer mode'),
+    ('buffer_index', 0x5108, 75, 'extended2', False, 'Buffer index'),
+    ('buffer_status', 0x511F, 71, 'extended2', True, 'Buffer status'),
+    ('buffer_pointer', 0x527A, 68, 'extended2', False, 'Buffer pointer'),
+    ('buffer_flag', 0x5081, 57, 'extended2', False, 'Buffer flag'),
+    ('buffer_counter', 0x511D, 54, 'extended2', True, 'Buffer counter'),
+    ('buffer_param', 0x514D, 54, 'extended2', False, 'Buffer param'),
+    ('gwin_state', 0x6653, 44, 'gwin', True, 'GWin state'),
+    ('gwin_control_a', 0x69BE, 36, 'gwin', False, 'GWin control A'),
+    ('gwin_control_b', 0x6D2C, 36, 'gwin', False, 'GWin control B'),
+    ('gwin_config', 0x6682, 24, 'gwin', False, 'GWin config'),
+    ('gwin_mode', 0x668D, 22, 'gwin', False, 'GWin mode'),
+    ('gwin_enable', 0x6666, 21, 'gwin', False, 'GWin enable'),
+    ('gwin_status', 0x6662, 20, 'gwin', True, 'GWin status'),
+    ('gwin_index', 0x665B, 20, 'gwin', False, 'GWin index'),
+    ('gwin_base', 0x6651, 19, 'gwin', False, 'GWin base'),
+    ('gwin_extended', 0x6E86, 18, 'gwin', False, 'GWin extended'),
+]
+# END GENERATED
+
+# Overrides for doc variables, keyed by address
+ANNOTATIONS = {
+    D72N_ADDR.MAILBOX_CMD: {'name': 'mailbox_cmd', 'volatile': True},
+    D72N_ADDR.MAILBOX_PARAM: {'name': 'mailbox_params', 'width': 21,
+                              'endian': None, 'volatile': True},
+    D72N_ADDR.MAILBOX_SYNC: {'name': 'mailbox_sync', 'volatile': True},
+    D72N_ADDR.MAILBOX_STATUS: {'name': 'mailbox_status', 'volatile': True},
+    D72N_ADDR.MAILBOX_RESP: {'name': 'mailbox_response', 'width': 4,
+                             'endian': None, 'volatile': True,
+                             'desc': 'Response[0..3]'},
+    0x40BC: {'name': 'bmp_cmd', 'volatile': True},
+    0x40BD: {'name': 'bmp_params', 'volatile': True},
+    D72N_ADDR.WDT_STATE: {'name': 'wdt_state', 'bits': {'enabled': 0x01}},
+    D72N_ADDR.WDT_COUNTER_LO: {'name': 'wdt_counter', 'width': 2,
+                               'endian': 'little', 'volatile': True,
+                               'desc': 'Watchdog counter'},
+    D72N_ADDR.AEON_CTRL: {'name': 'aeon_ctrl',
+                          'bits': {'running': 0x01, 'enabled': 0x02,
+                                   'reset_n': 0x04}},
+}
+
+# Traced by the tools (dump_key_variables, read_state), not in the doc tables
+TOOL_VARIABLES = [
+    Var('state_primary', D72N_ADDR.STATE_PRIMARY, 2, 'big', None, True,
+        'state', 'Primary state machine'),
+    Var('state_secondary', D72N_ADDR.STATE_SECONDARY, 1, 'little', None,
+        True, 'state', 'Secondary state'),
+    Var('state_decode', D72N_ADDR.STATE_DECODE, 1, 'little', None, True,
+        'state', 'Decode state'),
+    Var('state_storage', D72N_ADDR.STATE_STORAGE, 1, 'little', None, True,
+        'state', 'Storage state'),
+    Var('gwin_primary', D72N_ADDR.GWIN_PRIMARY, 1, 'little', None, False,
+        'gwin', 'GWin primary control'),
+    Var('gwin_secondary', D72N_ADDR.GWIN_SECONDARY, 1, 'little', None, False,
+        'gwin', 'GWin secondary control'),
+    Var('gwin_enable_ctrl', D72N_ADDR.GWIN_ENABLE, 1, 'little', None, False,
+        'gwin', 'GWin enable control'),
+]
+
+
+def _build_variables():
+    variables = {}
+    for name, addr, _refs, group, volatile, desc in DOC_VARIABLES:
+        var = Var(name, addr, 1, 'little', None, volatile, group, desc)
+        var = var._replace(**ANNOTATIONS.get(addr, {}))
+        variables[var.name] = var
+    for var in TOOL_VARIABLES:
+        variables[var.name] = var
+
+    # Drop single-byte entries covered by a wider variable
+    # (e.g. Response[1..3] inside mailbox_response)
+    wide = [v for v in variables.values() if v.width > 1]
+    for name, var in list(variables.items()):
+        for w in wide:
+            if w is not var and w.addr <= var.addr < w.addr + w.width:
+                del variables[name]
+                break
+
+    return dict(sorted(variables.items(), key=lambda kv: kv[1].addr))
+
+
+VARIABLES = _build_variables()
+
+
+def get_var(name):
+    """Look up a variable by name (or pass a Var through)"""
+    if isinstance(name, Var):
+        return name
+    try:
+        return VARIABLES[name]
+    except KeyError:
+        raise KeyError(f"Unknown variable: {name}") from None
+
+
+def group_vars(group):
+    """All variables in a group"""
+    return [v for v in VARIABLES.values() if v.group == group]
+
+
+def is_stable(var):
+    """Volatile multi-byte integer that needs a tear-free read"""
+    return var.volatile and var.width > 1 and var.endian is not None
+
+
+def decode(var, data):
+    """Decode raw bytes for a variable"""
+    if var.endian is None:
+        return list(data)
+    if var.width == 1:
+        return data[0]
+    return int.from_bytes(data, var.endian)
+
+
+# =============================================================================
+# Snapshot Planner
+# =============================================================================
+
+class VarSnapshot:
+    """Decoded variable values from one ReadPlan.read()
+
+    Values are available as attributes or items:
+        snap.mailbox_status, snap['wdt_counter']
+    """
+
+    def __init__(self, values, timestamp, duration=0.0):
+        self._values = values
+        self.timestamp = timestamp
+        self.duration = duration
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_values'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self._values[name]
+
+    def __contains__(self, name):
+        return name in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def bits(self, name):
+        """Decode bitfields of a variable as {field: bool}"""
+        var = get_var(name)
+        value = self._values[var.name]
+        return {field: bool(value & mask)
+                for field, mask in (var.bits or {}).items()}
+
+    def as_dict(self):
+        return dict(self._values)
+
+
+class ReadPlan:
+    """Minimal contiguous range reads for a set of variables
+
+    Args:
+        variables: Variable names or Var tuples
+        max_gap: Merge addresses closer than this many bytes
+    """
+
+    def __init__(self, variables, max_gap=DEFAULT_MAX_GAP):
+        unique = {var.name: var for var in map(get_var, variables)}
+        self.variables = sorted(unique.values(), key=lambda v: v.addr)
+        self.max_gap = max_gap
+
+        # Volatile multi-byte integers use tear-free reads
+        # (read_xdata_int) instead of sharing a range read
+        self.stable = [v for v in self.variables if is_stable(v)]
+
+        spans = []
+        for var in self.variables:
+            if is_stable(var):
+                continue
+            end = var.addr + var.width
+            if spans and var.addr - spans[-1][1] <= max_gap:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([var.addr, end])
+        self.spans = [(start, end - start) for start, end in spans]
+
+        # (var, block index, offset within block); stable variables get
+        # one block each after the spans
+        self._slots = []
+        for var in self.variables:
+            if is_stable(var):
+                index = len(self.spans) + self.stable.index(var)
+                self._slots.append((var, index, 0))
+                continue
+            for i, (start, length) in enumerate(self.spans):
+                if start <= var.addr < start + length:
+                    self._slots.append((var, i, var.addr - start))
+                    break
+
+    @property
+    def bytes_read(self):
+        return (sum(length for _, length in self.spans) +
+                sum(var.width for var in self.stable))
+
+    def read_raw(self, serdb):
+        """Read all spans and stable variables
+
+        Returns:
+            List of bytes-like blocks (spans, then stable variables)
+        """
+        blocks = [serdb.read_xdata_range(start, length)
+                  for start, length in self.spans]
+        for var in self.stable:
+            value = serdb.read_xdata_int(var.addr, var.width, var.endian)
+            blocks.append(value.to_bytes(var.width, var.endian))
+        return blocks
+
+    def decode(self, blocks):
+        """Decode variable values from read_raw() blocks"""
+        return {var.name: decode(var, blocks[i][off:off + var.width])
+                for var, i, off in self._slots}
+
+    def read(self, serdb):
+        """Read and decode all variables
+
+        Returns:
+            VarSnapshot
+        """
+        t0 = time.time()
+        blocks = self.read_raw(serdb)
+        return VarSnapshot(self.decode(blocks), t0, time.time() - t0)
+
+    def describe(self):
+        """Human readable plan"""
+        lines = []
+        for i, (start, length) in enumerate(self.spans):
+            names = [v.name for v, idx, _ in self._slots if idx == i]
+            lines.append(f"0x{start:04X} +{length:<3} {', '.join(names)}")
+        for var in self.stable:
+            lines.append(f"0x{var.addr:04X} +{var.width:<3} {var.name} "
+                         f"(tear-free)")
+        return lines
+
+
+def read_snapshot(serdb, names=None, max_gap=DEFAULT_MAX_GAP):
+    """One-shot coalesced read of variables (default: all)"""
+    return ReadPlan(names or list(VARIABLES), max_gap).read(serdb)
+
+
+# =============================================================================
+# Doc Table Generator
+# =============================================================================
+
+_VOLATILE_WORDS = ('state', 'status', 'counter', 'sync', 'response', 'command')
+
+
+def _ident(text):
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def parse_variable_doc(path=DOC_PATH):
+    """Parse docs/D72N_VARIABLE_MAP.md tables
+
+    Returns:
+        List of (name, addr, refs, group, volatile, description)
+    """
+    section = None
+    rows = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            # Group by top-level section (subsections share it)
+            m = re.match(r'^##\s+(.*)', line)
+            if m:
+                section = m.group(1).strip()
+                continue
+            m = re.match(r'^\|\s*0x([0-9A-Fa-f]{4})\s*\|\s*(\d+)\s*\|'
+                         r'\s*([^|]+?)\s*\|', line)
+            if not m:
+                continue
+            addr = int(m.group(1), 16)
+            if addr in seen:
+                continue
+            seen.add(addr)
+            desc = re.sub(r'\s*\(.*\)$', '', m.group(3))
+            group = _ident(section.split()[0].split('/')[0])
+            volatile = any(w in desc.lower() for w in _VOLATILE_WORDS)
+            rows.append([_ident(desc), addr, int(m.group(2)), group,
+                         volatile, desc])
+
+    # Disambiguate repeated names with the address
+    counts = {}
+    for row in rows:
+        counts[row[0]] = counts.get(row[0], 0) + 1
+    for row in rows:
+        if counts[row[0]] > 1:
+            row[0] = f"{row[0]}_{row[1]:04x}"
+
+    return [tuple(row) for row in rows]
+
+
+def format_doc_table(rows):
+    """Format parsed rows as the DOC_VARIABLES literal"""
+    lines = ['DOC_VARIABLES = [']
+    for name, addr, refs, group, volatile, desc in rows:
+        lines.append(f"    ({name!r}, 0x{addr:04X}, {refs}, {group!r}, "
+                     f"{volatile}, {desc!r}),")
+    lines.append(']')
+    return '\n'.join(lines)
+
+
+def update_generated(doc_path=DOC_PATH):
+    """Regenerate the DOC_VARIABLES block in this file"""
+    path = os.path.abspath(__file__)
+    with open(path, 'r') as f:
+        source = f.read()
+    begin = '# BEGIN GENERATED - python3 d72n_varmap.py --update\n'
+    end = '# END GENERATED\n'
+    head, rest = source.split(begin, 1)
+    _, tail = rest.split(end, 1)
+    table = format_doc_table(parse_variable_doc(doc_path))
+    with open(path, 'w') as f:
+        f.write(head + begin + table + '\n' + end + tail)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def format_value(var, value):
+    if var.endian is None:
+        return ' '.join(f'{b:02X}' for b in value)
+    return f"0x{value:0{var.width * 2}X}"
+
+
+def print_vars(variables):
+    print(f"{'Address':<9} {'W':<3} {'V':<2} {'Group':<10} {'Name':<26} Description")
+    print("-" * 78)
+    for var in variables:
+        vol = '*' if var.volatile else ''
+        print(f"0x{var.addr:04X}    {var.width:<3} {vol:<2} {var.group:<10} "
+              f"{var.name:<26} {var.desc}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='D72N Variable Map',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # List all variables (* = volatile)
+    python3 d72n_varmap.py --list
+
+    # Show the coalesced read plan
+    python3 d72n_varmap.py --plan mailbox_cmd mailbox_params mailbox_sync
+
+    # Read variables (one range read per merged span)
+    python3 d72n_varmap.py /dev/i2c-1 --read mailbox_status wdt_counter
+    python3 d72n_varmap.py /dev/i2c-1 --read-group mailbox
+
+    # Regenerate DOC_VARIABLES from the markdown
+    python3 d72n_varmap.py --update
+        """
+    )
+
+    parser.add_argument('bus', nargs='?', help='I2C bus (or snap://dir)')
+    parser.add_argument('--list', nargs='?', const='', metavar='GROUP',
+                        help='List variables (optionally one group)')
+    parser.add_argument('--plan', nargs='+', metavar='NAME',
+                        help='Show read plan for variables')
+    parser.add_argument('--read', nargs='+', metavar='NAME',
+                        help='Read variables')
+    parser.add_argument('--read-group', metavar='GROUP',
+                        help='Read all variables in a group')
+    parser.add_argument('--max-gap', type=int, default=DEFAULT_MAX_GAP,
+                        help=f'Merge gap in bytes (default: {DEFAULT_MAX_GAP})')
+    parser.add_argument('--update', nargs='?', const=DOC_PATH, metavar='DOC',
+                        help='Regenerate DOC_VARIABLES from the markdown')
+
+    args = parser.parse_args()
+
+    try:
+        if args.update:
+            update_generated(args.update)
+            print(f"[+] Regenerated DOC_VARIABLES from {args.update}")
+            return 0
+
+        if args.list is not None:
+            variables = (group_vars(args.list) if args.list
+                         else list(VARIABLES.values()))
+            print_vars(variables)
+            return 0
+
+        if args.plan:
+            plan = ReadPlan(args.plan, args.max_gap)
+            for line in plan.describe():
+                print(line)
+            print(f"[*] {len(plan.spans) + len(plan.stable)} reads, "
+                  f"{plan.bytes_read} bytes")
+            return 0
+
+        names = args.read or [v.name for v in group_vars(args.read_group or '')]
+        if not names:
+            parser.error("nothing to do (use --list, --plan or --read)")
+        plan = ReadPlan(names, args.max_gap)
+    except KeyError as e:
+        print(f"[-] {e.args[0]}")
+        return 1
+
+    if not args.bus:
+        parser.error("bus required for --read")
+
+    # Parse bus argument
+    if args.bus.isdigit():
+        bus = int(args.bus)
+    else:
+        bus = args.bus
+
+    try:
+        with open_serdb(bus) as serdb:
+            if not serdb.probe():
+                print("[-] SERDB not responding at 0x59")
+                return 1
+
+            snap = plan.read(serdb)
+            for var in plan.variables:
+                print(f"0x{var.addr:04X}  {var.name:<26} "
+                      f"{format_value(var, snap[var.name])}")
+                for field, on in snap.bits(var).items():
+                    print(f"          .{field:<24} {'1' if on else '0'}")
+            print(f"[*] {len(plan.spans) + len(plan.stable)} reads, "
+                  f"{plan.bytes_read} bytes, {snap.duration * 1000:.1f} ms")
+            tears = serdb.tear_stats
+            if tears['retries'] or tears['failures']:
+                print(f"[*] Tear-free reads: {tears['retries']} retries, "
+                      f"{tears['failures']} failures")
+
+    except OSError as e:
+        print(f"[-] I2C error: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
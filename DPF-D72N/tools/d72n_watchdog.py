@@ -21,14 +21,22 @@ Usage:
     python3 d72n_watchdog.py /dev/i2c-1 disable
     python3 d72n_watchdog.py /dev/i2c-1 enable
     python3 d72n_watchdog.py /dev/i2c-1 feed
+    python3 d72n_watchdog.py /dev/i2c-1 keepalive
+    python3 d72n_watchdog.py /dev/i2c-1 profile
 """
 
 import argparse
+import math
 import sys
+import threading
 import time
 from d72n_serdb import D72N_SERDB, D72N_ADDR
 
 
+# Reset threshold (traced: block 15 offset 0x6AC0)
+WDT_THRESHOLD = 0xEA00
+
+
 class D72N_Watchdog:
     """Watchdog timer control
 
@@ -58,13 +66,11 @@ class D72N_Watchdog:
         self.serdb.write_xdata(self.WDT_STATE, value)
 
     def read_counter(self):
-        """Read 16-bit watchdog counter
+        """Read 16-bit watchdog counter (tear-free hi-lo-hi read)
 
         Traced from block 15 offset 0x6AD4-0x6ADB
         """
-        low = self.serdb.read_xdata(self.WDT_COUNTER_LO)
-        high = self.serdb.read_xdata(self.WDT_COUNTER_HI)
-        return (high << 8) | low
+        return self.serdb.read_xdata_int(self.WDT_COUNTER_LO, 2, 'little')
 
     def write_counter(self, value):
         """Write 16-bit watchdog counter
@@ -74,6 +80,95 @@ class D72N_Watchdog:
         self.serdb.write_xdata(self.WDT_COUNTER_LO, value & 0xFF)
         self.serdb.write_xdata(self.WDT_COUNTER_HI, (value >> 8) & 0xFF)
 
+    def sample_counter(self):
+        """Timestamped counter sample for profiling
+
+        One hi-lo-hi transfer (read_xdata_int with no retries) under the
+        session lock. If the high byte changed between its two reads the
+        low byte carried mid-transfer and the sample is torn; it is
+        dropped rather than re-read, so the timestamp always brackets
+        the accesses that produced the value.
+
+        Returns:
+            (perf_counter timestamp, counter) or None if torn
+        """
+        serdb = self.serdb
+        with serdb.lock:
+            failures = serdb.tear_stats['failures']
+            t0 = time.perf_counter()
+            counter = serdb.read_xdata_int(self.WDT_COUNTER_LO, 2, 'little',
+                                           retries=0)
+            t1 = time.perf_counter()
+            torn = serdb.tear_stats['failures'] != failures
+        if torn:
+            return None
+        return (t0 + t1) / 2, counter
+
+    def profile(self, duration=2.0, max_samples=100000):
+        """Sample the counter at full bus rate and fit the tick rate
+
+        Samples are split into segments wherever the counter drops
+        (feed or firmware reset); the rate is a pooled least-squares
+        slope over all segments, refit once without outliers.
+
+        Args:
+            duration: Sampling time in seconds
+            max_samples: Sample limit
+
+        Returns:
+            Dictionary: rate (ticks/s), stderr, samples, torn,
+            outliers, resets, counter, sample_rate, time_to_threshold
+        """
+        samples = []
+        torn = 0
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end and len(samples) < max_samples:
+            sample = self.sample_counter()
+            if sample is None:
+                torn += 1
+            else:
+                samples.append(sample)
+
+        segments = [[]]
+        for sample in samples:
+            if segments[-1] and sample[1] < segments[-1][-1][1]:
+                segments.append([])
+            segments[-1].append(sample)
+        # Every drop is a reset, including ones a single sample apart
+        resets = len(segments) - 1
+        segments = [seg for seg in segments if len(seg) >= 2]
+
+        rate, stderr = _fit_rate(segments)
+        outliers = 0
+        if rate is not None:
+            # Drop samples far off the fit (missed tears), refit
+            kept = []
+            for seg in segments:
+                t0, c0 = _centroid(seg)
+                res = [c - (c0 + rate * (t - t0)) for t, c in seg]
+                rms = math.sqrt(sum(r * r for r in res) / len(res))
+                limit = max(64.0, 4 * rms)
+                good = [s for s, r in zip(seg, res) if abs(r) <= limit]
+                outliers += len(seg) - len(good)
+                if len(good) >= 2:
+                    kept.append(good)
+            if outliers:
+                rate, stderr = _fit_rate(kept)
+
+        counter = samples[-1][1] if samples else self.read_counter()
+        elapsed = samples[-1][0] - samples[0][0] if len(samples) > 1 else 0.0
+        return {
+            'rate': rate or 0.0,
+            'stderr': stderr or 0.0,
+            'samples': len(samples),
+            'torn': torn,
+            'outliers': outliers,
+            'resets': resets,
+            'counter': counter,
+            'sample_rate': (len(samples) - 1) / elapsed if elapsed else 0.0,
+            'time_to_threshold': time_to_threshold(counter, rate or 0.0),
+        }
+
     def is_enabled(self):
         """Check if watchdog is enabled (bit 0)"""
         return (self.read_state() & self.BIT_ENABLE) != 0
@@ -133,10 +228,204 @@ class D72N_Watchdog:
         print(f"Enabled: {'YES - Watchdog active' if status['enabled'] else 'NO - Watchdog disabled'}")
 
         if status['enabled']:
-            # Threshold from traced code: 0xEA00 (block 15: 0x6AC0)
-            threshold = 0xEA00
-            if status['counter'] > threshold:
-                print(f"WARNING: Counter above threshold (0x{threshold:04X}) - may reset soon!")
+            if status['counter'] > WDT_THRESHOLD:
+                print(f"WARNING: Counter above threshold (0x{WDT_THRESHOLD:04X}) - may reset soon!")
+
+
+def _centroid(segment):
+    n = len(segment)
+    return (sum(t for t, _ in segment) / n, sum(c for _, c in segment) / n)
+
+
+def _fit_rate(segments):
+    """Pooled least-squares slope over segments
+
+    Returns:
+        (rate, stderr) or (None, None) with too few samples
+    """
+    sxx = sxy = 0.0
+    centred = []
+    for seg in segments:
+        t0, c0 = _centroid(seg)
+        for t, c in seg:
+            dt, dc = t - t0, c - c0
+            sxx += dt * dt
+            sxy += dt * dc
+            centred.append((dt, dc))
+    if sxx == 0:
+        return None, None
+
+    rate = sxy / sxx
+    dof = len(centred) - 2 * len(segments)
+    if dof <= 0:
+        return rate, None
+    sse = sum((dc - rate * dt) ** 2 for dt, dc in centred)
+    return rate, math.sqrt(sse / dof / sxx)
+
+
+def time_to_threshold(counter, rate, threshold=WDT_THRESHOLD):
+    """Seconds until the counter reaches the threshold (inf if not ticking)"""
+    if rate <= 0:
+        return math.inf
+    return max(0.0, (threshold - counter) / rate)
+
+
+def safe_burst(profile, op_seconds, margin=0.8):
+    """Largest number of operations that fit before the threshold
+
+    Args:
+        profile: D72N_Watchdog.profile() result
+        op_seconds: Duration of one operation (e.g. one range read)
+        margin: Fraction of the time to threshold to use
+
+    Returns:
+        Operation count (None if the counter is not ticking)
+    """
+    ttt = profile['time_to_threshold']
+    if math.isinf(ttt):
+        return None
+    return int(ttt * margin / op_seconds)
+
+
+class WatchdogKeepAlive:
+    """Background watchdog feeder
+
+    Keeps the watchdog enabled but never lets the counter reach the
+    reset threshold. Each check reads the counter, updates the tick
+    rate estimate, and feeds only when the counter would pass
+    `margin` * WDT_THRESHOLD before the next check. The check interval
+    is half the predicted time to that limit, clamped to
+    [min_interval, max_interval], so the bus is touched rarely while
+    the counter is low.
+
+    Each check holds the SERDB lock for a single counter read (range
+    reads release it between pipeline groups), so it shares the bus
+    with a running dump. bus_cycles counts the XDATA accesses the
+    checks and feeds actually made, tear retries included (taken from
+    serdb.bus_accesses while the lock is held).
+
+    Args:
+        wdt: D72N_Watchdog instance
+        margin: Fraction of the threshold to stay under
+        min_interval: Shortest check interval in seconds
+        max_interval: Longest check interval in seconds
+    """
+
+    def __init__(self, wdt, margin=0.5, min_interval=0.02, max_interval=2.0):
+        self.wdt = wdt
+        self.limit = int(WDT_THRESHOLD * margin)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.rate = None        # Ticks per second (EWMA)
+        self.checks = 0
+        self.feeds = 0
+        self.bus_cycles = 0
+        self.peak = 0
+        self.error = None
+        self._last = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._t_start = None
+
+    def _interval(self, counter):
+        if self.rate is None:
+            return self.min_interval
+        if self.rate <= 0:
+            return self.max_interval
+        remaining = (self.limit - counter) / self.rate
+        return min(self.max_interval, max(self.min_interval, remaining / 2))
+
+    def check(self):
+        """Read the counter, feed if needed
+
+        Returns:
+            Seconds until the next check
+        """
+        serdb = self.wdt.serdb
+        with serdb.lock:
+            start = serdb.bus_accesses
+            counter = self.wdt.read_counter()
+            self.bus_cycles += serdb.bus_accesses - start
+        t = time.time()
+        self.checks += 1
+        self.peak = max(self.peak, counter)
+
+        if self._last is not None:
+            last_counter, last_t = self._last
+            if counter >= last_counter and t > last_t:
+                rate = (counter - last_counter) / (t - last_t)
+                self.rate = rate if self.rate is None else \
+                    0.7 * self.rate + 0.3 * rate
+
+        interval = self._interval(counter)
+        predicted = counter + (self.rate or 0) * (interval + self.min_interval)
+        if counter >= self.limit or predicted >= self.limit:
+            with serdb.lock:
+                start = serdb.bus_accesses
+                self.wdt.feed()
+                self.bus_cycles += serdb.bus_accesses - start
+            self.feeds += 1
+            t = time.time()
+            counter = 0
+            interval = self._interval(counter)
+
+        self._last = (counter, t)
+        return interval
+
+    def _run(self):
+        interval = 0
+        while not self._stop.wait(interval):
+            try:
+                interval = self.check()
+            except OSError as e:
+                self.error = e
+                return
+
+    def start(self):
+        """Start the keep-alive thread"""
+        self._stop.clear()
+        self._t_start = time.time()
+        self._thread = threading.Thread(target=self._run, name='wdt-keepalive',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the keep-alive thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def stats(self):
+        """Keep-alive statistics"""
+        elapsed = time.time() - self._t_start if self._t_start else 0.0
+        return {
+            'elapsed': elapsed,
+            'checks': self.checks,
+            'feeds': self.feeds,
+            'bus_cycles': self.bus_cycles,
+            'rate': self.rate or 0.0,
+            'peak': self.peak,
+            'limit': self.limit,
+        }
+
+
+def print_keepalive_stats(stats):
+    """Print WatchdogKeepAlive.stats()"""
+    per_sec = stats['bus_cycles'] / stats['elapsed'] if stats['elapsed'] else 0
+    print(f"[*] Watchdog keep-alive: {stats['checks']} checks, "
+          f"{stats['feeds']} feeds, {stats['bus_cycles']} bus cycles "
+          f"({per_sec:.1f}/s)")
+    print(f"[*] Tick rate {stats['rate']:.1f}/s, peak counter "
+          f"0x{stats['peak']:04X} (limit 0x{stats['limit']:04X})")
 
 
 def main():
@@ -150,24 +439,36 @@ Commands:
     enable  - Enable watchdog timer
     feed    - Reset watchdog counter
     watch   - Monitor counter continuously
+    keepalive - Feed just in time until Ctrl+C (watchdog stays enabled)
+    profile - Fit the counter tick rate and predict time to reset
 
 Examples:
     python3 d72n_watchdog.py /dev/i2c-1 status
     python3 d72n_watchdog.py /dev/i2c-1 disable
     python3 d72n_watchdog.py /dev/i2c-1 feed
+    python3 d72n_watchdog.py /dev/i2c-1 keepalive --margin 0.5
+    python3 d72n_watchdog.py /dev/i2c-1 profile --duration 5
 
 IMPORTANT:
     Disable the watchdog before long operations that might
-    trigger a timeout (like memory dumps or code injection).
+    trigger a timeout (like memory dumps or code injection),
+    or keep it fed with WatchdogKeepAlive (d72n_dump_scheduler.py
+    --keep-alive).
         """
     )
 
     parser.add_argument('bus', help='I2C bus (e.g., /dev/i2c-1)')
     parser.add_argument('command', nargs='?', default='status',
-                        choices=['status', 'disable', 'enable', 'feed', 'watch'],
+                        choices=['status', 'disable', 'enable', 'feed', 'watch',
+                                 'keepalive', 'profile'],
                         help='Command to execute (default: status)')
     parser.add_argument('--interval', '-i', type=float, default=0.5,
                         help='Watch interval in seconds (default: 0.5)')
+    parser.add_argument('--duration', '-d', type=float, default=2.0,
+                        help='Profile sampling time in seconds (default: 2.0)')
+    parser.add_argument('--margin', type=float, default=0.5,
+                        help='Keep-alive limit as fraction of threshold '
+                             '(default: 0.5)')
 
     args = parser.parse_args()
 
@@ -234,6 +535,44 @@ IMPORTANT:
                 except KeyboardInterrupt:
                     print("\nStopped.")
 
+            elif args.command == 'profile':
+                print(f"[*] Sampling counter for {args.duration:.1f}s...")
+                prof = wdt.profile(args.duration)
+
+                print(f"[*] Samples:   {prof['samples']} "
+                      f"({prof['sample_rate']:.0f}/s), {prof['torn']} torn, "
+                      f"{prof['outliers']} outliers, {prof['resets']} resets")
+                print(f"[*] Counter:   0x{prof['counter']:04X}")
+                if prof['rate'] <= 0:
+                    print("[*] Counter not ticking (watchdog disabled or fed)")
+                else:
+                    print(f"[+] Tick rate: {prof['rate']:.2f} +/- "
+                          f"{prof['stderr']:.2f} /s")
+                    print(f"[+] Time to threshold (0x{WDT_THRESHOLD:04X}): "
+                          f"{prof['time_to_threshold']:.2f}s "
+                          f"(from zero: {WDT_THRESHOLD / prof['rate']:.2f}s)")
+
+            elif args.command == 'keepalive':
+                print("Keeping watchdog alive (Ctrl+C to stop)...")
+                print()
+
+                keepalive = WatchdogKeepAlive(wdt, margin=args.margin)
+                with keepalive:
+                    try:
+                        while keepalive.error is None:
+                            st = keepalive.stats()
+                            print(f"\rRate: {st['rate']:7.1f}/s  Peak: "
+                                  f"0x{st['peak']:04X}  Feeds: {st['feeds']}  "
+                                  f"Bus cycles: {st['bus_cycles']}",
+                                  end='', flush=True)
+                            time.sleep(0.5)
+                    except KeyboardInterrupt:
+                        pass
+                print()
+                if keepalive.error:
+                    raise keepalive.error
+                print_keepalive_stats(keepalive.stats())
+
     except OSError as e:
         print(f"[-] I2C error: {e}")
         return 1